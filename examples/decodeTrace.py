@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import canmatrix.formats
+import canmatrix.trace
+import sys
+
+# command line options...
+usage = """
+%prog [options]  matrix  trace [frame-glob]
+
+matrix can be any of *.dbc|*.dbf|*.kcd|*.arxml
+trace can be any of *.log (candump -l)|*.asc|*.csv|*.bin (packed records, see canmatrix.stream)
+"""
+
+if len(sys.argv) < 3:
+    print(usage)
+    sys.exit(1)
+
+# load matrix
+db = canmatrix.formats.loadp_flat(sys.argv[1])
+frame_glob = sys.argv[3] if len(sys.argv) > 3 else "*"
+
+# decode trace in one pass
+for message in canmatrix.trace.decode_trace(db, sys.argv[2], frame_glob=frame_glob):
+    for signal, raw_value in message.values.items():
+        print("{:.6f}\t{}\t{}\t{}\t({})".format(
+            message.timestamp, message.frame.name, signal, raw_value, message.phys_value(signal)))
@@ -9,6 +9,7 @@ from canmatrix.canmatrix import (
     Signal,
     SignalGroup,
     DecodedSignal,
+    DecodedFrame,
     ArbitrationId,
     Frame,
     Define,
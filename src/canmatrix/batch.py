@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Vectorized decoding of many payloads of one frame (needs numpy, see extra "batch")."""
+
+import typing
+
+import attr
+import numpy
+
+import canmatrix
+
+
+@attr.s
+class DecodedColumn(object):
+    """
+    Contains one decoded signal of a batch of frames
+
+    * raw_value: numpy array with raw values (values on the bus)
+    * phys_value: numpy array (float64) with physical values (the scaled values)
+    * signal: pointer signal (object) which was decoded
+    """
+    raw_value = attr.ib()  # type: numpy.ndarray
+    signal = attr.ib()  # type: canmatrix.Signal
+
+    @property
+    def phys_value(self):  # type: () -> numpy.ndarray
+        """
+        :return: physical values (raw * factor + offset) as float64
+        :rtype: numpy.ndarray
+        """
+        return self.raw_value * float(self.signal.factor) + float(self.signal.offset)
+
+
+def payload_array(payloads, size, stride=None):
+    # type: (typing.Any, int, typing.Optional[int]) -> numpy.ndarray
+    """Return payloads as 2-D uint8 array with `size` columns.
+
+    :param payloads: 2-D uint8 array (n, size) or a bytes like buffer of records
+    :param int size: frame size in bytes
+    :param int stride: record length in bytes if payloads is a buffer (default: size),
+        the payload is expected at the beginning of each record
+    """
+    if isinstance(payloads, numpy.ndarray):
+        array = payloads
+    else:
+        array = numpy.frombuffer(payloads, dtype=numpy.uint8)
+    if stride is not None or array.ndim == 1:
+        stride = size if stride is None else stride
+        array = array.reshape(-1, stride)[:, :size]
+    if array.dtype != numpy.uint8 or array.ndim != 2:
+        raise ValueError("payloads must be a 2-D uint8 array, got {} with shape {}".format(array.dtype, array.shape))
+    if array.shape[1] != size:
+        raise canmatrix.DecodingFrameLength(
+            "Received payloads with wrong data size: {} instead of {}".format(array.shape[1], size))
+    return array
+
+
+def extract_column(payloads, field):
+    # type: (numpy.ndarray, typing.Tuple[bool, int, int, int, typing.Optional[str], int]) -> numpy.ndarray
+    """Extract the raw values of one signal given as FrameCodec field from all payload rows.
+
+    The values are collected in uint64, fields wider than 64 bits are decoded by raw_column row by row.
+    """
+    is_little_endian, shift, mask, sign_bit, float_format, byte_count = field
+    size = mask.bit_length()
+    if size > 64:
+        raise ValueError("Field of {} bits does not fit into a 64 bit column".format(size))
+    frame_size = payloads.shape[1]
+    value = numpy.zeros(payloads.shape[0], dtype=numpy.uint64)
+    for byte in range(frame_size):
+        # position of the byte in the payload integer of the codec (little or big endian)
+        position = 8 * (byte if is_little_endian else frame_size - 1 - byte)
+        if position + 8 <= shift or position >= shift + size:
+            continue
+        column = payloads[:, byte].astype(numpy.uint64)
+        if position >= shift:
+            value |= column << numpy.uint64(position - shift)
+        else:
+            value |= column >> numpy.uint64(shift - position)
+    value &= numpy.uint64(mask)
+
+    if float_format == '>f':
+        return value.astype(numpy.uint32).view(numpy.float32)
+    if float_format == '>d':
+        return value.view(numpy.float64)
+    if sign_bit:
+        value = value.view(numpy.int64)
+        if size < 64:
+            sign = numpy.int64(sign_bit)
+            value = (value ^ sign) - sign
+    return value
+
+
+def raw_column(array, codec, index, rows=None):
+    # type: (numpy.ndarray, canmatrix.FrameCodec, int, typing.Optional[numpy.ndarray]) -> numpy.ndarray
+    """Return raw values of signal number `index` of the codec for all rows (or the selected rows) of array."""
+    if rows is not None:
+        array = array[rows]
+    field = codec.fields[index]
+    if field is None:
+        # signal does not fit into the frame, decode row by row like Frame.unpack
+        return numpy.array([codec.unpack(bytes(row))[index] for row in array])
+    if field[2].bit_length() > 64:
+        # wider than the uint64 columns of extract_column, the python ints of the codec are kept as objects
+        return numpy.array([codec.unpack(bytes(row))[index] for row in array], dtype=object)
+    return extract_column(array, field)
+
+
+def simple_multiplexed_rows(frame, array, codec):
+    # type: (canmatrix.Frame, numpy.ndarray, canmatrix.FrameCodec) -> typing.Dict[int, numpy.ndarray]
+    """Return rows (bool mask) for every signal index which is only present for some multiplexer values.
+
+    Follows the rules of Frame.decode for simple multiplexed frames.
+    """
+    muxer_index = max(index for index, signal in enumerate(codec.signals) if signal.is_multiplexer)
+    mux_values = raw_column(array, codec, muxer_index)
+    signal_rows = dict()
+    for mux_value in numpy.unique(mux_values):
+        rows = mux_values == mux_value
+        for index, signal in enumerate(codec.signals):
+            if signal.mux_val is not None and signal.mux_val == mux_value:
+                signal_rows[index] = rows
+    for index, signal in enumerate(codec.signals):
+        if signal.mux_val is not None and index not in signal_rows:
+            signal_rows[index] = numpy.zeros(len(array), dtype=bool)
+    return signal_rows
+
+
+def complex_multiplexed_rows(frame, array, codec):
+    # type: (canmatrix.Frame, numpy.ndarray, canmatrix.FrameCodec) -> typing.Dict[int, numpy.ndarray]
+    """Return rows (bool mask) for every signal index of a complex multiplexed frame.
+
+    Follows the rules of Frame.decode: rows are grouped by the value of each (sub-)multiplexer,
+    each group only looks at the signals and sub-multiplexers of its own value.
+    """
+    signals = codec.signals
+    signal_rows = {index: numpy.zeros(len(array), dtype=bool) for index in range(len(signals))}
+
+    def add_rows(multiplexer_name, multiplexer_value, rows):
+        for index, signal in enumerate(signals):
+            if (
+                signal.multiplexer_value_in_range(multiplexer_value)
+                and signal.muxer_for_signal == multiplexer_name
+                and not signal.is_multiplexer
+            ) or signal.name == multiplexer_name:
+                signal_rows[index] |= rows
+
+    def sub_multiplexer(multiplexer_name, multiplexer_value):
+        for index, signal in enumerate(signals):
+            if (
+                signal.is_multiplexer
+                and signal.muxer_for_signal == multiplexer_name
+                and signal.multiplexer_value_in_range(multiplexer_value)
+            ):
+                return index
+        return None
+
+    all_rows = numpy.ones(len(array), dtype=bool)
+    add_rows(None, None, all_rows)
+    pending = [(sub_multiplexer(None, None), all_rows)]
+    while pending:
+        muxer_index, rows = pending.pop()
+        if muxer_index is None or not rows.any():
+            continue
+        muxer_name = signals[muxer_index].name
+        signal_rows[muxer_index] |= rows
+        mux_values = numpy.zeros(len(array), dtype=numpy.int64)
+        mux_values[rows] = raw_column(array, codec, muxer_index, rows)
+        for mux_value in numpy.unique(mux_values[rows]):
+            value_rows = rows & (mux_values == mux_value)
+            add_rows(muxer_name, int(mux_value), value_rows)
+            pending.append((sub_multiplexer(muxer_name, int(mux_value)), value_rows))
+    return signal_rows
+
+
+def decode_batch(frame, payloads, stride=None):
+    # type: (canmatrix.Frame, typing.Any, typing.Optional[int]) -> typing.Mapping[str, DecodedColumn]
+    """Return dictionary with Signal Name: DecodedColumn for every signal of the frame
+    (support for multiplexed frames).
+
+    For multiplexed frames the multiplexer column is decoded first and rows are grouped by its value,
+    every signal is only extracted from the rows where it is present.
+    Columns of signals which are absent in some rows are numpy.ma.MaskedArray with these rows masked.
+
+    :param frame: frame to decode
+    :param payloads: 2-D uint8 array (n, frame.size) or bytes like buffer of records
+    :param int stride: record length in bytes if payloads is a buffer
+    :return: dictionary with a DecodedColumn per signal
+    """
+    if frame.is_pdu_container:
+        raise canmatrix.DecodingConatainerPdu("Batch decoding of container PDUs is not supported")
+    array = payload_array(payloads, frame.size, stride)
+    codec = frame.codec
+    if frame.is_complex_multiplexed:
+        signal_rows = complex_multiplexed_rows(frame, array, codec)
+    elif frame.is_multiplexed:
+        signal_rows = simple_multiplexed_rows(frame, array, codec)
+    else:
+        signal_rows = dict()
+
+    columns = dict()
+    for index, signal in enumerate(codec.signals):
+        rows = signal_rows.get(index)
+        if rows is None or rows.all():
+            raw_value = raw_column(array, codec, index)
+        else:
+            present = raw_column(array, codec, index, rows)
+            raw_value = numpy.ma.masked_array(numpy.zeros(len(array), dtype=present.dtype), mask=~rows)
+            raw_value[rows] = present
+        columns[signal.name] = DecodedColumn(raw_value, signal)
+    return columns
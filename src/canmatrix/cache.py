@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of loaded matrices, used by canmatrix.formats.loadp and loadp_flat.
+
+The cache is opt-in: pass ``cache_dir`` to loadp or set the environment variable CANMATRIX_CACHE_DIR.
+Entries are pickled dictionaries of CanMatrix objects (like loadp returns them), keyed by
+
+* the SHA-256 hash of the file content (not the path or the modification time),
+* the import format and key,
+* all import options (e.g. dbcImportEncoding, arxmlIgnoreClusterInfo, float_factory),
+* the canmatrix version.
+
+The total size of a cache directory is bounded (``cache_size`` or CANMATRIX_CACHE_SIZE in bytes),
+the least recently used entries are removed first.
+
+Entries are read with pickle, so only use cache directories no one else can write to.
+"""
+
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import typing
+
+import canmatrix
+
+logger = logging.getLogger(__name__)
+
+default_cache_size = 1 << 30  # type: int
+entry_suffix = ".pickle"
+
+
+def _option_token(value):  # type: (typing.Any) -> str
+    """Return a stable text for an option value, callables (float_factory) are given by name."""
+    if callable(value) and hasattr(value, "__qualname__"):
+        return "{}.{}".format(getattr(value, "__module__", ""), value.__qualname__)
+    return repr(value)
+
+
+def cache_key(path, import_type, key="", **options):  # type: (str, str, str, **typing.Any) -> str
+    """Return the cache key of loading path with the given format, key and options."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(repr((canmatrix.__version__, import_type, key)).encode("utf-8"))
+    for name in sorted(options):
+        digest.update(repr((name, _option_token(options[name]))).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MatrixCache(object):
+    """
+    Directory of cached matrices with LRU eviction.
+
+    The modification time of an entry is its last use, loading an entry updates it.
+
+    :param str directory: cache directory, created if missing
+    :param int max_size: maximum total size of all entries in bytes
+    """
+
+    def __init__(self, directory, max_size=default_cache_size):  # type: (str, int) -> None
+        self.directory = directory
+        self.max_size = max_size
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def entry_path(self, key):  # type: (str) -> str
+        return os.path.join(self.directory, key + entry_suffix)
+
+    def load(self, key):  # type: (str) -> typing.Optional[typing.Dict[str, canmatrix.CanMatrix]]
+        """Return the cached matrices of key, None if there is no (readable) entry."""
+        path = self.entry_path(key)
+        # unpickling creates only new objects, no cycles to collect: pause the garbage collector
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, "rb") as entry:
+                dbs = pickle.load(entry)
+        except (IOError, OSError):
+            return None
+        except Exception as error:  # broken entries (i.e. of an incompatible canmatrix) are parsed again
+            logger.debug("Dropping cache entry %s: %s", path, error)
+            self.remove(path)
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return dbs
+
+    def store(self, key, dbs):  # type: (str, typing.Mapping[str, canmatrix.CanMatrix]) -> None
+        """Store matrices under key and evict old entries, errors while writing are logged and ignored."""
+        # written to a temporary file first, concurrent loads never see partial entries
+        handle, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(handle, "wb") as entry:
+                pickle.dump(dict(dbs), entry, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.entry_path(key))
+        except Exception as error:
+            logger.warning("Could not write cache entry %s: %s", key, error)
+            self.remove(temp_path)
+            return
+        self.evict()
+
+    def entries(self):  # type: () -> typing.List[typing.Tuple[float, int, str]]
+        """Return (last use, size, path) of all entries, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(entry_suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self):  # type: () -> None
+        """Remove least recently used entries until the cache fits into max_size."""
+        entries = self.entries()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            self.remove(path)
+            total_size -= size
+
+    def clear(self):  # type: () -> None
+        for _, _, path in self.entries():
+            self.remove(path)
+
+    @staticmethod
+    def remove(path):  # type: (str) -> None
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def from_options(cache_dir=None, cache_size=None):
+    # type: (typing.Optional[str], typing.Optional[int]) -> typing.Optional[MatrixCache]
+    """Return the cache to use for loadp, None if caching is not enabled."""
+    if cache_dir is None:
+        cache_dir = os.environ.get("CANMATRIX_CACHE_DIR")
+    if not cache_dir:
+        return None
+    if cache_size is None:
+        cache_size = int(os.environ.get("CANMATRIX_CACHE_SIZE", default_cache_size))
+    return MatrixCache(cache_dir, cache_size)
@@ -1,65 +1,195 @@
 # -*- coding: utf-8 -*-
 
+import bisect
 import typing
+import weakref
 from builtins import *
 
 import canmatrix
+from canmatrix.canmatrix import _add_index
+
+
+class RoutingIndex(object):
+    """
+    Lookups of gateway mappings (dicts with "source" and "target" names) by name.
+
+    Exact names are found in dictionaries. Parts of names are found by searching the joined names of all mappings
+    instead of each mapping, with the same results as ``name in mapping["source"]`` in list order.
+    The index is valid as long as the list object and its length stay the same.
+    """
+
+    separator = "\0"  # not part of any name
+
+    def __init__(self, mappings):  # type: (typing.Sequence[typing.Mapping[str, typing.Any]]) -> None
+        self.mappings = mappings
+        self.count = len(mappings)
+        self.by_name = {}  # type: typing.Dict[str, typing.Dict[typing.Any, typing.List[int]]]
+        self.texts = {}  # type: typing.Dict[str, str]
+        self.offsets = {}  # type: typing.Dict[str, typing.List[int]]
+        for key in ("source", "target"):
+            by_name = {}  # type: typing.Dict[typing.Any, typing.List[int]]
+            offsets = []
+            offset = 0
+            for index, mapping in enumerate(mappings):
+                name = mapping[key]
+                by_name.setdefault(name, []).append(index)
+                offsets.append(offset)
+                offset += len(name or "") + len(self.separator)
+            self.by_name[key] = by_name
+            self.texts[key] = self.separator.join(mapping[key] or "" for mapping in mappings)
+            self.offsets[key] = offsets
+
+    def is_valid_for(self, mappings):  # type: (typing.Sequence[typing.Mapping[str, typing.Any]]) -> bool
+        return self.mappings is mappings and self.count == len(mappings)
+
+    def find(self, key, name, strict_search=False):  # type: (str, str, bool) -> typing.List[int]
+        """Return the indexes of the mappings whose key ("source" or "target") is name or contains name."""
+        if strict_search:
+            return self.by_name[key].get(name, [])
+        if not name or self.separator in name:
+            return [index for index, mapping in enumerate(self.mappings) if name in (mapping[key] or "")]
+        text = self.texts[key]
+        offsets = self.offsets[key]
+        found = []
+        start = text.find(name)
+        while start != -1:
+            index = bisect.bisect_right(offsets, start) - 1
+            found.append(index)
+            if index + 1 == self.count:
+                break
+            start = text.find(name, offsets[index + 1])
+        return found
+
+
+class MatrixVersion(object):
+    """
+    Change counter of the frames and ECUs of a CanMatrix.
+
+    The version changes if the frame or ECU list (both _TrackedList) is changed or assigned, or if a frame or ECU
+    which was in the lists when the counter was created is renamed. Reading it costs the same for any number of frames.
+    """
+
+    keys = frozenset(["name"])  # see canmatrix._on_setattr
+
+    def __init__(self, db):  # type: (canmatrix.CanMatrix) -> None
+        self.db = db
+        self.frames = db.frames
+        self.ecus = db.ecus
+        self.renames = 0
+        # renamed frames and ECUs report to the counter (weakly referenced) through its stale attribute
+        self.ref = weakref.ref(self)
+        for item in self.frames:
+            _add_index(item, self.ref)
+        for item in self.ecus:
+            _add_index(item, self.ref)
+
+    @property
+    def stale(self):  # type: () -> bool
+        return False
+
+    @stale.setter
+    def stale(self, value):  # type: (bool) -> None
+        self.renames += 1
+
+    @property
+    def version(self):  # type: () -> typing.Optional[typing.Tuple[int, int, int]]
+        """Current version, None if the lists of the matrix were replaced."""
+        if self.db.frames is not self.frames or self.db.ecus is not self.ecus:
+            return None
+        return self.frames.changes, self.ecus.changes, self.renames
 
 
 class CanCluster(dict):
+    """
+    Matrices of several busses by name, with the frames, signals and ECUs of all busses.
+
+    Frames, signals and ECUs with the same name are listed once (the first one). Transmitters and
+    receivers of frames and receivers of signals with the same name are added to the first one.
+    The lists are computed when the cluster is created and again on next use after a matrix is added or removed,
+    or frames or ECUs of a matrix are added, removed or renamed (see MatrixVersion).
+    After other changes (i.e. signals added to a frame of a matrix) call `invalidate`.
+    """
 
     def __init__(self, *arg, **kw):
         super(CanCluster, self).__init__(*arg, **kw)
-        self._frames = []  # type: typing.List[canmatrix.Frame]
-        self._signals = []  # type: typing.List[canmatrix.Signal]
-        self._ecus = []  # type: typing.List[canmatrix.Ecu]
+        self._frames = None  # type: typing.Optional[typing.List[canmatrix.Frame]]
+        self._signals = None  # type: typing.Optional[typing.List[canmatrix.Signal]]
+        self._ecus = None  # type: typing.Optional[typing.List[canmatrix.Ecu]]
+        # the matrices and their versions the lists were computed from, see _matrices_unchanged
+        self._matrices = None  # type: typing.Optional[typing.List[typing.Tuple]]
         self._pdu_gateway_list = []     # type: typing.List[dict[str, str]]
         self._signal_gateway_list = []  # type: typing.List[dict[str, str]]
+        self._pdu_routing = None  # type: typing.Optional[RoutingIndex]
+        self._signal_routing = None  # type: typing.Optional[RoutingIndex]
+        # files which could not be loaded (path: exception), see canmatrix.formats.loadp_many
+        self.load_errors = {}  # type: typing.Dict[str, Exception]
         self.update()
 
+    def __getstate__(self):  # type: () -> typing.Dict[str, typing.Any]
+        """Pickle without the lists of frames, signals and ECUs and the matrix indexes, they are computed on use."""
+        state = self.__dict__.copy()
+        state.update(_frames=None, _signals=None, _ecus=None, _matrices=None)
+        return state
+
+    def _matrices_unchanged(self):  # type: () -> bool
+        if self._matrices is None or len(self._matrices) != len(self):
+            return False
+        for (name, db, counter, version), (current_name, current_db) in zip(self._matrices, self.items()):
+            if name != current_name or db is not current_db or counter.version != version:
+                return False
+        return True
+
+    def _check_matrices(self):  # type: () -> None
+        """Drop the lists of frames, signals and ECUs if the matrices changed."""
+        if not self._matrices_unchanged():
+            self.invalidate()
+            self._matrices = []
+            for name, db in self.items():
+                counter = MatrixVersion(db)
+                self._matrices.append((name, db, counter, counter.version))
+
+    def invalidate(self):  # type: () -> None
+        """Drop the lists of frames, signals and ECUs, they are computed again on next use."""
+        self._frames = None
+        self._signals = None
+        self._ecus = None
+        self._matrices = None
+
     def update_frames(self):  # type: () -> typing.MutableSequence[canmatrix.Frame]
-        frames = []  # type: typing.List[canmatrix.Frame]
-        frame_names = []  # type: typing.List[str]
-        for matrixName in self:
-            for frame in self[matrixName].frames:  # type: canmatrix.Frame
-                if frame.name not in frame_names:
-                    frame_names.append(frame.name)
-                    frames.append(frame)
-                else:
-                    index = frame_names.index(frame.name)
+        self._check_matrices()
+        frames = {}  # type: typing.Dict[str, canmatrix.Frame]
+        for db in self.values():
+            for frame in db.frames:  # type: canmatrix.Frame
+                first = frames.setdefault(frame.name, frame)
+                if first is not frame:
                     for transmitter in frame.transmitters:
-                        frames[index].add_transmitter(transmitter)
+                        first.add_transmitter(transmitter)
                     for receiver in frame.receivers:
-                        frames[index].add_receiver(receiver)
-        self._frames = frames
-        return frames
+                        first.add_receiver(receiver)
+        self._frames = list(frames.values())
+        return self._frames
 
     def update_signals(self):  # type: () -> typing.MutableSequence[canmatrix.Signal]
-        signals = []  # type: typing.List[canmatrix.Signal]
-        signal_names = []  # type: typing.List[str]
-        for matrixName in self:
-            for frame in self[matrixName].frames:  # type: canmatrix.Frame
+        self._check_matrices()
+        signals = {}  # type: typing.Dict[str, canmatrix.Signal]
+        for db in self.values():
+            for frame in db.frames:  # type: canmatrix.Frame
                 for signal in frame.signals:
-                    if signal.name not in signal_names:
-                        signal_names.append(signal.name)
-                        signals.append(signal)
-                    else:
-                        index = signal_names.index(signal.name)
+                    first = signals.setdefault(signal.name, signal)
+                    if first is not signal:
                         for receiver in signal.receivers:
-                            signals[index].add_receiver(receiver)
-        self._signals = signals
-        return signals
+                            first.add_receiver(receiver)
+        self._signals = list(signals.values())
+        return self._signals
 
     def update_ecus(self):  # type: () -> typing.MutableSequence[canmatrix.Ecu]
-        ecus = []  # type: typing.List[canmatrix.Ecu]
-        ecu_names = []  # type: typing.List[str]
-        for matrixName in self:
-            for ecu in self[matrixName].ecus:  # type: canmatrix.Ecu
-                if ecu.name not in ecu_names:
-                    ecu_names.append(ecu.name)
-                    ecus.append(ecu)
-        self._ecus = ecus
-        return ecus
+        self._check_matrices()
+        ecus = {}  # type: typing.Dict[str, canmatrix.Ecu]
+        for db in self.values():
+            for ecu in db.ecus:  # type: canmatrix.Ecu
+                ecus.setdefault(ecu.name, ecu)
+        self._ecus = list(ecus.values())
+        return self._ecus
 
     def update(self):
         self.update_frames()
@@ -68,19 +198,22 @@ class CanCluster(dict):
 
     @property
     def ecus(self):  # type: () -> typing.MutableSequence[canmatrix.Ecu]
-        if not self._ecus:
+        self._check_matrices()
+        if self._ecus is None:
             self.update_ecus()
         return self._ecus
 
     @property
     def frames(self):  # type: () -> typing.MutableSequence[canmatrix.Frame]
-        if not self._frames:
+        self._check_matrices()
+        if self._frames is None:
             self.update_frames()
         return self._frames
 
     @property
     def signals(self):  # type: () -> typing.MutableSequence[canmatrix.Signal]
-        if not self._signals:
+        self._check_matrices()
+        if self._signals is None:
             self.update_signals()
         return self._signals
 
@@ -93,35 +226,27 @@ class CanCluster(dict):
         return self._signal_gateway_list
 
     def get_pdu_routing_info(self, pdu_name, strict_search=False):
+        if self._pdu_routing is None or not self._pdu_routing.is_valid_for(self._pdu_gateway_list):
+            self._pdu_routing = RoutingIndex(self._pdu_gateway_list)
         routing_source = []
         routing_target = []
-        if strict_search:
-            for pdu in self._pdu_gateway_list:
-                if pdu_name == pdu["source"]:
-                    routing_source.append({"pdu": pdu["target"], "cluster": pdu["target_cluster"], "ecu": pdu["ecu"], "type": pdu["target_type"]})
-                if pdu_name == pdu["target"]:
-                    routing_target.append({"pdu": pdu["source"], "cluster": pdu["source_cluster"], "ecu": pdu["ecu"], "type": pdu["source_type"]})
-        else:
-            for pdu in self._pdu_gateway_list:
-                if pdu_name in pdu["source"]:
-                    routing_source.append({"pdu": pdu["target"], "cluster": pdu["target_cluster"], "ecu": pdu["ecu"], "type": pdu["target_type"]})
-                if pdu_name in pdu["target"]:
-                    routing_target.append({"pdu": pdu["source"], "cluster": pdu["source_cluster"], "ecu": pdu["ecu"], "type": pdu["source_type"]})
+        for index in self._pdu_routing.find("source", pdu_name, strict_search):
+            pdu = self._pdu_gateway_list[index]
+            routing_source.append({"pdu": pdu["target"], "cluster": pdu["target_cluster"], "ecu": pdu["ecu"], "type": pdu["target_type"]})
+        for index in self._pdu_routing.find("target", pdu_name, strict_search):
+            pdu = self._pdu_gateway_list[index]
+            routing_target.append({"pdu": pdu["source"], "cluster": pdu["source_cluster"], "ecu": pdu["ecu"], "type": pdu["source_type"]})
         return {"source": routing_source, "target": routing_target}
 
     def get_signal_routing_info(self, signal_name, strict_search=False):
+        if self._signal_routing is None or not self._signal_routing.is_valid_for(self._signal_gateway_list):
+            self._signal_routing = RoutingIndex(self._signal_gateway_list)
         routing_source = []
         routing_target = []
-        if strict_search:
-            for signal_gw in self._signal_gateway_list:
-                if signal_name == signal_gw["source"]:
-                    routing_source.append({"signal": signal_gw["target"], "cluster": signal_gw["target_cluster"], "ecu": signal_gw["ecu"], "type": signal_gw["target_type"]})
-                if signal_name == signal_gw["target"]:
-                    routing_target.append({"signal": signal_gw["source"], "cluster": signal_gw["source_cluster"], "ecu": signal_gw["ecu"], "type": signal_gw["source_type"]})
-        else:
-            for signal_gw in self._signal_gateway_list:
-                if signal_name in signal_gw["source"]:
-                    routing_source.append({"signal": signal_gw["target"], "cluster": signal_gw["target_cluster"], "ecu": signal_gw["ecu"], "type": signal_gw["target_type"]})
-                if signal_name in signal_gw["target"]:
-                    routing_target.append({"signal": signal_gw["source"], "cluster": signal_gw["source_cluster"], "ecu": signal_gw["ecu"], "type": signal_gw["source_type"]})
+        for index in self._signal_routing.find("source", signal_name, strict_search):
+            signal_gw = self._signal_gateway_list[index]
+            routing_source.append({"signal": signal_gw["target"], "cluster": signal_gw["target_cluster"], "ecu": signal_gw["ecu"], "type": signal_gw["target_type"]})
+        for index in self._signal_routing.find("target", signal_name, strict_search):
+            signal_gw = self._signal_gateway_list[index]
+            routing_target.append({"signal": signal_gw["source"], "cluster": signal_gw["source_cluster"], "ecu": signal_gw["ecu"], "type": signal_gw["source_type"]})
         return {"source": routing_source, "target": routing_target}
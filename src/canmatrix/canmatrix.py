@@ -26,15 +26,21 @@
 
 # TODO: Definitions should be disassembled
 
+import collections.abc
 import decimal
 import fnmatch
+import fractions
+import functools
+import hashlib
+import inspect
 import itertools
 import logging
 import math
+import operator
 import struct
-import sys
 import typing
 import warnings
+import weakref
 from builtins import *
 
 import attr
@@ -44,13 +50,9 @@ import canmatrix.copy
 import canmatrix.types
 import canmatrix.utils
 
-if sys.version_info < (3, 8):
-    from importlib_metadata import version
-else:
-    from importlib.metadata import version
-
-if version("attrs") < '17.4.0':
-    raise RuntimeError("need attrs >= 17.4.0")
+# checked by feature, reading the package version with importlib.metadata is slow
+if "on_setattr" not in inspect.signature(attr.ib).parameters:
+    raise RuntimeError("need attrs >= 20.1.0")
 
 logger = logging.getLogger(__name__)
 defaultFloatFactory = decimal.Decimal  # type: typing.Callable[[typing.Any], canmatrix.types.PhysicalValue]
@@ -72,12 +74,86 @@ class DecodingConatainerPdu(ExceptionTemplate): pass
 class EncodingConatainerPdu(ExceptionTemplate): pass
 
 
+def _add_index(item, index_ref):  # type: (typing.Any, weakref.ref) -> None
+    """Let item reference an index (weakly), changes of item which concern the index mark it stale."""
+    index_refs = item._indexes
+    # object.__setattr__ skips the on_setattr hooks, _indexes is no key of any index
+    if not index_refs:
+        object.__setattr__(item, "_indexes", [index_ref])
+    elif index_ref not in index_refs:
+        object.__setattr__(item, "_indexes", [ref for ref in index_refs if ref() is not None] + [index_ref])
+
+
+def _on_setattr(item, attribute, value):  # type: (typing.Any, attr.Attribute, typing.Any) -> typing.Any
+    """on_setattr hook of the indexed classes, marks the indexes of item stale which use the attribute (index.keys)
+    and counts the changes of item (_changes, the version of cached fingerprints).
+
+    attrs does not call the hook in __init__.
+    """
+    # object.__setattr__ skips the on_setattr hooks
+    object.__setattr__(item, "_changes", item._changes + 1)
+    if item._indexes:
+        name = attribute.name
+        for index_ref in item._indexes:
+            index = index_ref()
+            if index is not None and name in index.keys:
+                index.stale = True
+    return value
+
+
+# on_setattr of container fields: convert to a tracked container (see _TrackedList), then _on_setattr
+_convert_on_setattr = attr.setters.pipe(attr.setters.convert, _on_setattr)
+
+
+class _TrackedList(list):
+    """List which counts its changes.
+
+    Indexes built from the list compare the count instead of the items to check if they are still valid.
+    """
+
+    changes = 0
+
+
+class _TrackedDict(dict):
+    """Dictionary which counts its changes, see _TrackedList."""
+
+    changes = 0
+
+
+def _counting(method):  # type: (typing.Callable) -> typing.Callable
+    def counting_method(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.changes += 1
+        return result
+    counting_method.__name__ = method.__name__
+    counting_method.__doc__ = method.__doc__
+    return counting_method
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop", "remove",
+              "clear", "sort", "reverse"):
+    setattr(_TrackedList, _name, _counting(getattr(list, _name)))
+
+for _name in ("__setitem__", "__delitem__", "__ior__", "clear", "pop", "popitem", "setdefault", "update"):
+    setattr(_TrackedDict, _name, _counting(getattr(dict, _name)))
+
+
+def _tracked_list(items):  # type: (typing.Iterable) -> _TrackedList
+    """Converter for attrs, lists are copied to a _TrackedList."""
+    return items if type(items) is _TrackedList else _TrackedList(items)
+
+
+def _tracked_dict(items):  # type: (typing.Mapping) -> _TrackedDict
+    """Converter for attrs, dictionaries are copied to a _TrackedDict."""
+    return items if type(items) is _TrackedDict else _TrackedDict(items)
+
+
 def arbitration_id_converter(source):  # type: (typing.Union[int, ArbitrationId]) -> ArbitrationId
     """Converter for attrs which accepts ArbitrationId itself or int."""
     return source if isinstance(source, ArbitrationId) else  ArbitrationId.from_compound_integer(source)
 
 
-@attr.s
+@attr.s(on_setattr=_on_setattr)
 class Ecu(object):
     """
     Represents one ECU.
@@ -85,7 +161,21 @@ class Ecu(object):
 
     name = attr.ib()  # type: str
     comment = attr.ib(default=None)  # type: typing.Optional[str]
-    attributes = attr.ib(factory=dict, repr=False)  # type: typing.MutableMapping[str, typing.Any]
+    attributes = attr.ib(
+        factory=_TrackedDict, converter=_tracked_dict, on_setattr=_convert_on_setattr, repr=False
+    )  # type: typing.MutableMapping[str, typing.Any]
+
+    _indexes = None  # type: typing.Optional[typing.List[weakref.ref]]  # see _add_index
+    _changes = 0  # type: int  # see _on_setattr
+    _fingerprints = None  # type: typing.Optional[typing.Dict]
+
+    def __getstate__(self):  # type: () -> typing.Dict[str, typing.Any]
+        """Pickle without the references to indexes, change count and fingerprints."""
+        state = self.__dict__.copy()
+        state.pop("_indexes", None)
+        state.pop("_changes", None)
+        state.pop("_fingerprints", None)
+        return state
 
     def attribute(self, attribute_name, db=None, default=None):  # type: (str, CanMatrix, typing.Any) -> typing.Any
         """Get Board unit attribute by its name.
@@ -129,12 +219,54 @@ class Ecu(object):
         """
         self.comment = comment
 
+    def fingerprint(self, ignore_comments=False, ignore_attributes=False):  # type: (bool, bool) -> str
+        """Return a stable hash (SHA-256 hex digest) of name, comment and attributes of the ECU.
+
+        :param bool ignore_comments: leave the comment out
+        :param bool ignore_attributes: leave the attributes out
+        :rtype: str
+        """
+        def content():  # type: () -> typing.Tuple
+            result = (self.name,)  # type: typing.Tuple
+            if not ignore_comments:
+                result += (self.comment,)
+            if not ignore_attributes:
+                result += (self.attributes,)
+            return result
+
+        version = (self._changes, self.attributes.changes)
+        return _cached_fingerprint(self, (ignore_comments, ignore_attributes), version, content)
+
+
+def convert_number(value, float_factory):
+    # type: (typing.Any, typing.Callable[[typing.Any], canmatrix.types.PhysicalValue]) -> canmatrix.types.PhysicalValue
+    """Convert a number with float_factory, floats are converted by their shortest representation
+    (0.1 and not 0.1000000000000000055511151231257827...)."""
+    if type(value) is float_factory:
+        return value
+    if isinstance(value, float):
+        value = repr(value)
+    elif isinstance(value, fractions.Fraction) and float_factory is decimal.Decimal:
+        return decimal.Decimal(value.numerator) / decimal.Decimal(value.denominator)
+    return float_factory(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls):  # type: (type) -> typing.FrozenSet[str]
+    """Names of the attrs fields of cls, cached as attr.fields_dict builds a new dict on each call."""
+    return frozenset(attr.fields_dict(cls))
+
 
 def normalize_value_table(table):  # type: (typing.Mapping) -> typing.MutableMapping[int, typing.Any]
     return {int(k): v for k, v in table.items()}
 
 
-@attr.s(eq=False)
+def _tracked_value_table(table):  # type: (typing.Mapping) -> _TrackedDict
+    """Converter for attrs, normalize_value_table to a _TrackedDict."""
+    return _TrackedDict((int(k), v) for k, v in table.items())
+
+
+@attr.s(eq=False, on_setattr=_on_setattr)
 class Signal(object):
     """
     Represents a Signal in CAN Matrix.
@@ -170,7 +302,9 @@ class Signal(object):
     )  # type: canmatrix.types.PhysicalValue
 
     unit = attr.ib(default="")  # type: str
-    receivers = attr.ib(factory=list)  # type: typing.MutableSequence[str]
+    receivers = attr.ib(
+        factory=_TrackedList, converter=_tracked_list, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableSequence[str]
     comment = attr.ib(default=None)  # type: typing.Optional[str]
     multiplex = attr.ib(default=None)  # type: typing.Union[str, int]
 
@@ -179,9 +313,15 @@ class Signal(object):
     is_ascii = attr.ib(default=False)  # type: bool
     type_label = attr.ib(default="")
     enumeration = attr.ib(default=None)  # type: typing.Optional[str]
-    comments = attr.ib(factory=dict)  # type: typing.MutableMapping[int, str]
-    attributes = attr.ib(factory=dict)  # type: typing.MutableMapping[str, typing.Any]
-    values = attr.ib(converter=normalize_value_table, factory=dict)  # type: typing.MutableMapping[int, str]
+    comments = attr.ib(
+        factory=_TrackedDict, converter=_tracked_dict, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableMapping[int, str]
+    attributes = attr.ib(
+        factory=_TrackedDict, converter=_tracked_dict, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableMapping[str, typing.Any]
+    values = attr.ib(
+        factory=_TrackedDict, converter=_tracked_value_table, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableMapping[int, str]
     mux_val_grp = attr.ib(factory=list)  # type: typing.MutableSequence[list]
     muxer_for_signal = attr.ib(default=None)  # type: typing.Optional[str]
 
@@ -214,6 +354,23 @@ class Signal(object):
     def set_default_max(self):
         return self.set_max()
 
+    # set from multiplex by multiplex_setter
+    mux_val = attr.ib(default=None, init=False, repr=False)  # type: typing.Optional[int]
+    is_multiplexer = attr.ib(default=False, init=False, repr=False)  # type: bool
+
+    _indexes = None  # type: typing.Optional[typing.List[weakref.ref]]  # see _add_index
+    _changes = 0  # type: int  # see _on_setattr
+    _fingerprints = None  # type: typing.Optional[typing.Dict]
+    _scale = None  # type: typing.Optional[typing.Tuple]
+
+    def __getstate__(self):  # type: () -> typing.Dict[str, typing.Any]
+        """Pickle without the references to indexes, change count and fingerprints."""
+        state = self.__dict__.copy()
+        state.pop("_indexes", None)
+        state.pop("_changes", None)
+        state.pop("_fingerprints", None)
+        return state
+
     def __attrs_post_init__(self):
         self.multiplex = self.multiplex_setter(self.multiplex)
 
@@ -257,7 +414,7 @@ class Signal(object):
         :param default: Default value if attribute doesn't exist.
         :return: Return the attribute value if found, else `default` or None
         """
-        if attributeName in attr.fields_dict(type(self)):
+        if attributeName in _field_names(type(self)):
             return getattr(self, attributeName)
         if attributeName in self.attributes:
             return self.attributes[attributeName]
@@ -365,6 +522,40 @@ class Signal(object):
             startBitInternal = startBitInternal - (startBitInternal % 8) + 7 - (startBitInternal % 8)
         return int(startBitInternal)
 
+    def set_float_factory(self, float_factory):
+        # type: (typing.Callable[[typing.Any], canmatrix.types.PhysicalValue]) -> None
+        """Store factor, offset, min, max and initial value as numbers of float_factory.
+
+        float gives fast scaling in raw2phys and phys2raw, fractions.Fraction exact rationals
+        and decimal.Decimal (default) exact decimals as in the source files.
+
+        :param float_factory: number type, i.e. float, fractions.Fraction or decimal.Decimal
+        """
+        self.float_factory = float_factory
+        for name in ("factor", "offset", "min", "max", "initial_value"):
+            value = getattr(self, name)
+            if value is not None:
+                setattr(self, name, convert_number(value, float_factory))
+        self.scale_constants()
+
+    def scale_constants(self):
+        # type: () -> typing.Tuple[canmatrix.types.PhysicalValue, canmatrix.types.PhysicalValue]
+        """Return factor and offset as numbers of the signal's float_factory.
+
+        The constants are precomputed by set_float_factory and computed again if
+        factor, offset or float_factory change.
+
+        :return: (factor, offset)
+        """
+        scale = self._scale
+        if scale is None or scale[0] is not self.float_factory or scale[1] is not self.factor \
+                or scale[2] is not self.offset:
+            scale = self._scale = (
+                self.float_factory, self.factor, self.offset,
+                convert_number(self.factor, self.float_factory), convert_number(self.offset, self.float_factory),
+            )
+        return scale[3], scale[4]
+
     def calculate_raw_range(self):
         """Compute raw signal range based on Signal bit width and whether the Signal is signed or not.
 
@@ -442,10 +633,7 @@ class Signal(object):
                     value = value_key
                     return value
 
-        try:
-            value = decimal.Decimal(value)
-        except Exception as e:
-            raise e
+        value = self.float_factory(value)
 
         # if not (0 <= value <= 10):
         if not (self.min <= value <= self.max):
@@ -453,7 +641,8 @@ class Signal(object):
                 "Value {} is not valid for {}. Min={} and Max={}".format(
                     value, self, self.min, self.max)
                 )
-        raw_value = (self.float_factory(value) - self.float_factory(self.offset)) / self.float_factory(self.factor)
+        factor, offset = self.scale_constants()
+        raw_value = (value - offset) / factor
 
         if not self.is_float:
             raw_value = int(round(raw_value))
@@ -471,16 +660,55 @@ class Signal(object):
         if self.is_float:
             value = self.float_factory(value)
 
-        if decode_to_str:
-            for value_key, value_string in self.values.items():
-                if value_key == value:
-                    return value_string
-                    break
+        if decode_to_str and value in self.values:
+            return self.values[value]
 
-        result = value * self.factor + self.offset  # type: typing.Union[canmatrix.types.PhysicalValue, str]
+        factor, offset = self.scale_constants()
+        result = value * factor + offset  # type: typing.Union[canmatrix.types.PhysicalValue, str]
 
         return result
 
+    def fingerprint(self, ignore_comments=False, ignore_attributes=False):  # type: (bool, bool) -> str
+        """Return a stable hash (SHA-256 hex digest) of the signal content.
+
+        The hash covers name, layout, scaling, limits, multiplexing, receivers, unit, value table and attributes.
+        Numbers are hashed by value, they don't depend on the float_factory.
+        The hash is cached until the signal changes.
+
+        :param bool ignore_comments: leave comment and comments out
+        :param bool ignore_attributes: leave the user defined attributes out
+        :rtype: str
+        """
+        return _cached_fingerprint(
+            self, (ignore_comments, ignore_attributes), self._version(),
+            lambda: self._content(ignore_comments, ignore_attributes))
+
+    def _content(self, ignore_comments, ignore_attributes):  # type: (bool, bool) -> typing.Tuple
+        """Content of the signal for fingerprints, Frame.fingerprint hashes it directly."""
+        content = (
+            self.name, self.start_bit, self.size, self.is_little_endian, self.is_signed,
+            self.factor, self.offset, self.min, self.max, self.unit, self.receivers,
+            self.multiplex, self.mux_val, self.mux_val_grp,
+            self.muxer_for_signal, self.is_float, self.is_ascii, self.type_label, self.enumeration, self.cycle_time,
+            self.initial_value, self.scale_ranges, self.values,
+        )  # type: typing.Tuple
+        if not ignore_comments:
+            content += (self.comment, self.comments)
+        if not ignore_attributes:
+            content += (self.attributes,)
+        return content
+
+    def _version(self):  # type: () -> typing.Tuple
+        """Version of the signal for cached fingerprints, see _cached_fingerprint.
+
+        mux_val_grp and scale_ranges hold lists and dicts, which change without being counted.
+        """
+        return (
+            self._changes, self.receivers.changes, self.values.changes, self.comments.changes,
+            self.attributes.changes,
+            repr(_canonical((self.mux_val_grp, self.scale_ranges))) if self.mux_val_grp or self.scale_ranges else None,
+        )
+
     def __str__(self):  # type: () -> str
         return self.name
 
@@ -566,6 +794,111 @@ class DecodedSignal(object):
         return self.signal.raw2phys(self.raw_value, decode_to_str=True)
 
 
+class DecodedFrame(collections.abc.Mapping):
+    """
+    Lazy decoded frame (see Frame.decode_view), a mapping Signal Name: DecodedSignal like Frame.decode
+
+    The payload is kept as integer, a signal is only extracted when it is accessed.
+    raw_value, phys_value and named_value return the values without DecodedSignal objects,
+    all results are memoized.
+    """
+    __slots__ = ("frame", "data", "_codec", "_little", "_big", "_raw", "_phys", "_named", "_names")
+
+    def __init__(self, frame, data):  # type: (Frame, bytes) -> None
+        self.frame = frame
+        self.data = data
+        self._codec = frame.codec
+        self._little = int.from_bytes(data, "little")
+        self._big = int.from_bytes(data, "big")
+        self._raw = dict()  # type: typing.Dict[int, canmatrix.types.RawValue]
+        self._phys = dict()  # type: typing.Dict[int, canmatrix.types.PhysicalValue]
+        self._named = dict()  # type: typing.Dict[int, typing.Any]
+        self._names = None  # type: typing.Optional[typing.List[str]]
+
+    def _raw_value(self, index):  # type: (int) -> canmatrix.types.RawValue
+        try:
+            return self._raw[index]
+        except KeyError:
+            value = self._raw[index] = self._codec.unpack_signal(index, self.data, self._little, self._big)
+            return value
+
+    def _signal_names(self):  # type: () -> typing.List[str]
+        """Return names of the decoded signals, only signals matching to the muxgroup like Frame.decode."""
+        if self._names is None:
+            codec = self._codec
+            if self.frame.is_complex_multiplexed:
+                self._names = list(self.frame.decode(self.data))
+            elif codec.multiplexer_index is not None:
+                mux_value = self._raw_value(codec.multiplexer_index)
+                self._names = [
+                    signal.name for signal in codec.signals
+                    if signal.mux_val is None or signal.mux_val == mux_value
+                ]
+            else:
+                self._names = [signal.name for signal in codec.signals]
+        return self._names
+
+    def _index(self, name):  # type: (str) -> int
+        codec = self._codec
+        index = codec.indexes.get(name)
+        if index is None:
+            raise KeyError(name)
+        if self.frame.is_complex_multiplexed or (
+            codec.multiplexer_index is not None and codec.signals[index].mux_val is not None
+        ):
+            if name not in self._signal_names():
+                raise KeyError(name)
+        return index
+
+    def raw_value(self, name):  # type: (str) -> canmatrix.types.RawValue
+        """Return raw value (value on the bus) of a signal."""
+        return self._raw_value(self._index(name))
+
+    def phys_value(self, name):  # type: (str) -> canmatrix.types.PhysicalValue
+        """Return physical value (the scaled value) of a signal."""
+        index = self._index(name)
+        try:
+            return self._phys[index]
+        except KeyError:
+            value = self._phys[index] = self._codec.signals[index].raw2phys(self._raw_value(index))
+            return value
+
+    def named_value(self, name):  # type: (str) -> typing.Any
+        """Return value of Valuetable or physical value of a signal."""
+        index = self._index(name)
+        try:
+            return self._named[index]
+        except KeyError:
+            signal = self._codec.signals[index]
+            raw_value = self._raw_value(index)
+            if raw_value in signal.values:
+                value = signal.values[raw_value]
+            else:
+                value = self.phys_value(name)
+            self._named[index] = value
+            return value
+
+    def __getitem__(self, name):  # type: (str) -> DecodedSignal
+        index = self._index(name)
+        return DecodedSignal(self._raw_value(index), self._codec.signals[index])
+
+    def __contains__(self, name):  # type: (typing.Any) -> bool
+        try:
+            self._index(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):  # type: () -> typing.Iterator[str]
+        return iter(self._signal_names())
+
+    def __len__(self):  # type: () -> int
+        return len(self._signal_names())
+
+    def __repr__(self):  # type: () -> str
+        return "DecodedFrame({}, {})".format(self.frame.name, bytes(self.data).hex())
+
+
 # https://docs.python.org/3/library/itertools.html
 def grouper(iterable, n, fillvalue=None):
     """Collect data into fixed-length chunks or blocks."""
@@ -627,7 +960,230 @@ def pack_bitstring(length, is_float, value, signed):
     return bitstring
 
 
-@attr.s
+class FrameCodec(object):
+    """
+    Precompiled signal layout of a Frame.
+
+    The codec is built once from the signal list of a frame and extracts the raw values
+    with integer shift/mask operations on the payload instead of bitstrings.
+    Signals which do not fit into the frame or floats with unsupported size
+    fall back to the bitstring functions, so results are the same as with them.
+    """
+
+    float_formats = {
+        32: '>f',
+        64: '>d'
+    }
+
+    # signal attributes the compiled fields, name index and multiplexer depend on, changing one of them
+    # (or the frame size) marks the codec stale, see _on_setattr
+    keys = frozenset([
+        "name", "start_bit", "size", "is_signed", "is_little_endian", "is_float", "is_multiplexer", "mux_val"
+    ])
+    # signal attributes Frame.start_value_payload depends on
+    start_value_of = staticmethod(operator.attrgetter("initial_value", "factor", "offset", "min", "max"))
+
+    def __init__(self, signals, size):
+        # type: (typing.Sequence[Signal], int) -> None
+        """
+        :param signals: signals of the frame
+        :param int size: frame size in bytes
+        """
+        self.signals = list(signals)
+        self.size = size
+        # list changes are counted by Frame.signals (a _TrackedList), see is_valid_for
+        self.signal_list = signals
+        self.changes = getattr(signals, "changes", None)
+        self.stale = False
+        self.ref = weakref.ref(self)
+        for signal in self.signals:
+            _add_index(signal, self.ref)
+        self.fields = [self._compile_field(signal) for signal in self.signals]
+        self.needs_bitstrings = any(field is None for field in self.fields)
+        # (is_little_endian, shift, mask, sign_bit) of the fields if all signals are integers, see unpack
+        self.integer_fields = None  # type: typing.Optional[typing.List[typing.Tuple[bool, int, int, int]]]
+        if not self.needs_bitstrings and all(field[4] is None for field in self.fields):
+            self.integer_fields = [(bool(field[0]),) + field[1:4] for field in self.fields]
+        # cache of Frame.start_value_payload with the start values it was computed from
+        self.start_value_payload = None  # type: typing.Optional[bytes]
+        self.start_values = None  # type: typing.Optional[typing.List[typing.Tuple]]
+        self.names = [signal.name for signal in self.signals]
+        # first signal wins like in Frame.signal_by_name
+        self.indexes = {signal.name: index for index, signal in reversed(list(enumerate(self.signals)))}
+        # last multiplexer wins like in Frame.decode
+        self.multiplexer_index = None  # type: typing.Optional[int]
+        for index, signal in enumerate(self.signals):
+            if signal.is_multiplexer:
+                self.multiplexer_index = index
+
+    def _compile_field(self, signal):
+        # type: (Signal) -> typing.Optional[typing.Tuple[bool, int, int, int, typing.Optional[str], int]]
+        """Return (is_little_endian, shift, mask, sign_bit, float_format, byte_count) for the signal.
+
+        Returns None if the signal has to be handled by the bitstring functions.
+        """
+        start_bit = int(signal.start_bit)
+        size = int(signal.size)
+        bit_size = self.size * 8
+        if size <= 0 or start_bit < 0:
+            return None
+        if signal.is_little_endian:
+            shift = start_bit
+            if start_bit + size > bit_size:
+                return None
+        else:
+            shift = bit_size - start_bit - size
+            if shift < 0:
+                return None
+        float_format = None
+        sign_bit = 0
+        if signal.is_float:
+            float_format = self.float_formats.get(size)
+            if float_format is None:
+                return None
+        elif signal.is_signed:
+            sign_bit = 1 << (size - 1)
+        return signal.is_little_endian, shift, (1 << size) - 1, sign_bit, float_format, size // 8
+
+    def is_valid_for(self, frame):  # type: (Frame) -> bool
+        """Check if the codec still matches the signal list, the signal layouts and the size of the frame.
+
+        Changes are recorded when they happen (the codec is registered at the signals and the frame, see
+        Frame.codec), checking them costs the same for any number of signals.
+        """
+        signals = frame.signals
+        return not self.stale and self.signal_list is signals and self.changes == signals.changes
+
+    def unpack(self, data):
+        # type: (bytes) -> typing.List[canmatrix.types.RawValue]
+        """Return the raw values of all signals (same order like signals).
+
+        :param data: bytearray or iterable of ints with exactly `size` bytes.
+        """
+        if self.integer_fields is not None:
+            words = (int.from_bytes(data, "big"), int.from_bytes(data, "little"))
+            # (value ^ sign_bit) - sign_bit extends the sign of two's complement values, sign_bit 0 changes nothing
+            return [
+                (((words[is_little_endian] >> shift) & mask) ^ sign_bit) - sign_bit
+                for is_little_endian, shift, mask, sign_bit in self.integer_fields
+            ]
+        little = int.from_bytes(data, "little")
+        big = int.from_bytes(data, "big")
+        if self.needs_bitstrings:
+            little_bits, big_bits = Frame.bytes_to_bitstrings(data)
+        unpacked = []
+        for signal, field in zip(self.signals, self.fields):
+            if field is None:
+                unpacked += Frame.bitstring_to_signal_list([signal], big_bits, little_bits, self.size * 8)
+                continue
+            is_little_endian, shift, mask, sign_bit, float_format, byte_count = field
+            value = ((little if is_little_endian else big) >> shift) & mask
+            if float_format is not None:
+                value, = struct.unpack(float_format, value.to_bytes(byte_count, "big"))
+            elif value & sign_bit:
+                value -= sign_bit << 1
+            unpacked.append(value)
+        return unpacked
+
+    def unpack_signal(self, index, data, little, big):
+        # type: (int, bytes, int, int) -> canmatrix.types.RawValue
+        """Return the raw value of one signal.
+
+        :param int index: index of the signal in signals
+        :param data: bytearray with exactly `size` bytes
+        :param int little: data as little endian integer
+        :param int big: data as big endian integer
+        """
+        field = self.fields[index]
+        if field is None:
+            little_bits, big_bits = Frame.bytes_to_bitstrings(data)
+            return Frame.bitstring_to_signal_list([self.signals[index]], big_bits, little_bits, self.size * 8)[0]
+        is_little_endian, shift, mask, sign_bit, float_format, byte_count = field
+        value = ((little if is_little_endian else big) >> shift) & mask
+        if float_format is not None:
+            value, = struct.unpack(float_format, value.to_bytes(byte_count, "big"))
+        elif value & sign_bit:
+            value -= sign_bit << 1
+        return value
+
+    def pack(self, data):
+        # type: (typing.Mapping[str, canmatrix.types.RawValue]) -> bytearray
+        """Return a bytearray containing the raw values from data packed according to the layout.
+
+        Signals are ORed into one integer per byte order which is emitted with int.to_bytes.
+        Where signals overlap, later signals overwrite earlier ones and little endian bits win over big endian bits.
+
+        :param data: data dictionary of signal name : raw value (or value choice string)
+        """
+        values = []
+        for signal, field in zip(self.signals, self.fields):
+            if signal.name in data:
+                value = data[signal.name]
+                if isinstance(value, str):
+                    value = signal.phys2raw(value)
+                    if value is None:
+                        # TODO Error Handling
+                        value = 0
+                values.append((signal, field, value))
+
+        little = little_used = big = big_used = 0
+        for signal, field, value in values:
+            if field is None:
+                return self._pack_bitstrings(values)
+            is_little_endian, shift, mask, sign_bit, float_format, byte_count = field
+            if float_format is not None:
+                raw = int.from_bytes(struct.pack(float_format, value), "big")
+            else:
+                # same expression like pack_bitstring, which takes the lowest bits of it
+                raw = int(((mask + 1) << 1) + value)
+                if raw < 0:
+                    return self._pack_bitstrings(values)
+                raw &= mask
+            if is_little_endian:
+                little = (little & ~(mask << shift)) | (raw << shift)
+                little_used |= mask << shift
+            else:
+                big = (big & ~(mask << shift)) | (raw << shift)
+                big_used |= mask << shift
+
+        if little_used:
+            little = int.from_bytes(little.to_bytes(self.size, "little"), "big")
+            little_used = int.from_bytes(little_used.to_bytes(self.size, "little"), "big")
+            big = little | (big & ~little_used)
+        return bytearray(big.to_bytes(self.size, "big"))
+
+    def _pack_bitstrings(self, values):
+        # type: (typing.Sequence[typing.Tuple[Signal, typing.Any, canmatrix.types.RawValue]]) -> bytearray
+        """Pack raw values with the bitstring functions (signals not fitting the frame)."""
+        little_bits = [None] * (self.size * 8)  # type: typing.List[typing.Optional[str]]
+        big_bits = list(little_bits)
+        for signal, _, value in values:
+            bits = pack_bitstring(signal.size, signal.is_float, value, signal.is_signed)
+
+            if signal.is_little_endian:
+                least = self.size * 8 - signal.start_bit
+                most = least - signal.size
+
+                little_bits[most:least] = bits
+            else:
+                most = signal.start_bit
+                least = most + signal.size
+
+                big_bits[most:least] = bits
+        little_bits_iter = reversed(tuple(grouper(little_bits, 8)))
+        little_bits = list(itertools.chain(*little_bits_iter))
+        bitstring = ''.join(
+            next(x for x in (l, b, '0') if x is not None)
+            # l if l != ' ' else (b if b != ' ' else '0')
+            for l, b in zip(little_bits, big_bits)
+        )
+        return bytearray(
+            int(''.join(b), 2)
+            for b in grouper(bitstring, 8)
+        )
+
+
+@attr.s(on_setattr=_on_setattr)
 class ArbitrationId(object):
     standard_id_mask = ((1 << 11) - 1)
     extended_id_mask = ((1 << 29) - 1)
@@ -636,6 +1192,16 @@ class ArbitrationId(object):
     id = attr.ib(default=None)
     extended = attr.ib(default=False)  # type: bool
 
+    _indexes = None  # type: typing.Optional[typing.List[weakref.ref]]  # see _add_index
+    _changes = 0  # type: int  # see _on_setattr
+
+    def __getstate__(self):  # type: () -> typing.Dict[str, typing.Any]
+        """Pickle without the references to indexes and change count."""
+        state = self.__dict__.copy()
+        state.pop("_indexes", None)
+        state.pop("_changes", None)
+        return state
+
     def __attrs_post_init__(self):
         if self.extended is None:
             # Mimicking old behaviour for now -- remove in the future
@@ -889,7 +1455,7 @@ class Pdu(object):
         return None
 
 
-@attr.s(eq=False)
+@attr.s(eq=False, on_setattr=_on_setattr)
 class Frame(object):
     """
     Represents CAN Frame.
@@ -914,15 +1480,25 @@ class Frame(object):
     # mypy Unsupported converter:
     arbitration_id = attr.ib(converter=arbitration_id_converter, default=0)  # type: ArbitrationId
     size = attr.ib(default=0)  # type: int
-    transmitters = attr.ib(factory=list)  # type: typing.MutableSequence[str]
+    transmitters = attr.ib(
+        factory=_TrackedList, converter=_tracked_list, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableSequence[str]
     # extended = attr.ib(default=False)  # type: bool
     is_complex_multiplexed = attr.ib(default=False)  # type: bool
     is_fd = attr.ib(default=False)  # type: bool
     comment = attr.ib(default="")  # type: str
-    signals = attr.ib(factory=list)  # type: typing.MutableSequence[Signal]
-    mux_names = attr.ib(factory=dict)  # type: typing.MutableMapping[int, str]
-    attributes = attr.ib(factory=dict)  # type: typing.MutableMapping[str, typing.Any]
-    receivers = attr.ib(factory=list)  # type: typing.MutableSequence[str]
+    signals = attr.ib(
+        factory=_TrackedList, converter=_tracked_list, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableSequence[Signal]
+    mux_names = attr.ib(
+        factory=_TrackedDict, converter=_tracked_dict, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableMapping[int, str]
+    attributes = attr.ib(
+        factory=_TrackedDict, converter=_tracked_dict, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableMapping[str, typing.Any]
+    receivers = attr.ib(
+        factory=_TrackedList, converter=_tracked_list, on_setattr=_convert_on_setattr
+    )  # type: typing.MutableSequence[str]
     signalGroups = attr.ib(factory=list)  # type: typing.MutableSequence[SignalGroup]
 
     cycle_time = attr.ib(default=0)  # type: int
@@ -939,6 +1515,69 @@ class Frame(object):
 
     secOC_properties = attr.ib(default=None)  # type:  Optional[AutosarSecOCProperties]
 
+    _codec = attr.ib(
+        default=None, init=False, repr=False, on_setattr=attr.setters.NO_OP
+    )  # type: typing.Optional[FrameCodec]
+    _signal_index = attr.ib(
+        default=None, init=False, repr=False, on_setattr=attr.setters.NO_OP
+    )  # type: typing.Optional[NameIndex]
+
+    _indexes = None  # type: typing.Optional[typing.List[weakref.ref]]  # see _add_index
+    _changes = 0  # type: int  # see _on_setattr
+    _fingerprints = None  # type: typing.Optional[typing.Dict]
+
+    @property
+    def codec(self):  # type: () -> FrameCodec
+        """Precompiled codec of the frame.
+
+        The codec is cached and rebuilt if signals are added/removed/replaced,
+        the layout (start_bit, size, ...) of a signal or the frame size changes.
+        """
+        codec = self._codec
+        if codec is None or not codec.is_valid_for(self):
+            codec = self._codec = FrameCodec(self.signals, self.size)
+            _add_index(self, codec.ref)
+        return codec
+
+    def __getstate__(self):  # type: () -> typing.Dict[str, typing.Any]
+        """Pickle without codec, signal index, index references, change count and fingerprints, they are rebuilt on use."""
+        state = self.__dict__.copy()
+        state["_codec"] = None
+        state["_signal_index"] = None
+        state.pop("_indexes", None)
+        state.pop("_changes", None)
+        state.pop("_fingerprints", None)
+        return state
+
+    def invalidate_codec(self):  # type: () -> None
+        """Drop the cached codec, it is rebuilt on next use."""
+        self._codec = None
+
+    @property
+    def start_value_payload(self):  # type: () -> bytes
+        """Payload with the initial values of all signals (GenMsgStartValue of ARXML imports).
+
+        Multiplexed frames contain the signals selected by the initial value of the multiplexer.
+        The payload is cached with the codec and recomputed if initial values or scaling of the signals change.
+        """
+        codec = self.codec
+        start_values = list(map(codec.start_value_of, self.signals))
+        if codec.start_value_payload is None or codec.start_values != start_values:
+            raw_values = {}
+            for signal in self.signals:
+                value = signal.initial_value
+                try:
+                    if value == signal.offset and signal.min <= value <= signal.max:
+                        # most start values are 0: skip the scaling of phys2raw
+                        raw_values[signal.name] = 0
+                    else:
+                        raw_values[signal.name] = signal.phys2raw()
+                except AttributeError:
+                    raw_values[signal.name] = 0
+            codec.start_value_payload = bytes(self.encode(raw_values))
+            codec.start_values = start_values
+        return codec.start_value_payload
+
     @property
     def is_multiplexed(self):  # type: () -> bool
         """Frame is multiplexed if at least one of its signals is a multiplexer."""
@@ -1048,7 +1687,7 @@ class Frame(object):
         :param default: Default value if attribute doesn't exist.
         :return: Return the attribute value if found, else `default` or None
         """
-        if attribute_name in attr.fields_dict(type(self)):
+        if attribute_name in _field_names(type(self)):
             return getattr(self, attribute_name)
         if attribute_name in self.attributes:
             return self.attributes[attribute_name]
@@ -1179,10 +1818,9 @@ class Frame(object):
         :param str name: signal name to be found.
         :return: signal with given name or None if not found
         """
-        for signal in self.signals:
-            if signal.name == name:
-                return signal
-        return None
+        if self._signal_index is None or not self._signal_index.is_valid_for(self.signals):
+            self._signal_index = NameIndex(self.signals)
+        return self._signal_index.find(name)
 
     def glob_signals(self, glob_str):
         # type: (str) -> typing.Sequence[Signal]
@@ -1335,39 +1973,7 @@ class Frame(object):
         :return: A byte string of the packed values.
         """
 
-        little_bits = [None] * (self.size * 8)  # type: typing.List[typing.Optional[str]]
-        big_bits = list(little_bits)
-        for signal in self.signals:
-            if signal.name in data:
-                value = data.get(signal.name)
-                if isinstance(value, str):
-                    value = signal.phys2raw(value)
-                    if value is None:
-                        # TODO Error Handling
-                        value = 0
-                bits = pack_bitstring(signal.size, signal.is_float, value, signal.is_signed)
-
-                if signal.is_little_endian:
-                    least = self.size * 8 - signal.start_bit
-                    most = least - signal.size
-
-                    little_bits[most:least] = bits
-                else:
-                    most = signal.start_bit
-                    least = most + signal.size
-
-                    big_bits[most:least] = bits
-        little_bits_iter = reversed(tuple(grouper(little_bits, 8)))
-        little_bits = list(itertools.chain(*little_bits_iter))
-        bitstring = ''.join(
-            next(x for x in (l, b, '0') if x is not None)
-            # l if l != ' ' else (b if b != ' ' else '0')
-            for l, b in zip(little_bits, big_bits)
-        )
-        return bytearray(
-            int(''.join(b), 2)
-            for b in grouper(bitstring, 8)
-        )
+        return self.codec.pack(data)
 
     def encode(self, data=None):
         # type: (typing.Optional[typing.Mapping[str, typing.Any]]) -> bytes
@@ -1534,16 +2140,23 @@ class Frame(object):
                 offset += (pdu_dlc * 8)
             return return_dict
         else:
-            little, big = self.bytes_to_bitstrings(data)
-
-            unpacked = self.bitstring_to_signal_list(self.signals, big, little, self.size * 8)
+            codec = self.codec
+            signals = codec.signals
+            return dict(zip(codec.names, map(DecodedSignal, codec.unpack(data), signals)))
 
-            return_dict = dict()
+    def decode_batch(self, payloads, stride=None):
+        # type: (typing.Any, typing.Optional[int]) -> typing.Mapping[str, typing.Any]
+        """Return dictionary with Signal Name: canmatrix.batch.DecodedColumn (numpy arrays of raw and physical values)
+        decodes every signal in signal-list for all given payloads at once (support for multiplexed frames).
+        Values of signals not matching the muxgroup of a payload are masked. Needs numpy.
 
-            for s, v in zip(self.signals, unpacked):
-                return_dict[s.name] = DecodedSignal(v, s)
-
-            return return_dict
+        :param payloads: 2-D uint8 numpy array with one payload per row
+            or bytes like buffer with one record of `stride` bytes per payload
+        :param int stride: record length of buffer payloads, default is the frame size
+        :return: dictionary
+        """
+        import canmatrix.batch
+        return canmatrix.batch.decode_batch(self, payloads, stride)
 
     def _get_sub_multiplexer(self, parent_multiplexer_name, parent_multiplexer_value):
         """
@@ -1624,6 +2237,21 @@ class Frame(object):
         else:
             return decoded
 
+    def decode_view(self, data):  # type: (bytes) -> DecodedFrame
+        """Return DecodedFrame, a lazy mapping Signal Name: DecodedSignal (support for multiplexed frames)
+        which only extracts the signals which are accessed.
+
+        :param data: bytearray .
+            i.e. bytearray([0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8])
+        :return: DecodedFrame
+        """
+        if self.is_pdu_container:
+            raise DecodingConatainerPdu("Lazy decoding of container PDUs is not supported")
+        if len(data) != self.size:
+            # let unpack report the wrong length
+            self.unpack(data)
+        return DecodedFrame(self, data)
+
     def _compress_little(self):
         for signal in self.signals:
             if not signal.is_little_endian:
@@ -1684,6 +2312,64 @@ class Frame(object):
             if signal.multiplex is not None:
                 signal.muxer_for_signal = multiplexor.name
 
+    def fingerprint(self, ignore_comments=False, ignore_attributes=False):  # type: (bool, bool) -> str
+        """Return a stable hash (SHA-256 hex digest) of the frame content.
+
+        The hash covers name, arbitration id, size, flags, transmitters, receivers, signal groups,
+        PDUs, attributes and the content of all signals (like Signal.fingerprint).
+        It is cached until the frame or any of its signals changes.
+
+        :param bool ignore_comments: leave the comments of the frame and its signals out
+        :param bool ignore_attributes: leave the user defined attributes of the frame and its signals out
+        :rtype: str
+        """
+        def signal_contents(signals):  # type: (typing.Iterable[Signal]) -> typing.Tuple
+            # one hash for the frame, digests of all signals cost more than their content
+            return tuple([signal._content(ignore_comments, ignore_attributes) for signal in signals])
+
+        def signal_groups(groups):  # type: (typing.Iterable[SignalGroup]) -> typing.Tuple
+            return tuple(
+                (group.name, group.id, tuple(signal.name for signal in group.signals),
+                 group.e2e_properties, group.secOC_properties)
+                for group in groups
+            )
+
+        # endpoints, SecOC properties, signal groups and PDUs change without being counted, they are compared
+        if self.endpoints is not None or self.secOC_properties is not None or self.signalGroups or self.pdus:
+            untracked = (
+                self.endpoints, self.secOC_properties, signal_groups(self.signalGroups),
+                tuple(
+                    (pdu.name, pdu.size, pdu.id, pdu.triggering_name, pdu.pdu_type, pdu.port_type, pdu.cycle_time,
+                     signal_contents(pdu.signals), signal_groups(pdu.signalGroups))
+                    for pdu in self.pdus
+                ),
+            )  # type: typing.Tuple
+            untracked_version = repr(_canonical(untracked))  # type: typing.Optional[str]
+        else:
+            untracked = (None, None, (), ())
+            untracked_version = None
+
+        def content():  # type: () -> typing.Tuple
+            endpoints, secoc_properties, groups, pdus = untracked
+            result = (
+                self.name, self.arbitration_id.id, self.arbitration_id.extended, self.size, self.transmitters,
+                self.receivers, self.is_complex_multiplexed, self.is_fd, self.is_j1939, self.cycle_time,
+                self.mux_names, self.pdu_name, self.header_id, endpoints, secoc_properties,
+                signal_contents(self.signals), groups, pdus,
+            )  # type: typing.Tuple
+            if not ignore_comments:
+                result += (self.comment,)
+            if not ignore_attributes:
+                result += (self.attributes,)
+            return result
+
+        version = (
+            self._changes, self.arbitration_id._changes, self.signals.changes, self.transmitters.changes,
+            self.receivers.changes, self.mux_names.changes, self.attributes.changes,
+            untracked_version, tuple([signal._version() for signal in self.signals]),
+        )
+        return _cached_fingerprint(self, (ignore_comments, ignore_attributes), version, content)
+
     def __str__(self):  # type: () -> str
         """Represent the frame by its name only."""
         return self.name  # add more details than the name only?
@@ -1765,6 +2451,199 @@ class Define(object):
             return
         self.definition = 'ENUM "' + '","' .join(self.values) +'"'
 
+class NameIndex(object):
+    """
+    Dictionary of the objects of a list by their name, used for fast lookups by name.
+
+    If several objects have the same name the first one in the list is found, like a linear search would.
+    The index is rebuilt if the list (a _TrackedList) changes or an object of the list is renamed.
+    """
+
+    keys = frozenset(["name"])  # attributes of the indexed objects, see _on_setattr
+
+    def __init__(self, items):  # type: (_TrackedList) -> None
+        self.items = items
+        self.changes = items.changes
+        self.stale = False
+        # indexed objects reference the index weakly, see _on_setattr
+        self.ref = weakref.ref(self)
+        self.by_name = dict()  # type: typing.Dict[str, typing.Any]
+        for item in reversed(items):
+            _add_index(item, self.ref)
+            self.by_name[item.name] = item
+
+    def is_valid_for(self, items):  # type: (_TrackedList) -> bool
+        return not self.stale and self.items is items and self.changes == items.changes
+
+    def find(self, name):  # type: (str) -> typing.Any
+        return self.by_name.get(name)
+
+
+class MatrixIndex(object):
+    """
+    Dictionaries of the frames and ECUs of a CanMatrix for O(1) lookups.
+
+    Frames are indexed by name, id, (id, extended), J1939 PGN and header_id; ECUs by name.
+    If several frames share a key the first one in the frame list is found, like a linear search would.
+    The index is extended by CanMatrix.add_frame/add_ecu. It is rebuilt if the frame or ECU list (both
+    _TrackedList) is changed directly or if a key (Frame name/arbitration_id/header_id, ArbitrationId id/extended,
+    Ecu name) of an object of this index changes. Checking this costs the same for any number of frames.
+    """
+
+    keys = frozenset(["name", "arbitration_id", "header_id", "id", "extended"])  # see _on_setattr
+
+    def __init__(self, frames, ecus):
+        # type: (_TrackedList, _TrackedList) -> None
+        self.frames = frames
+        self.ecus = ecus
+        self.stale = False
+        # indexed objects reference the index weakly, it is dropped with its matrix
+        self.ref = weakref.ref(self)
+        # changes of the lists this index is up to date with
+        self.frame_changes = frames.changes
+        self.ecu_changes = ecus.changes
+        self.frames_by_name = dict()  # type: typing.Dict[str, Frame]
+        self.frames_by_id = dict()  # type: typing.Dict[int, Frame]
+        self.frames_by_id_extended = dict()  # type: typing.Dict[typing.Tuple[int, bool], Frame]
+        self.frames_by_pgn = dict()  # type: typing.Dict[int, Frame]
+        self.frames_by_header_id = dict()  # type: typing.Dict[typing.Any, Frame]
+        self.ecus_by_name = dict()  # type: typing.Dict[str, Ecu]
+        self.ecus_by_stripped_name = dict()  # type: typing.Dict[str, Ecu]
+        for frame in frames:
+            self.add_frame(frame)
+        for ecu in ecus:
+            self.add_ecu(ecu)
+
+    def is_valid_for(self, frames, ecus):
+        # type: (_TrackedList, _TrackedList) -> bool
+        return (
+            not self.stale and self.frames is frames and self.ecus is ecus
+            and self.frame_changes == frames.changes and self.ecu_changes == ecus.changes
+        )
+
+    def add_frame(self, frame):  # type: (Frame) -> None
+        """Index frame, which was appended to the frame list."""
+        arbitration_id = frame.arbitration_id
+        _add_index(frame, self.ref)
+        _add_index(arbitration_id, self.ref)
+        self.frame_changes = self.frames.changes
+        self.frames_by_name.setdefault(frame.name, frame)
+        self.frames_by_header_id.setdefault(frame.header_id, frame)
+        self.frames_by_id.setdefault(arbitration_id.id, frame)
+        if arbitration_id.extended is None:
+            # matches standard and extended ids, see ArbitrationId.__eq__
+            extended_values = (False, True)
+        else:
+            extended_values = (bool(arbitration_id.extended),)
+        for extended in extended_values:
+            self.frames_by_id_extended.setdefault((arbitration_id.id, extended), frame)
+        if arbitration_id.extended:
+            self.frames_by_pgn.setdefault(arbitration_id.pgn, frame)
+
+    def add_ecu(self, ecu):  # type: (Ecu) -> None
+        """Index ecu, which was appended to the ECU list."""
+        _add_index(ecu, self.ref)
+        self.ecu_changes = self.ecus.changes
+        self.ecus_by_name.setdefault(ecu.name, ecu)
+        self.ecus_by_stripped_name.setdefault(ecu.name.strip(), ecu)
+
+    def frame_by_id(self, arbitration_id):  # type: (ArbitrationId) -> typing.Optional[Frame]
+        if arbitration_id.extended is None:
+            return self.frames_by_id.get(arbitration_id.id)
+        return self.frames_by_id_extended.get((arbitration_id.id, bool(arbitration_id.extended)))
+
+
+_plain_types = frozenset((str, int, bool, type(None), bytes))
+_number_types = (float, decimal.Decimal, fractions.Fraction)
+_float_types = frozenset(_number_types)
+_container_types = frozenset((list, tuple, dict, _TrackedList, _TrackedDict))
+_first = operator.itemgetter(0)
+
+
+@functools.lru_cache(maxsize=1 << 16)  # limits, offsets and factors of a large matrix
+def _canonical_number(number):  # type: (typing.Any) -> typing.Union[int, decimal.Decimal]
+    """Return number independent of its type: 1, 1.0 and Decimal("1.00") are 1, 0.5 is Decimal("0.5")."""
+    if type(number) is not decimal.Decimal:
+        number = convert_number(number, decimal.Decimal)
+    if number.is_finite() and number == number.to_integral_value():
+        return int(number)
+    return number.normalize()
+
+
+@functools.lru_cache(maxsize=None)
+def _canonical_kind(value_type):  # type: (type) -> str
+    """Return how _canonical converts values of value_type, isinstance of the abstract Mapping is slow."""
+    if issubclass(value_type, _number_types):
+        return "number"
+    if issubclass(value_type, (dict, collections.abc.Mapping)):
+        return "mapping"
+    if issubclass(value_type, (list, tuple)):
+        return "sequence"
+    if attr.has(value_type):
+        return "attrs"
+    return "other"
+
+
+def _canonical(value):  # type: (typing.Any) -> typing.Any
+    """Return value in a form with a stable repr for fingerprints.
+
+    Mappings become tuples of their items sorted by key, other sequences tuples and attrs objects
+    (class name, items). Numbers are independent of the float_factory: 1, 1.0 and Decimal("1.00") are the same.
+    """
+    value_type = type(value)
+    if value_type in _plain_types:
+        return value
+    kind = _canonical_kind(value_type)
+    if kind == "number":
+        return _canonical_number(value)
+    if kind == "sequence":
+        # inlined for the items of fingerprint contents: numbers of the float_factory, empty containers
+        return tuple([
+            item if (item_type := type(item)) in _plain_types
+            else _canonical_number(item) if item_type in _float_types
+            else () if item_type in _container_types and not item
+            else _canonical(item)
+            for item in value
+        ])
+    if kind == "mapping":
+        if not value:
+            return ()
+        items = [
+            (key if type(key) in _plain_types else _canonical(key), item if type(item) in _plain_types else _canonical(item))
+            for key, item in value.items()
+        ]
+        try:
+            items.sort(key=_first)
+        except TypeError:  # keys of different types
+            items.sort(key=repr)
+        return tuple(items)
+    if kind == "attrs":
+        return value_type.__name__, _canonical(attr.asdict(value, recurse=False))
+    return value
+
+
+def _cached_fingerprint(owner, options, version, content):
+    # type: (typing.Any, typing.Tuple[bool, bool], typing.Any, typing.Callable[[], typing.Tuple]) -> str
+    """Return the SHA-256 hex digest of the content of owner (Signal, Frame, Ecu or CanMatrix).
+
+    The digest is cached in owner per options with the version of owner it was computed from. The version
+    counts changes where the classes can (see _on_setattr and _TrackedList) and contains the rest in canonical form.
+    Checking the cache costs building the version, content is only called to compute a new digest.
+    """
+    fingerprints = owner._fingerprints
+    if fingerprints is not None:
+        cached = fingerprints.get(options)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    digest = hashlib.sha256(repr(_canonical(content())).encode("utf-8")).hexdigest()
+    if fingerprints is None:
+        fingerprints = {}
+        # object.__setattr__ skips the on_setattr hooks, copies don't share it (see __getstate__)
+        object.__setattr__(owner, "_fingerprints", fingerprints)
+    fingerprints[options] = (version, digest)
+    return digest
+
+
 import enum
 
 
@@ -1789,12 +2668,15 @@ class CanMatrix(object):
 
     type = attr.ib(default=matrix_class.CAN)  #type: matrix_class
     attributes = attr.ib(factory=dict)  # type: typing.MutableMapping[str, typing.Any]
-    ecus = attr.ib(factory=list)  # type: typing.MutableSequence[Ecu]
-    frames = attr.ib(factory=list)  # type: typing.MutableSequence[Frame]
+    ecus = attr.ib(
+        factory=_TrackedList, converter=_tracked_list, on_setattr=attr.setters.convert
+    )  # type: typing.MutableSequence[Ecu]
+    frames = attr.ib(
+        factory=_TrackedList, converter=_tracked_list, on_setattr=attr.setters.convert
+    )  # type: typing.MutableSequence[Frame]
 
     frames_dict_name = attr.ib(factory=dict)  # type: typing.MutableSequence[Frame]
     frames_dict_id = attr.ib(factory=dict)  # type: typing.MutableSequence[Frame]
-    _frames_dict_id_extend = {}
     signal_defines = attr.ib(factory=dict)  # type: typing.MutableMapping[str, Define]
     frame_defines = attr.ib(factory=dict)  # type: typing.MutableMapping[str, Define]
     global_defines = attr.ib(factory=dict)  # type: typing.MutableMapping[str, Define]
@@ -1807,11 +2689,58 @@ class CanMatrix(object):
     fd_baudrate = attr.ib(default=0)  # type:int
     vlan = attr.ib(default=None)  # type:int
     load_errors = attr.ib(factory=list)  # type: typing.MutableSequence[Exception]
+    _index = attr.ib(default=None, init=False, repr=False)  # type: typing.Optional[MatrixIndex]
+    _fingerprints = None  # type: typing.Optional[typing.Dict]
 
     def __iter__(self):  # type: () -> typing.Iterator[Frame]
         """Matrix iterates over Frames (Messages)."""
         return iter(self.frames)
 
+    def __getstate__(self):  # type: () -> typing.Dict[str, typing.Any]
+        """Pickle without the lookup index and fingerprints, they are rebuilt on use."""
+        state = self.__dict__.copy()
+        state["_index"] = None
+        state.pop("_fingerprints", None)
+        return state
+
+    @property
+    def index(self):  # type: () -> MatrixIndex
+        """Lookup index of frames and ECUs, built on first use and kept up to date, see MatrixIndex."""
+        if self._index is None or not self._index.is_valid_for(self.frames, self.ecus):
+            self._index = MatrixIndex(self.frames, self.ecus)
+        return self._index
+
+    def fingerprint(self, ignore_comments=False, ignore_attributes=False):  # type: (bool, bool) -> str
+        """Return a stable hash (SHA-256 hex digest) of the matrix content.
+
+        The hash covers the fingerprints of all frames and ECUs (see Frame.fingerprint and Ecu.fingerprint),
+        value tables, environment variables, baudrates and, with attributes, the global attributes and all defines.
+        The hash is cached, checking it costs the cached fingerprints of the frames, ECUs and signals and
+        the other content in canonical form.
+
+        :param bool ignore_comments: leave all comments out
+        :param bool ignore_attributes: leave all user defined attributes and defines out
+        :rtype: str
+        """
+        content = (
+            self.type, self.baudrate, self.fd_baudrate, self.vlan,
+            tuple([frame.fingerprint(ignore_comments, ignore_attributes) for frame in self.frames]),
+            tuple([ecu.fingerprint(ignore_comments, ignore_attributes) for ecu in self.ecus]),
+            tuple([signal.fingerprint(ignore_comments, ignore_attributes) for signal in self.signals]),
+            self.value_tables, self.env_vars,
+        )  # type: typing.Tuple
+        if not ignore_attributes:
+            content += (self.attributes,) + tuple(
+                {name: (define.definition, define.defaultValue) for name, define in defines.items()}
+                for defines in (
+                    self.signal_defines, self.frame_defines, self.ecu_defines, self.global_defines, self.env_defines
+                )
+            )
+        # the matrix counts no changes, its version is its content, the rest compared as repr (1 is not True)
+        canonical = _canonical(content)
+        version = canonical[4:7] + (repr(canonical[:4] + canonical[7:]),)
+        return _cached_fingerprint(self, (ignore_comments, ignore_attributes), version, lambda: canonical)
+
     def add_env_var(self, name, envVarDict):  # type: (str, typing.MutableMapping) -> None
         self.env_vars[name] = envVarDict
 
@@ -1822,6 +2751,21 @@ class CanMatrix(object):
                 self.env_vars[env_name]["attributes"] = dict()
             self.env_vars[env_name]["attributes"][attribute_name] = attribute_value
 
+    def set_float_factory(self, float_factory):
+        # type: (typing.Callable[[typing.Any], canmatrix.types.PhysicalValue]) -> None
+        """Set the number type of all signals (see Signal.set_float_factory).
+
+        i.e. float for fast decoding and encoding, decimal.Decimal (default) for exact export.
+
+        :param float_factory: number type, i.e. float, fractions.Fraction or decimal.Decimal
+        """
+        for frame in self.frames:
+            for signal in frame.signals:
+                signal.set_float_factory(float_factory)
+            for pdu in frame.pdus:
+                for signal in pdu.signals:
+                    signal.set_float_factory(float_factory)
+
     @property
     def contains_fd(self):  # type: () -> bool
         for frame in self.frames:
@@ -1986,17 +2930,7 @@ class CanMatrix(object):
         :param ArbitrationId arbitration_id: Frame id as canmatrix.ArbitrationId
         :rtype: Frame or None
         """
-        hash_name = f"{arbitration_id.id}_{arbitration_id.extended}"
-        
-        frame = self._frames_dict_id_extend.get(hash_name, None)
-        if frame is not None:
-            return frame
-        for frame in self.frames:
-            if frame.arbitration_id == arbitration_id:
-                # found ID while ignoring extended or standard
-                self._frames_dict_id_extend[hash_name] = frame
-                return frame
-        return None
+        return self.index.frame_by_id(arbitration_id)
 
     def frame_by_header_id(self, header_id):  # type: (HeaderId) -> typing.Union[Frame, None]
         """Get Frame by its Header id.
@@ -2004,10 +2938,7 @@ class CanMatrix(object):
         :param HeaderId header_id: Header id as canmatrix.header_id
         :rtype: Frame or None
         """
-        for test in self.frames:
-            if test.header_id == header_id:
-                return test
-        return None
+        return self.index.frames_by_header_id.get(header_id)
 
     def get_frame_by_id(self, id: int
                         ) -> typing.Union[Frame, None]:
@@ -2025,13 +2956,9 @@ class CanMatrix(object):
         :param int pgn: pgn to search for
         :rtype: Frame or None
         """
-
-        for test in self.frames:
-            if test.arbitration_id.pgn == canmatrix.ArbitrationId.from_pgn(pgn).pgn:
-                # canmatrix.ArbitrationId.from_pgn(pgn).pgn instead
-                # of just pgn is needed to do the pf >= 240 check
-                return test
-        return None
+        # canmatrix.ArbitrationId.from_pgn(pgn).pgn instead
+        # of just pgn is needed to do the pf >= 240 check
+        return self.index.frames_by_pgn.get(canmatrix.ArbitrationId.from_pgn(pgn).pgn)
 
     def frame_by_name(self, name):  # type: (str) -> typing.Union[Frame, None]
         """Get Frame by name.
@@ -2039,10 +2966,7 @@ class CanMatrix(object):
         :param str name: Frame name to search for
         :rtype: Frame or None
         """
-        for test in self.frames:
-            if test.name == name:
-                return test
-        return None
+        return self.index.frames_by_name.get(name)
 
     def get_frame_by_name(self, name):  # type: (str) -> typing.Union[Frame, None]
         """Get Frame by name.
@@ -2072,10 +2996,7 @@ class CanMatrix(object):
         :param str name: BoardUnit name
         :rtype: Ecu or None
         """
-        for test in self.ecus:
-            if test.name == name:
-                return test
-        return None
+        return self.index.ecus_by_name.get(name)
 
     def glob_ecus(self, globStr):  # type: (str) -> typing.List[Ecu]
         """
@@ -2096,8 +3017,12 @@ class CanMatrix(object):
         :param Frame frame: Frame to add
         :return: the inserted Frame
         """
+        index = self._index
+        if index is not None and not index.is_valid_for(self.frames, self.ecus):
+            index = None
         self.frames.append(frame)
-        self._frames_dict_id_extend = {}
+        if index is not None:
+            index.add_frame(frame)
         self.frames_dict_name[frame.name] = frame
         if frame.header_id:
             self.frames_dict_id[frame.header_id] = frame
@@ -2112,7 +3037,6 @@ class CanMatrix(object):
         :param Frame frame: frame to remove from CAN Matrix
         """
         self.frames.remove(frame)
-        self._frames_dict_id_extend = {}
 
     def add_signal(self, signal):  # type: (Signal) -> Signal
         """
@@ -2203,11 +3127,11 @@ class CanMatrix(object):
 
         :param Ecu ecu: ECU name to add
         """
-        for bu in self.ecus:
-            if bu.name.strip() == ecu.name:
-                return
+        index = self.index
+        if ecu.name in index.ecus_by_stripped_name:
+            return
         self.ecus.append(ecu)
-        self._frames_dict_id_extend = {}
+        index.add_ecu(ecu)
 
 
     def del_ecu(self, ecu_or_glob):  # type: (typing.Union[Ecu, str]) -> None
@@ -2229,13 +3153,16 @@ class CanMatrix(object):
 
     def update_ecu_list(self):  # type: () -> None
         """Check all Frames and add unknown ECUs to the Matrix ECU list."""
+        known_names = self.index.ecus_by_stripped_name  # add_ecu checks again, this only saves creating Ecus
         for frame in self.frames:
             for transmit_ecu in frame.transmitters:
-                self.add_ecu(Ecu(transmit_ecu))
+                if transmit_ecu not in known_names:
+                    self.add_ecu(Ecu(transmit_ecu))
             frame.update_receiver()
             for signal in frame.signals:
                 for receive_ecu in signal.receivers:
-                    self.add_ecu(Ecu(receive_ecu))
+                    if receive_ecu not in known_names:
+                        self.add_ecu(Ecu(receive_ecu))
 
     def rename_frame(self, frame_or_name, new_name):  # type: (typing.Union[Frame,str], str) -> None
         """Rename Frame.
@@ -2379,7 +3306,6 @@ class CanMatrix(object):
                 else:
                     logger.error(
                         "Name Conflict, could not copy/merge EnvVar " + envVar)
-        self._frames_dict_id_extend = {}
 
     def set_fd_type(self) -> None:
         """Try to guess and set the CAN type for every frame.
@@ -2434,6 +3360,24 @@ class CanMatrix(object):
         else:
             return {}
 
+    def iter_decode(self, messages, frame_glob="*", signal_glob="*", skip_unknown=True):
+        # type: (typing.Any, typing.Union[str, typing.Sequence[str]], typing.Union[str, typing.Sequence[str]], bool) -> typing.Iterator[canmatrix.stream.DecodedMessage]
+        """Decode a stream of raw messages, yield canmatrix.stream.DecodedMessage (timestamp, frame, raw values)
+        (support for multiplexed frames, J1939 frames are found like in decode).
+
+        Every id is resolved only once, the frame codecs are reused for all messages of the stream.
+        The matrix must not be changed while iterating.
+
+        :param messages: iterable of python-can messages or (timestamp, arbitration_id, data) tuples,
+            or a bytes like buffer of packed records (see canmatrix.stream)
+        :param frame_glob: glob or list of globs, only frames with matching names are decoded
+        :param signal_glob: glob or list of globs, only signals with matching names are decoded
+        :param bool skip_unknown: skip messages with unknown ids, otherwise they are yielded with frame None
+        :return: iterator of canmatrix.stream.DecodedMessage
+        """
+        import canmatrix.stream
+        return canmatrix.stream.StreamDecoder(self, frame_glob, signal_glob, skip_unknown).iter_decode(messages)
+
     def enum_attribs_to_values(self):  # type: () -> None
         for define in self.ecu_defines:
             if self.ecu_defines[define].type == "ENUM":
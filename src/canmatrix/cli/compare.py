@@ -96,7 +96,7 @@ def cli_compare(matrix1, matrix2, verbosity, silent, check_comments, check_attri
     else:
         # ignore["ATTRIBUTE"] = "*"
         # ignore["DEFINE"] = "*"
-        obj = canmatrix.compare.compare_db(db1, db2, ignore)
+        obj = canmatrix.compare.compare_db(db1, db2, ignore, skip_equal_frames=True)
         canmatrix.compare.dump_result(obj)
     return 0
 
@@ -92,6 +92,9 @@ Example --signalNameFromAttrib SysSignalName\nARXML known Attributes: SysSignalN
 
 # arxml switches
 @click.option('--arxmlIgnoreClusterInfo/--no-arxmlIgnoreClusterInfo', 'arxmlIgnoreClusterInfo', default=False, help="Ignore any can cluster info from arxml; Import all frames in one matrix\ndefault False")
+@click.option('--arxmlStreaming/--no-arxmlStreaming', 'arxmlStreaming', default=False, help="Import arxml with bounded memory: only CAN relevant elements are kept while reading\ndefault False")
+@click.option('--arxmlStartValues/--no-arxmlStartValues', 'arxmlStartValues', default=True, help="Set the GenMsgStartValue attribute of the imported arxml frames\ndefault True")
+@click.option('--arxmlWorkers', 'arxmlWorkers', default=1, help="Decode the CAN clusters of an arxml in this many processes\ndefault 1")
 @click.option('--arxmlExportVersion', 'arVersion',  default="4.1.0", help="Set output AUTOSAR version\ncurrently only 3.2.3 and 4.1.0 are supported\ndefault 4.1.0")
 @click.option('--arxmlFlexray/--no-arxmlFlexray', 'decode_flexray', default = False, help="EXPERIMENTAL: import basic flexray data from ARXML")
 @click.option('--arxmlEthernet/--no-arxmlEthernet', 'decode_ethernet', default = False, help="EXPERIMENTAL: import basic ethernet data from ARXML")
@@ -122,11 +125,16 @@ Example --signalNameFromAttrib SysSignalName\nARXML known Attributes: SysSignalN
 @click.option('--jsonExportAll/--no-jsonExportAll', 'jsonExportAll', default=False, help="Export more data to json format")
 @click.option('--jsonMotorolaBitFormat', 'jsonMotorolaBitFormat', default="lsb", help="Json format: startbit of motorola signals\nValid values: msb, lsb, msbreverse\n default lsb")
 @click.option('--jsonNativeTypes/--no-jsonNativeTypes', 'jsonNativeTypes', default=False, help="Uses native json representation for decimals instead of string.")
+@click.option('--jsonFragments/--no-jsonFragments', 'jsonFragments', default=False, help="Write json as one file per frame into a directory named like the export file without extension\ndefault False")
 #sym switches
 @click.option('--symExportEncoding', 'symExportEncoding', default="iso-8859-1", help="Export charset of sym format, maybe utf-8\ndefault iso-8859-1")
 #eds switches
 @click.option('--edsImportEncoding', 'edsImportEncoding', default="iso-8859-1", help="Import charset of EDS format\ndefault iso-8859-1")
 @click.option('--edsNode', 'eds_node_id', default=1, help="Node-Id for EDS format\ndefault 1")
+# delta export switches
+@click.option('--baseline', 'baseline', help="Write only outputs which changed since baseline: a matrix file or a manifest written by --manifest")
+@click.option('--manifest', 'manifest', help="Fingerprint manifest of the export: the baseline if the file exists, rewritten after the export")
+@click.option('--changes', 'changes', help="Write the changed frames, ECUs and defines and the written and removed files as json")
 # in and out file
 @click.argument('infile', required=True)
 @click.argument('outfile', required=True)
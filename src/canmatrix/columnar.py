@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar export of decoded traces, partitioned by frame.
+
+Every frame gets one file with a timestamp column, one column per signal (physical value) and
+optionally one label column per signal with a value table. Rows are buffered per frame and flushed
+in row groups, so memory stays bounded for long recordings.
+
+File formats:
+
+* parquet: needs pyarrow (see extra "parquet"), the signal definitions are stored as field metadata
+* csv: pure python fallback
+
+In both cases the schema of all partitions is written to schema.json. Files are named after the frames
+(see canmatrix.utils.safe_file_name), schema.json maps the frame names to the files.
+At most max_open_files files are open at the same time, the least recently written one is closed if another
+one is needed. Csv files are reopened for appending, parquet files can't be appended to: the next row groups
+go to another file of the partition (<frame>_part2.parquet, ...).
+"""
+
+import collections
+import csv
+import fnmatch
+import io
+import json
+import os
+import typing
+
+import attr
+
+import canmatrix
+import canmatrix.stream
+import canmatrix.utils
+
+label_suffix = "_label"
+
+
+def default_file_format():  # type: () -> str
+    """Return parquet if pyarrow is available, csv otherwise."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "csv"
+    return "parquet"
+
+
+def signal_columns(signal, with_labels=True):
+    # type: (canmatrix.Signal, bool) -> typing.List[typing.Dict[str, typing.Any]]
+    """Return the column descriptions of a signal, derived from the signal definition.
+
+    The physical value is an integer column (int64 or uint64) if the scaling is the identity,
+    otherwise a float64 column.
+    """
+    if signal.is_float or signal.factor != 1 or signal.offset != 0:
+        column_type = "float64"
+    else:
+        column_type = "int64" if signal.is_signed else "uint64"
+    columns = [{
+        "name": signal.name,
+        "type": column_type,
+        "signal": signal.name,
+        "unit": signal.unit,
+        "factor": str(signal.factor),
+        "offset": str(signal.offset),
+        "is_float": signal.is_float,
+        "is_signed": signal.is_signed,
+    }]
+    if with_labels and signal.values and not signal.is_float:
+        columns.append({"name": signal.name + label_suffix, "type": "string", "signal": signal.name})
+    return columns
+
+
+def frame_columns(frame, signal_globs=("*",), with_labels=True):
+    # type: (canmatrix.Frame, typing.Sequence[str], bool) -> typing.List[typing.Dict[str, typing.Any]]
+    """Return the column descriptions of a frame partition (timestamp and the matching signals)."""
+    columns = [{"name": "timestamp", "type": "float64"}]
+    for signal in frame.signals:
+        if any(fnmatch.fnmatchcase(signal.name, glob) for glob in signal_globs):
+            columns += signal_columns(signal, with_labels)
+    return columns
+
+
+class CsvSink(object):
+    """Writes row groups of one partition as csv file."""
+
+    appendable = True
+
+    def __init__(self, columns):  # type: (typing.List[typing.Dict[str, typing.Any]]) -> None
+        self.columns = columns
+        self.file = None  # type: typing.Optional[typing.TextIO]
+
+    @property
+    def is_open(self):  # type: () -> bool
+        return self.file is not None
+
+    def open(self, path, append=False):  # type: (str, bool) -> None
+        """Open the file, a new file starts with the header row."""
+        self.file = io.open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file, lineterminator="\n")
+        if not append:
+            self.writer.writerow([column["name"] for column in self.columns])
+
+    def write(self, values):  # type: (typing.List[typing.List[typing.Any]]) -> None
+        self.writer.writerows(zip(*values))
+
+    def close(self):  # type: () -> None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ParquetSink(object):
+    """Writes row groups of one partition as parquet file (needs pyarrow)."""
+
+    appendable = False
+
+    def __init__(self, columns):  # type: (typing.List[typing.Dict[str, typing.Any]]) -> None
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        types = {
+            "float64": pyarrow.float64(),
+            "int64": pyarrow.int64(),
+            "uint64": pyarrow.uint64(),
+            "string": pyarrow.string(),
+        }
+        self.schema = pyarrow.schema([
+            pyarrow.field(
+                column["name"],
+                types[column["type"]],
+                metadata={key: str(value) for key, value in column.items() if key not in ("name", "type")},
+            )
+            for column in columns
+        ])
+        self.writer = None  # type: typing.Any
+
+    @property
+    def is_open(self):  # type: () -> bool
+        return self.writer is not None
+
+    def open(self, path, append=False):  # type: (str, bool) -> None
+        """Open a new file, parquet files can't be appended to."""
+        import pyarrow.parquet
+
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, values):  # type: (typing.List[typing.List[typing.Any]]) -> None
+        arrays = [self.pyarrow.array(column, type=field.type) for column, field in zip(values, self.schema)]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):  # type: () -> None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+sinks = {
+    "csv": CsvSink,
+    "parquet": ParquetSink,
+}
+
+
+@attr.s
+class FramePartition(object):
+    """
+    Column buffers of one frame.
+
+    * converters: per signal (name, factor, offset, integer column, labels or None)
+    * values: one list per column, the first column holds the timestamps
+    * file_stem: file name of the partition without extension
+    * files: names of the files written so far, see ColumnarWriter
+    """
+    frame = attr.ib()  # type: canmatrix.Frame
+    columns = attr.ib()  # type: typing.List[typing.Dict[str, typing.Any]]
+    sink = attr.ib()  # type: typing.Any
+    file_stem = attr.ib(default="")  # type: str
+    files = attr.ib(factory=list)  # type: typing.List[str]
+    converters = attr.ib(factory=list)  # type: typing.List[typing.Tuple[str, float, float, bool, typing.Optional[typing.Dict[int, str]]]]
+    values = attr.ib(factory=list)  # type: typing.List[typing.List[typing.Any]]
+
+    def __attrs_post_init__(self):  # type: () -> None
+        labels = {column["signal"] for column in self.columns if column["type"] == "string"}
+        for column in self.columns[1:]:
+            if column["type"] == "string":
+                continue
+            signal = self.frame.signal_by_name(column["signal"])
+            self.converters.append((
+                signal.name,
+                float(signal.factor),
+                float(signal.offset),
+                column["type"] != "float64",
+                dict(signal.values) if signal.name in labels else None,
+            ))
+        self.values = [[] for _ in self.columns]
+
+    @property
+    def rows(self):  # type: () -> int
+        return len(self.values[0])
+
+    def append(self, timestamp, raw_values):
+        # type: (float, typing.Mapping[str, canmatrix.types.RawValue]) -> None
+        """Append one row, signals missing in raw_values (i.e. other multiplexer values) are null."""
+        values = self.values
+        values[0].append(timestamp)
+        column = 1
+        for name, factor, offset, integer, labels in self.converters:
+            raw_value = raw_values.get(name)
+            if raw_value is None:
+                values[column].append(None)
+            elif integer:
+                values[column].append(raw_value)
+            else:
+                values[column].append(raw_value * factor + offset)
+            column += 1
+            if labels is not None:
+                values[column].append(None if raw_value is None else labels.get(raw_value))
+                column += 1
+
+    def flush(self):  # type: () -> None
+        """Write the buffered rows as one row group."""
+        if self.rows:
+            self.sink.write(self.values)
+            self.values = [[] for _ in self.columns]
+
+
+class ColumnarWriter(object):
+    """
+    Writes decoded messages (canmatrix.stream.DecodedMessage) into one file per frame.
+
+    :param str directory: output directory, created if missing
+    :param int row_group_size: rows buffered per frame before they are flushed
+    :param str file_format: parquet or csv, default: parquet if pyarrow is available
+    :param signal_glob: glob or list of globs, only matching signals get columns
+    :param bool with_labels: add label columns (value table entry) for signals with value tables
+    :param int max_open_files: files kept open at the same time (limit of open file descriptors)
+    """
+
+    def __init__(self, directory, row_group_size=65536, file_format=None, signal_glob="*", with_labels=True,
+                 max_open_files=256):
+        # type: (str, int, typing.Optional[str], typing.Union[str, typing.Sequence[str]], bool, int) -> None
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.file_format = default_file_format() if file_format is None else file_format
+        if self.file_format not in sinks:
+            raise ValueError("Unknown columnar file format {}".format(self.file_format))
+        self.signal_globs = [signal_glob] if isinstance(signal_glob, str) else list(signal_glob)
+        self.with_labels = with_labels
+        self.max_open_files = max(1, max_open_files)
+        self.partitions = dict()  # type: typing.Dict[str, FramePartition]
+        # partitions with open files, least recently written first
+        self.open_partitions = collections.OrderedDict()  # type: typing.MutableMapping[str, FramePartition]
+        # lower case file names without extension, see canmatrix.utils.safe_file_name
+        self.file_names = set()  # type: typing.Set[str]
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def partition(self, frame):  # type: (canmatrix.Frame) -> FramePartition
+        """Return the partition of a frame, the file is created when the first rows are flushed."""
+        partition = self.partitions.get(frame.name)
+        if partition is None:
+            columns = frame_columns(frame, self.signal_globs, self.with_labels)
+            file_stem = canmatrix.utils.safe_file_name(frame.name, self.file_names)
+            partition = self.partitions[frame.name] = FramePartition(
+                frame, columns, sinks[self.file_format](columns), file_stem)
+        return partition
+
+    def _open(self, partition):  # type: (FramePartition) -> None
+        """Make sure the file of partition is open, closes the least recently written file if too many are open."""
+        if partition.sink.is_open:
+            self.open_partitions.move_to_end(partition.frame.name)
+            return
+        while len(self.open_partitions) >= self.max_open_files:
+            _, idle = self.open_partitions.popitem(last=False)
+            idle.sink.close()
+        if partition.files and partition.sink.appendable:
+            partition.sink.open(os.path.join(self.directory, partition.files[-1]), append=True)
+        else:
+            stem = partition.file_stem
+            if partition.files:
+                part = "{}_part{}".format(stem, len(partition.files) + 1)
+                stem = canmatrix.utils.safe_file_name(part, self.file_names)
+            partition.files.append("{}.{}".format(stem, self.file_format))
+            partition.sink.open(os.path.join(self.directory, partition.files[-1]))
+        self.open_partitions[partition.frame.name] = partition
+
+    def _flush(self, partition):  # type: (FramePartition) -> None
+        if partition.rows:
+            self._open(partition)
+            partition.flush()
+
+    def write(self, message):  # type: (canmatrix.stream.DecodedMessage) -> None
+        """Append one decoded message, messages without frame (unknown ids) are ignored."""
+        if message.frame is None:
+            return
+        partition = self.partition(message.frame)
+        partition.append(message.timestamp, message.values)
+        if partition.rows >= self.row_group_size:
+            self._flush(partition)
+
+    def write_messages(self, messages):  # type: (typing.Iterable[canmatrix.stream.DecodedMessage]) -> None
+        for message in messages:
+            self.write(message)
+
+    def flush(self):  # type: () -> None
+        for partition in self.partitions.values():
+            self._flush(partition)
+
+    def close(self):  # type: () -> None
+        """Flush all partitions, close the files and write schema.json."""
+        self.flush()
+        schema = dict()
+        for name, partition in self.partitions.items():
+            if not partition.files:
+                self._open(partition)  # no rows, file with the columns only
+            partition.sink.close()
+            schema[name] = {
+                "file": partition.files[0],
+                "files": partition.files,
+                "arbitration_id": partition.frame.arbitration_id.to_compound_integer(),
+                "columns": partition.columns,
+            }
+        with io.open(os.path.join(self.directory, "schema.json"), "w", encoding="utf-8") as schema_file:
+            schema_file.write(json.dumps(schema, indent=2, ensure_ascii=False))
+        self.open_partitions.clear()
+
+    def __enter__(self):  # type: () -> ColumnarWriter
+        return self
+
+    def __exit__(self, *args):  # type: (typing.Any) -> None
+        self.close()
+
+
+def write_trace(matrix, messages, directory, frame_glob="*", **kwargs):
+    # type: (canmatrix.CanMatrix, typing.Any, str, typing.Union[str, typing.Sequence[str]], typing.Any) -> None
+    """Decode messages (see canmatrix.stream, i.e. the records of canmatrix.trace.iter_trace)
+    and write them partitioned by frame into directory, kwargs are passed to ColumnarWriter."""
+    with ColumnarWriter(directory, **kwargs) as writer:
+        writer.write_messages(matrix.iter_decode(messages, frame_glob, writer.signal_globs))
@@ -63,8 +63,60 @@ def propagate_changes(res):  # type: (CompareResult) -> int
         return 0
 
 
-def compare_db(db1, db2, ignore=None):
-    # type: (canmatrix.CanMatrix, canmatrix.CanMatrix, ConfigDict) -> CompareResult
+def first_by_name(items):  # type: (typing.Iterable[typing.Any]) -> typing.Dict[str, typing.Any]
+    """Return the items by name, the first one of several items with the same name (like a linear search)."""
+    by_name = {}  # type: typing.Dict[str, typing.Any]
+    for item in items:
+        by_name.setdefault(item.name, item)
+    return by_name
+
+
+def equal_frames(f1, f2, ignore=None):
+    # type: (canmatrix.Frame, canmatrix.Frame, ConfigDict) -> bool
+    """Return whether compare_frame is known to find no changes between the frames, decided by Frame.fingerprint.
+
+    The fingerprints leave comments and attributes out like ignore does. They are stricter than compare_frame,
+    frames with different fingerprints can still be equal for compare_frame (see _equal_to_itself for exceptions).
+    """
+    if ignore is None:
+        ignore = dict()
+    ignore_comments = "comment" in ignore
+    ignore_attributes = "ATTRIBUTE" in ignore and ignore["ATTRIBUTE"] == "*"
+    if f1.fingerprint(ignore_comments, ignore_attributes) != f2.fingerprint(ignore_comments, ignore_attributes):
+        return False
+    if not ignore_attributes:
+        # fingerprints hash numbers by value, compare_attributes compares them with != (0.1 != Decimal("0.1"))
+        if f1.attributes != f2.attributes or any(
+                s1.attributes != s2.attributes for s1, s2 in zip(f1.signals, f2.signals)):
+            return False
+    return _equal_to_itself(f1)
+
+
+def _equal_to_itself(frame):  # type: (canmatrix.Frame) -> bool
+    """Return whether compare_frame finds no changes between frames with this content.
+
+    It does find changes for duplicate signal or signal group names (these are compared by name),
+    receivers with surrounding whitespace and NaN factor, offset, min or max.
+    """
+    names = [signal.name for signal in frame.signals]
+    group_names = [group.name for group in frame.signalGroups]
+    if len(set(names)) != len(names) or len(set(group_names)) != len(group_names):
+        return False
+    for signal in frame.signals:
+        if any(receiver.strip() != receiver for receiver in signal.receivers):
+            return False
+        if any(float(value) != float(value) for value in (signal.factor, signal.offset, signal.min, signal.max)):
+            return False
+    return True
+
+
+def compare_db(db1, db2, ignore=None, skip_equal_frames=False):
+    # type: (canmatrix.CanMatrix, canmatrix.CanMatrix, ConfigDict, bool) -> CompareResult
+    """Compare two matrices.
+
+    With skip_equal_frames frames which are equal by their fingerprints (see equal_frames) are not compared
+    field by field, their result is an "equal" FRAME without children. dump_result prints the same.
+    """
     result = CompareResult()
     if ignore is None:
         ignore = dict()
@@ -72,10 +124,11 @@ def compare_db(db1, db2, ignore=None):
         f2 = db2.frame_by_name(f1.name)
         f2id = db2.frame_by_id(f1.arbitration_id)
         if f2 is None:
-            if f2id is None:
-                result.add_child(CompareResult("deleted", "FRAME", f1))
-            else:
-                result.add_child(compare_frame(f1, f2id, ignore))
+            f2 = f2id
+        if f2 is None:
+            result.add_child(CompareResult("deleted", "FRAME", f1))
+        elif skip_equal_frames and equal_frames(f1, f2, ignore):
+            result.add_child(CompareResult("equal", "FRAME", f1))
         else:
             result.add_child(compare_frame(f1, f2, ignore))
     for f2 in db2.frames:
@@ -192,11 +245,13 @@ def compare_signal_group(sg1, sg2):
     if sg1.signals is None or sg2.signals is None:
         logger.debug("Strange - sg wo members???")
         return result
+    names1 = {signal.name for signal in sg1.signals}
+    names2 = {signal.name for signal in sg2.signals}
     for signal in sg1.signals:
-        if sg2.by_name(signal.name) is None:
+        if signal.name not in names2:
             result.add_child(CompareResult("deleted", str(signal.name), signal))
     for signal in sg2.signals:
-        if sg1.by_name(signal.name) is None:
+        if signal.name not in names1:
             result.add_child(CompareResult("added", str(signal.name), signal))
     return result
 
@@ -293,9 +348,11 @@ def compare_frame(f1, f2, ignore=None):
     if ignore is None:
         ignore = dict()
     result = CompareResult("equal", "FRAME", f1)
+    signals1 = first_by_name(f1.signals)
+    signals2 = first_by_name(f2.signals)
 
     for s1 in f1:
-        s2 = f2.signal_by_name(s1.name)
+        s2 = signals2.get(s1.name)
         if not s2:
             result.add_child(CompareResult("deleted", "SIGNAL", s1))
         else:
@@ -339,7 +396,7 @@ def compare_frame(f1, f2, ignore=None):
                         "comment: " + f1.comment, "comment: " + f2.comment]))
 
     for s2 in f2.signals:
-        s1 = f1.signal_by_name(s2.name)
+        s1 = signals1.get(s2.name)
         if not s1:
             result.add_child(CompareResult("added", "SIGNAL", s2))
 
@@ -358,15 +415,17 @@ def compare_frame(f1, f2, ignore=None):
         if transmitter not in temp:
             result.add_child(CompareResult("added", "Frame-Transmitter", f2))
 
+    groups1 = first_by_name(f1.signalGroups)
+    groups2 = first_by_name(f2.signalGroups)
     for sg1 in f1.signalGroups:
-        sg2 = f2.signal_group_by_name(sg1.name)
+        sg2 = groups2.get(sg1.name)
         if sg2 is None:
             result.add_child(CompareResult("removed", "Signalgroup", sg1))
         else:
             result.add_child(compare_signal_group(sg1, sg2))
 
     for sg2 in f2.signalGroups:
-        if f1.signal_group_by_name(sg2.name) is None:
+        if groups1.get(sg2.name) is None:
             result.add_child(CompareResult("added", "Signalgroup", sg2))
     return result
 
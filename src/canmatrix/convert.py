@@ -20,7 +20,10 @@
 # DAMAGE.
 
 import copy
+import hashlib
+import json
 import logging
+import os
 import sys
 import typing
 from builtins import *
@@ -61,12 +64,196 @@ def convert_pdu_container_to_multiplexed(frame):  # type: (canmatrix.Frame) -> c
     return new_frame
 
 
+manifest_format = "canmatrix-fingerprints"
+changes_format = "canmatrix-changes"
+# options of the delta export itself, they don't change the output
+delta_options = ("baseline", "manifest", "changes")
+
+
+def _define_fingerprint(define):  # type: (canmatrix.Define) -> str
+    return hashlib.sha256(repr((define.definition, define.defaultValue)).encode("utf-8")).hexdigest()
+
+
+def _options_fingerprint(options):  # type: (typing.Mapping[str, typing.Any]) -> str
+    content = sorted((name, repr(value)) for name, value in options.items() if name not in delta_options)
+    return hashlib.sha256(repr(content).encode("utf-8")).hexdigest()
+
+
+def matrix_manifest(db):  # type: (canmatrix.CanMatrix) -> typing.Dict[str, typing.Any]
+    """Return the fingerprints of a matrix and of its frames, ECUs and defines by name (see CanMatrix.fingerprint).
+
+    Of frames or ECUs with the same name the first one counts. Defines are named "<kind>:<name>",
+    e.g. "frame:GenMsgCycleTime".
+    """
+    frames = {}  # type: typing.Dict[str, str]
+    for frame in db.frames:
+        frames.setdefault(frame.name, frame.fingerprint())
+    ecus = {}  # type: typing.Dict[str, str]
+    for ecu in db.ecus:
+        ecus.setdefault(ecu.name, ecu.fingerprint())
+    defines = {}  # type: typing.Dict[str, str]
+    for kind, kind_defines in (("signal", db.signal_defines), ("frame", db.frame_defines), ("ecu", db.ecu_defines),
+                               ("global", db.global_defines), ("env", db.env_defines)):
+        for name, define in kind_defines.items():
+            defines[kind + ":" + name] = _define_fingerprint(define)
+    return {"fingerprint": db.fingerprint(), "frames": frames, "ecus": ecus, "defines": defines}
+
+
+def fingerprint_manifest(dbs, **options):
+    # type: (typing.Mapping[str, canmatrix.CanMatrix], **typing.Any) -> typing.Dict[str, typing.Any]
+    """Return the fingerprint manifest (JSON serializable) of the matrices of a conversion.
+
+    The manifest is the baseline of the next delta export, see dump_delta.
+    It contains a fingerprint of the options too, outputs written with other options are outdated.
+    """
+    return {
+        "format": manifest_format,
+        "version": 1,
+        "options": _options_fingerprint(options),
+        "matrices": {name: matrix_manifest(db) for name, db in dbs.items()},
+    }
+
+
+def load_baseline(path, **options):  # type: (str, **typing.Any) -> typing.Dict[str, typing.Any]
+    """Return the fingerprint manifest of a baseline file: a manifest or any matrix file loadp can read.
+
+    Matrix files are compared as they are, without the modifications of convert (like deleteFrame).
+    Their manifest has no options, outputs are not written again because of changed options.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "rb") as manifest_file:
+            manifest = json.load(manifest_file)
+        if isinstance(manifest, dict) and manifest.get("format") == manifest_format:
+            return manifest
+    dbs = canmatrix.formats.loadp(path, **options)
+    if dbs is None:
+        raise ValueError("Could not load baseline " + path)
+    manifest = fingerprint_manifest(dbs)
+    manifest["options"] = None
+    return manifest
+
+
+def _name_changes(old, new):
+    # type: (typing.Mapping[str, str], typing.Mapping[str, str]) -> typing.Dict[str, typing.List[str]]
+    return {
+        "added": sorted(name for name in new if name not in old),
+        "removed": sorted(name for name in old if name not in new),
+        "changed": sorted(name for name in new if name in old and old[name] != new[name]),
+    }
+
+
+def manifest_changes(baseline, manifest):
+    # type: (typing.Mapping[str, typing.Any], typing.Mapping[str, typing.Any]) -> typing.Dict[str, typing.Any]
+    """Return the changes (JSON serializable) from the fingerprint manifest baseline to manifest.
+
+    For every matrix name: its status ("added", "removed", "changed" or "unchanged") and the names of
+    added, removed and changed frames, ECUs and defines. "options_changed" is set if the options differ.
+    """
+    options_changed = baseline.get("options") is not None and baseline.get("options") != manifest.get("options")
+    old_matrices = baseline.get("matrices", {})
+    new_matrices = manifest.get("matrices", {})
+    matrices = {}
+    for name in sorted(set(old_matrices) | set(new_matrices)):
+        old = old_matrices.get(name)
+        new = new_matrices.get(name)
+        if old is None:
+            status = "added"
+        elif new is None:
+            status = "removed"
+        elif old["fingerprint"] != new["fingerprint"]:
+            status = "changed"
+        else:
+            status = "unchanged"
+        matrix_changes = {"status": status}  # type: typing.Dict[str, typing.Any]
+        for part in ("frames", "ecus", "defines"):
+            matrix_changes[part] = _name_changes((old or {}).get(part, {}), (new or {}).get(part, {}))
+        matrices[name] = matrix_changes
+    return {"format": changes_format, "version": 1, "options_changed": options_changed, "matrices": matrices}
+
+
+def _remove(path, removed):  # type: (str, typing.List[str]) -> None
+    if os.path.exists(path):
+        os.remove(path)
+        removed.append(path)
+
+
+def dump_delta(dbs, path, baseline=None, export_type=None, **options):
+    # type: (typing.Mapping[str, canmatrix.CanMatrix], str, typing.Optional[typing.Mapping[str, typing.Any]], typing.Optional[str], **typing.Any) -> typing.Dict[str, typing.Any]
+    """Export like canmatrix.formats.dumpp, but write only outputs which changed since baseline.
+
+    Formats written per matrix get a file per matrix, only the files of changed or added matrices are written,
+    the files of removed matrices are deleted. Cluster formats (like arxml) are written if any matrix changed.
+    With the option jsonFragments json is written per frame (see canmatrix.formats.json.dump_fragments)
+    to a directory per matrix (the output path without extension), only fragments of changed frames are written.
+    Missing outputs are always written. Without baseline or if the options changed all outputs are written
+    directly, checking them would cost more than writing them.
+
+    :param baseline: fingerprint manifest of the last export (see fingerprint_manifest, load_baseline),
+        None to write everything
+    :return: the changes (see manifest_changes) with the fingerprint manifest of dbs ("manifest")
+        and the lists of "written" and "removed" paths
+    """
+    manifest = fingerprint_manifest(dbs, **options)
+    changes = manifest_changes(baseline or {}, manifest)
+    write_all = baseline is None or changes["options_changed"]
+    written = []  # type: typing.List[str]
+    removed = []  # type: typing.List[str]
+    if not export_type:
+        export_type = canmatrix.formats.find_export_type(path)
+    if not export_type:
+        logger.error("This file format is not supported for writing")
+    elif "clusterExporter" in canmatrix.formats.supportedFormats[export_type]:
+        if (write_all or not os.path.exists(path)
+                or any(matrix["status"] != "unchanged" for matrix in changes["matrices"].values())):
+            canmatrix.formats.dumpp(dbs, path, export_type=export_type, **options)
+            written.append(path)
+    else:
+        json_fragments = export_type == "json" and options.get("jsonFragments")
+        for name, matrix_changes in changes["matrices"].items():
+            out_path = canmatrix.formats.dump_path(path, name)
+            if json_fragments:
+                directory = os.path.splitext(out_path)[0]
+                frame_changes = matrix_changes["frames"]
+                for frame_name in frame_changes["removed"]:
+                    _remove(canmatrix.formats.json.fragment_path(directory, frame_name), removed)
+                if matrix_changes["status"] == "removed":
+                    _remove(canmatrix.formats.json.fragment_path(directory), removed)
+                    continue
+                frame_names = None  # type: typing.Optional[typing.Set[str]]
+                if not (write_all or any(matrix_changes["defines"].values())):
+                    # defines change the default values of all exported attributes
+                    frame_names = set(frame_changes["added"] + frame_changes["changed"])
+                    frame_names.update(
+                        frame.name for frame in dbs[name].frames
+                        if not os.path.exists(canmatrix.formats.json.fragment_path(directory, frame.name)))
+                if matrix_changes["status"] != "unchanged" or frame_names is None or frame_names \
+                        or not os.path.exists(canmatrix.formats.json.fragment_path(directory)):
+                    written += canmatrix.formats.json.dump_fragments(dbs[name], directory, frame_names, **options)
+            elif matrix_changes["status"] == "removed":
+                _remove(out_path, removed)
+            elif write_all or matrix_changes["status"] != "unchanged" or not os.path.exists(out_path):
+                canmatrix.formats.dumpp({name: dbs[name]}, path, export_type=export_type, **options)
+                written.append(out_path)
+    changes["manifest"] = manifest
+    changes["written"] = written
+    changes["removed"] = removed
+    return changes
+
+
 def convert(infile, out_file_name, **options):  # type: (str, str, **str) -> None
     logger.info(f"Importing " + infile + " ...")
     dbs = canmatrix.formats.loadp(infile, **options)
+    merge_dbs = {}  # type: typing.Dict[str, typing.Dict[str, canmatrix.CanMatrix]]
+    if 'merge' in options and options['merge'] is not None:
+        merge_paths = dict.fromkeys(database.split(':')[0] for database in options['merge'].split(','))
+        for path, merge_db, error in canmatrix.formats.iter_loadp(merge_paths):
+            if error is not None:
+                raise error
+            merge_dbs[path] = merge_db
     logger.info("Import Done")
 
     logger.info("Exporting " + out_file_name + " ...")
+    merged_paths = set()  # type: typing.Set[str]
     out_dbs = {}  # type: typing.Dict[str, canmatrix.CanMatrix]
     for name in dbs:
         db = None
@@ -98,7 +285,10 @@ def convert(infile, out_file_name, **options):  # type: (str, str, **str) -> Non
             merge_files = options['merge'].split(',')
             for database in merge_files:
                 merge_string = database.split(':')
-                db_temp_list = canmatrix.formats.loadp(merge_string[0])
+                db_temp_list = merge_dbs[merge_string[0]]
+                if merge_string[0] in merged_paths:  # every merge gets its own copy, like a new import
+                    db_temp_list = copy.deepcopy(db_temp_list)
+                merged_paths.add(merge_string[0])
                 for dbTemp in db_temp_list:
                     if merge_string.__len__() == 1:
                         # logger.debug("merge complete: " + merge_string[0])
@@ -339,9 +529,34 @@ def convert(infile, out_file_name, **options):  # type: (str, str, **str) -> Non
 
         out_dbs[name] = db
 
-    if 'force_output' in options and options['force_output'] is not None:
-        canmatrix.formats.dumpp(out_dbs, out_file_name, export_type=options[
-                                'force_output'], **options)
+    export_type = options.get('force_output')
+    if any(options.get(name) for name in delta_options):
+        baseline = None  # type: typing.Optional[typing.Dict[str, typing.Any]]
+        if options.get('baseline'):
+            # the import options of the input file apply to the baseline too, but not its format
+            baseline = load_baseline(options['baseline'], **{
+                name: value for name, value in options.items() if name != 'import_type'})
+        elif options.get('manifest') and os.path.exists(options['manifest']):
+            baseline = load_baseline(options['manifest'])
+        export_options = {
+            name: value for name, value in options.items()
+            if name not in ('force_output', 'silent') and name not in delta_options}
+        changes = dump_delta(out_dbs, out_file_name, baseline, export_type, **export_options)
+        manifest = changes.pop("manifest")
+        logger.info("%d files written, %d removed", len(changes["written"]), len(changes["removed"]))
+        if options.get('manifest'):
+            with open(options['manifest'], "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+        if options.get('changes'):
+            with open(options['changes'], "w") as changes_file:
+                json.dump(changes, changes_file, indent=1, sort_keys=True)
+    elif options.get('jsonFragments') and (export_type or canmatrix.formats.find_export_type(out_file_name)) == "json":
+        # nothing to compare with, fragments are written without fingerprints
+        for name, db in out_dbs.items():
+            directory = os.path.splitext(canmatrix.formats.dump_path(out_file_name, name))[0]
+            canmatrix.formats.json.dump_fragments(db, directory, **options)
+    elif export_type is not None:
+        canmatrix.formats.dumpp(out_dbs, out_file_name, export_type=export_type, **options)
     else:
         canmatrix.formats.dumpp(out_dbs, out_file_name, **options)
     logger.info("Export Done")
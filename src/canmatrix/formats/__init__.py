@@ -1,54 +1,89 @@
 # -*- coding: utf-8 -*-
 
+import concurrent.futures
 import importlib
+import importlib.util
 import logging
+import mmap
 import os
-import sys
+import types
 import typing
 from builtins import str
 from io import BytesIO
 
 import canmatrix
 import canmatrix.cancluster
+import canmatrix.utils
 
 logger = logging.getLogger(__name__)
-moduleList = ["arxml", "csv", "dbc", "dbf", "json", "ldf",
-              "kcd", "fibex", "sym", "xls", "xlsx", "yaml", "scapy", "wireshark", "odx", "eds"]
 
-loadedFormats = []
-supportedFormats = {}  # type: typing.MutableMapping[str, typing.MutableSequence[str]]
-extensionMapping = {}
+# Features of the format modules: "load", "dump", "clusterImporter", "clusterExporter", "bufferImporter" (load reads
+# buffers like mmap directly) and "extension" (file extension differs from the format name).
+# The modules are only imported when a format is used (see get_format_module).
+formatFeatures = {
+    "arxml": ["load", "dump", "clusterImporter", "clusterExporter"],
+    "csv": ["dump"],
+    "dbc": ["load", "dump", "bufferImporter"],
+    "dbf": ["load", "dump"],
+    "json": ["load", "dump"],
+    "ldf": ["load"],
+    "kcd": ["load", "dump", "clusterImporter", "clusterExporter"],
+    "fibex": ["load", "dump", "clusterImporter", "extension"],
+    "sym": ["load", "dump", "bufferImporter"],
+    "xls": ["load", "dump"],
+    "xlsx": ["load", "dump"],
+    "yaml": ["load", "dump"],
+    "scapy": ["dump", "extension"],
+    "wireshark": ["dump", "extension"],
+    "odx": ["load"],
+    "eds": ["load"],
+}  # type: typing.Dict[str, typing.List[str]]
+formatExtensions = {"fibex": "xml", "scapy": "py", "wireshark": "lua"}
+# third party packages a format module needs, a format is only supported if they are installed
+formatRequirements = {
+    "arxml": ["lxml"],
+    "ldf": ["ldfparser"],
+    "kcd": ["lxml"],
+    "fibex": ["lxml"],
+    "xls": ["xlrd", "xlwt"],
+    "xlsx": ["openpyxl"],
+    "yaml": ["yaml"],
+    "odx": ["lxml"],
+    "eds": ["canopen"],
+}
+moduleList = list(formatFeatures)
 
-for module in moduleList:
-    try:
-        importlib.import_module("canmatrix.formats." + module)
-        loadedFormats.append(module)
-    except ImportError:
-        logger.debug("%s is not supported", module)
-
-for loadedModule in loadedFormats:
-    supportedFormats[loadedModule] = []
-    moduleInstance = sys.modules["canmatrix.formats." + loadedModule]
-    if "load" in dir(moduleInstance):
-        supportedFormats[loadedModule].append("load")
-    if "dump" in dir(moduleInstance):
-        supportedFormats[loadedModule].append("dump")
-    if "clusterImporter" in dir(moduleInstance):
-        supportedFormats[loadedModule].append("clusterImporter")
-    if "clusterExporter" in dir(moduleInstance):
-        supportedFormats[loadedModule].append("clusterExporter")
-    if "extension" in dir(moduleInstance):
-        supportedFormats[loadedModule].append("extension")
-        extensionMapping[loadedModule] = moduleInstance.extension  # type: ignore
-    else:
-        extensionMapping[loadedModule] = loadedModule
+loadedFormats = [
+    module for module in moduleList
+    if all(importlib.util.find_spec(requirement) is not None for requirement in formatRequirements.get(module, []))]
+supportedFormats = {
+    module: list(formatFeatures[module]) for module in loadedFormats
+}  # type: typing.MutableMapping[str, typing.MutableSequence[str]]
+extensionMapping = {module: formatExtensions.get(module, module) for module in loadedFormats}
+# loadp maps files of at least this size into memory for formats with "bufferImporter"
+mmap_threshold = 1 << 20  # type: int
+
+
+def get_format_module(name):  # type: (str) -> types.ModuleType
+    """Return the module of a format, it is imported on first use."""
+    return importlib.import_module("canmatrix.formats." + name)
+
+
+def __getattr__(name):  # type: (str) -> types.ModuleType
+    # canmatrix.formats.<format> works without importing the format module first
+    if name in formatFeatures:
+        return get_format_module(name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
 def loads(string, import_type=None, key="", encoding="utf-8", **options):
-    # type: (typing.Union[bytes,str], str, str, str, **str) -> typing.Union[typing.Dict[str, canmatrix.CanMatrix], None]
-    bytes_str = string.encode(encoding=encoding) if isinstance(string, str) else string
-    file_object = BytesIO(bytes_str)
-    return load(file_object, import_type, key, **options)
+    # type: (typing.Union[str, canmatrix.utils.Buffer], str, str, str, **str) -> typing.Union[typing.Dict[str, canmatrix.CanMatrix], None]
+    """Load a matrix from a string or a buffer (bytes, bytearray, memoryview, mmap).
+
+    Formats with "bufferImporter" read buffers without copying them.
+    """
+    buffer = string.encode(encoding=encoding) if isinstance(string, str) else string
+    return load(buffer, import_type, key, **options)
 
 
 def loads_flat(string, import_type=None, key="", **options):
@@ -57,36 +92,140 @@ def loads_flat(string, import_type=None, key="", **options):
     return dbs.popitem()[1] if dbs else None
 
 
-def loadp(path, import_type=None, key="", **options):
-    # type: (str, str, str, **str) -> typing.Union[typing.Dict[str, canmatrix.CanMatrix], None]
+def _matrix_cache(cache_dir, cache_size):
+    # type: (typing.Optional[str], typing.Optional[int]) -> typing.Any
+    """Return the cache of loadp or None, canmatrix.cache is only imported if caching is enabled."""
+    if cache_dir is None and not os.environ.get("CANMATRIX_CACHE_DIR"):
+        return None
+    return importlib.import_module("canmatrix.cache").from_options(cache_dir, cache_size)
+
+
+def loadp(path, import_type=None, key="", cache_dir=None, cache_size=None, **options):
+    # type: (str, str, str, typing.Optional[str], typing.Optional[int], **str) -> typing.Union[typing.Dict[str, canmatrix.CanMatrix], None]
+    """Load a file, see canmatrix.cache for the on-disk cache enabled by cache_dir or CANMATRIX_CACHE_DIR."""
+    if not import_type:
+        for supportedImportType, extension in extensionMapping.items():
+            if path.lower().endswith(extension) and "load" in supportedFormats[supportedImportType]:
+                import_type = supportedImportType
+                break
+
+    if not import_type:
+        logger.error("This file format is not supported for reading")
+        return None
+
+    cache = _matrix_cache(cache_dir, cache_size)
+    if cache is not None:
+        cache_key = canmatrix.cache.cache_key(path, import_type, key, **options)
+        dbs = cache.load(cache_key)
+        if dbs is not None:
+            logger.debug("%s loaded from cache %s", path, cache.directory)
+            return dbs
+
     with open(path, "rb") as fileObject:
-        if not import_type:
-            for supportedImportType, extension in extensionMapping.items():
-                if path.lower().endswith(extension) and "load" in supportedFormats[supportedImportType]:
-                    import_type = supportedImportType
-                    break
-
-        if import_type:
-            return load(fileObject, import_type, key, **options)
+        size = os.fstat(fileObject.fileno()).st_size
+        if "bufferImporter" in supportedFormats[import_type] and size and size >= mmap_threshold:
+            # lines are read from the page cache, without buffered reads and file iteration
+            with mmap.mmap(fileObject.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                dbs = load(buffer, import_type, key, **options)
         else:
-            logger.error("This file format is not supported for reading")
-            return None
+            dbs = load(fileObject, import_type, key, **options)
+    if cache is not None and dbs:
+        cache.store(cache_key, dbs)
+    return dbs
 
 
-def loadp_flat(path, import_type=None, key="", **options):
-    # type: (str, str, str, **str) -> typing.Union[canmatrix.CanMatrix, None]
-    dbs = loadp(path, import_type, key, **options)
+def loadp_flat(path, import_type=None, key="", cache_dir=None, cache_size=None, **options):
+    # type: (str, str, str, typing.Optional[str], typing.Optional[int], **str) -> typing.Union[canmatrix.CanMatrix, None]
+    dbs = loadp(path, import_type, key, cache_dir, cache_size, **options)
     return dbs.popitem()[1] if dbs else None
 
 
+def _loadp_result(path, import_type, key, cache_dir, cache_size, options):
+    # type: (str, typing.Optional[str], str, typing.Optional[str], typing.Optional[int], typing.Dict[str, typing.Any]) -> typing.Tuple[str, typing.Optional[typing.Dict[str, canmatrix.CanMatrix]], typing.Optional[Exception]]
+    try:
+        dbs = loadp(path, import_type, key, cache_dir, cache_size, **options)
+    except Exception as error:
+        return path, None, error
+    if dbs is None:
+        return path, None, ValueError("The file format of {} is not supported for reading".format(path))
+    return path, dbs, None
+
+
+def iter_loadp(paths, workers=None, import_type=None, key="", cache_dir=None, cache_size=None, **options):
+    # type: (typing.Iterable[str], typing.Optional[int], str, str, typing.Optional[str], typing.Optional[int], **typing.Any) -> typing.Iterator[typing.Tuple[str, typing.Optional[typing.Dict[str, canmatrix.CanMatrix]], typing.Optional[Exception]]]
+    """Load files with loadp in a pool of worker processes, yield the results as they complete.
+
+    Every file gives (path, matrices, None), or (path, None, error) if it could not be loaded.
+    With workers=1 or a single path the files are loaded in this process.
+    All options (including float_factory) are sent to the workers and have to be picklable.
+
+    :param paths: files to load
+    :param workers: number of worker processes, default is the number of CPUs
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) < 2:
+        for path in paths:
+            yield _loadp_result(path, import_type, key, cache_dir, cache_size, options)
+        return
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = {
+            pool.submit(_loadp_result, path, import_type, key, cache_dir, cache_size, options): path
+            for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as error:  # worker died or the result could not be pickled
+                yield futures[future], None, error
+
+
+def loadp_many(paths, workers=None, import_type=None, key="", cache_dir=None, cache_size=None, **options):
+    # type: (typing.Iterable[str], typing.Optional[int], str, str, typing.Optional[str], typing.Optional[int], **typing.Any) -> canmatrix.cancluster.CanCluster
+    """Load several files in parallel (see iter_loadp), return one CanCluster of all matrices.
+
+    The matrices are named after their file name without extension, matrices of cluster formats
+    (like arxml) get "_" and their bus name appended. If a name is already taken the path is used instead of the file name.
+    Files which could not be loaded do not stop the others, their errors are in load_errors (path: exception)
+    of the returned cluster.
+    """
+    paths = list(paths)
+    loaded = {}  # type: typing.Dict[str, typing.Dict[str, canmatrix.CanMatrix]]
+    load_errors = {}  # type: typing.Dict[str, Exception]
+    for path, dbs, error in iter_loadp(paths, workers, import_type, key, cache_dir, cache_size, **options):
+        if error is not None:
+            logger.error("Could not load %s: %s", path, error)
+            load_errors[path] = error
+        else:
+            loaded[path] = dbs
+
+    named = {}  # type: typing.Dict[str, canmatrix.CanMatrix]
+    for path in dict.fromkeys(paths):  # in the given order, not in the order of completion
+        for bus_name, db in loaded.get(path, {}).items():
+            suffix = "_" + bus_name if bus_name else ""
+            name = os.path.splitext(os.path.basename(path))[0] + suffix
+            if name in named:
+                name = os.path.splitext(path)[0] + suffix
+            named[name] = db
+    cluster = canmatrix.cancluster.CanCluster(named)
+    cluster.load_errors = load_errors
+    return cluster
+
+
 def load(file_object, import_type, key="", **options):
-    # type: (typing.BinaryIO, str, str, **str) -> typing.Union[typing.Dict[str, canmatrix.CanMatrix], None]
+    # type: (typing.Union[typing.BinaryIO, canmatrix.utils.Buffer], str, str, **str) -> typing.Union[typing.Dict[str, canmatrix.CanMatrix], None]
+    """Load a matrix from a binary file object or a buffer (bytes, bytearray, memoryview, mmap)."""
     dbs = {}  # type: typing.Dict[str, canmatrix.CanMatrix]
-    module_instance = sys.modules["canmatrix.formats." + import_type]
+    module_instance = get_format_module(import_type)
+    if isinstance(file_object, (bytes, bytearray, memoryview)) and "bufferImporter" not in supportedFormats[import_type]:
+        file_object = BytesIO(file_object)  # mmap is a file object already
     if "clusterImporter" in supportedFormats[import_type]:
         dbs = module_instance.load(file_object, **options)  # type: ignore
     else:
         dbs[key] = module_instance.load(file_object, **options)  # type: ignore
+    if "float_factory" in options:
+        # signals convert their numbers to decimal.Decimal, apply the requested number type
+        for db in dbs.values():
+            if db is not None:
+                db.set_float_factory(options["float_factory"])
     return dbs
 
 
@@ -98,31 +237,40 @@ def load_flat(file_object, import_type, key="", **options):
 
 def dump(can_matrix_or_cluster, file_object, export_type, **options):
     # type: (typing.Union[canmatrix.CanMatrix, typing.Mapping[str, canmatrix.CanMatrix]], typing.IO, str, **str) -> None
-    module_instance = sys.modules["canmatrix.formats." + export_type]
+    module_instance = get_format_module(export_type)
     if isinstance(can_matrix_or_cluster, canmatrix.CanMatrix):
         module_instance.dump(can_matrix_or_cluster, file_object, **options)  # type: ignore
     elif "clusterExporter" in supportedFormats[export_type]:
         module_instance.dump(can_matrix_or_cluster, file_object, **options)  # type: ignore
 
 
+def find_export_type(path):  # type: (str) -> typing.Optional[str]
+    """Return the export format of a path by its extension, None if no supported format matches."""
+    for key, extension in extensionMapping.items():
+        if path.lower().endswith("." + extension) and "dump" in supportedFormats[key]:
+            return key
+    return None
+
+
+def dump_path(path, name):  # type: (str, str) -> str
+    """Return the file dumpp writes the matrix called name to, for formats without "clusterExporter"."""
+    if len(name) > 0:
+        (file_path, ext) = os.path.splitext(path)
+        return file_path + "_" + name + ext
+    return path
+
+
 def dumpp(can_cluster, path, export_type=None, **options):
     # type: (typing.Mapping[str, canmatrix.CanMatrix], str, str, **str) -> None
     if not export_type:
-        for key, extension in extensionMapping.items():
-            if path.lower().endswith("." + extension) and "dump" in supportedFormats[key]:
-                export_type = key
-                break
+        export_type = find_export_type(path)
     if export_type:
         if "clusterExporter" in supportedFormats[export_type]:
             file_object = open(path, "wb")  # type: typing.IO
             dump(can_cluster, file_object, export_type, **options)
         else:
             for name in can_cluster:
-                if len(name) > 0:
-                    (file_path, ext) = os.path.splitext(path)
-                    outfile = file_path + "_" + name + ext
-                else:
-                    outfile = path
+                outfile = dump_path(path, name)
                 db = can_cluster[name]
                 file_object = open(outfile, "wb")
                 dump(db, file_object, export_type, **options)
@@ -25,8 +25,13 @@
 # currently Support for Autosar 3.2 and 4.0-4.3 is planned
 # AUTOSAR 4.2.2 is partial support -> 2024/05/20
 
+import bisect
+import collections
+import concurrent.futures
 import copy
 import decimal
+import io
+import itertools
 import logging
 import re
 import typing
@@ -51,34 +56,161 @@ _Element = lxml.etree._Element
 _MultiplexId = typing.Union[str, int, None]
 _FloatFactory = typing.Callable[[typing.Any], typing.Any]
 
+# Earxml.find/findall search subtrees with less nodes directly with lxml
+small_subtree_size = 64
+
+# packageable elements kept by the streaming import (Earxml.open), besides all clusters, frames and PDUs
+streaming_elements = frozenset([
+    "I-SIGNAL", "I-SIGNAL-GROUP", "SYSTEM-SIGNAL", "SYSTEM-SIGNAL-GROUP",
+    "COMPU-METHOD", "SW-BASE-TYPE", "UNIT", "DATA-CONSTR", "CONSTANT-SPECIFICATION",
+    "DATA-TRANSFORMATION-SET", "ECU-INSTANCE", "GATEWAY", "PAYLOAD",
+    # AUTOSAR 3 data types of system signals
+    "INTEGER-TYPE", "REAL-TYPE", "BOOLEAN-TYPE", "OPAQUE-TYPE", "CHAR-TYPE", "STRING-TYPE",
+])
+streaming_element_suffixes = ("-CLUSTER", "FRAME", "-PDU")
+
+
+def is_streaming_element(element):  # type: (_Element) -> bool
+    """Return True if the streaming import keeps a packageable element.
+
+    Besides the signal, frame and cluster definitions the Com module of an ECU configuration is kept.
+    """
+    tag = element.tag.rpartition("}")[2]
+    if tag in streaming_elements or tag.endswith(streaming_element_suffixes):
+        return True
+    if tag == "ECUC-MODULE-CONFIGURATION-VALUES":
+        short_name = element.find("{*}SHORT-NAME")
+        return short_name is not None and short_name.text == "Com"
+    return False
+
 
 class Earxml:
     def __init__(self):
         self.xml_element_cache = dict()  # type: typing.Dict[str, _Element]
         self.path_cache = {}
         self.sn_cache = {}
+        # element index, see index_elements
+        self.tag_elements = dict()  # type: typing.Dict[str, typing.List[_Element]]
+        self.tag_positions = dict()  # type: typing.Dict[str, typing.List[int]]
+        self.element_positions = dict()  # type: typing.Dict[_Element, int]
+        self.subtree_spans = dict()  # type: typing.Dict[_Element, typing.Optional[typing.Tuple[int, int]]]
+        self.ar_path_cache = dict()  # type: typing.Dict[_Element, str]
+        self.referrer_cache = dict()  # type: typing.Dict[str, typing.Dict[str, typing.List[typing.Tuple[_Element, _Element]]]]
+        # values decoded from referenced elements, see decoded
+        self.decode_cache = dict()  # type: typing.Dict[typing.Tuple[str, typing.Hashable], typing.Any]
+        self.decode_hits = collections.Counter()  # type: typing.Counter[str]
+        self.decode_misses = collections.Counter()  # type: typing.Counter[str]
 
     def fill_caches(self, start_element=None, ar_path=""):
+        """Fill the short name, AR path and reference caches of the subtree of start_element.
+
+        The nodes are visited in document order, the AR path of an element is extended by the
+        short names found so far. Without start_element the whole document is cached and indexed.
+        """
+        top_level = start_element is None
         if start_element is None:
             start_element = self.root
             self.path_cache = {}
-        if start_element.tag == self.ns + "SHORT-NAME":
+        short_name_tag = self.ns + "SHORT-NAME"
+        if start_element.tag == short_name_tag:
             self.sn_cache[start_element.getparent()] = start_element.text
             return start_element.text
-        for sub_element in start_element:
+        nodes = list(start_element.iter())
+        ar_paths = {start_element: ar_path}
+        for sub_element in itertools.islice(nodes, 1, None):
+            parent = sub_element.getparent()
+            if parent not in ar_paths:  # content of a SHORT-NAME
+                continue
             text = sub_element.text
             if text is not None and len(text) > 0 and text.startswith('/'):
                 if text not in self.path_cache:
                     self.path_cache[text] = []
                 self.path_cache[text].append(sub_element)
-            new_ar_path = self.fill_caches(sub_element, ar_path)
-            if new_ar_path != "":
-                ar_path += '/' + new_ar_path
-                self.xml_element_cache[ar_path] = start_element
+            if sub_element.tag == short_name_tag:
+                self.sn_cache[parent] = text
+                if text != "":
+                    ar_paths[parent] += '/' + text
+                    self.xml_element_cache[ar_paths[parent]] = parent
+            else:
+                ar_paths[sub_element] = ar_paths[parent]
+        if top_level:
+            self.index_elements(nodes)
         return ''
 
-    def open(self, filename):
-        self.tree = lxml.etree.parse(filename)
+    def index_elements(self, nodes=None):  # type: (typing.Optional[typing.List[_Element]]) -> None
+        """Index all nodes of the document by tag (fill_caches calls this).
+
+        Nodes are numbered in document order, so the descendants of an element with a given tag
+        are a slice of the positions of that tag, found by bisection (see find and findall).
+        The span of a subtree, the AR path of an element and the referrers of an AR path
+        (see find_references_of_type) are looked up on first use and kept.
+        """
+        if nodes is None:
+            nodes = list(self.root.iter())
+        self.element_positions = {node: position for position, node in enumerate(nodes)}
+        self.tag_elements = dict()
+        self.tag_positions = dict()
+        for position, tag in enumerate([node.tag for node in nodes]):
+            if tag not in self.tag_positions:
+                self.tag_elements[tag] = []
+                self.tag_positions[tag] = []
+            self.tag_elements[tag].append(nodes[position])
+            self.tag_positions[tag].append(position)
+        self.subtree_spans = dict()
+        self.ar_path_cache = {self.root: ""}
+        self.referrer_cache = dict()
+
+    def subtree_span(self, element):  # type: (_Element) -> typing.Optional[typing.Tuple[int, int]]
+        """Return the positions of element and of the last node below it, None for small subtrees
+        and elements which are not indexed (see index_elements)."""
+        if element in self.subtree_spans:
+            return self.subtree_spans[element]
+        span = None
+        position = self.element_positions.get(element)
+        if position is not None:
+            node = element
+            while node is not None and node.getnext() is None:
+                node = node.getparent()
+            if node is None:
+                end = len(self.element_positions) - 1
+            else:
+                end = self.element_positions[node.getnext()] - 1
+            if end - position >= small_subtree_size:
+                span = (position, end)
+        self.subtree_spans[element] = span
+        return span
+
+    def _indexed_range(self, xpath, start_element):
+        # type: (str, _Element) -> typing.Optional[typing.Tuple[typing.List[_Element], int, int]]
+        """Return the indexed elements of a tag and the slice of those below start_element.
+
+        None for xpath expressions and small subtrees, lxml searches them faster.
+        """
+        span = self.subtree_span(start_element)
+        if span is None or "/" in xpath or "[" in xpath or "*" in xpath:
+            return None
+        tag = self.ns + xpath
+        positions = self.tag_positions.get(tag, [])
+        first = bisect.bisect_right(positions, span[0])
+        last = bisect.bisect_right(positions, span[1], first)
+        return self.tag_elements.get(tag, []), first, last
+
+    def open(self, filename, streaming=False):
+        """Parse the arxml file and fill the caches.
+
+        In streaming mode the file is read with iterparse and only the packageable elements needed
+        to decode CAN, CAN FD and J1939 (see is_streaming_element) are kept, all others are dropped as soon
+        as they are parsed. References are resolved afterwards from the caches of the remaining tree.
+        """
+        if streaming:
+            for _, element in lxml.etree.iterparse(filename, events=("end",)):
+                parent = element.getparent()
+                if parent is not None and parent.tag.endswith("}ELEMENTS") and not is_streaming_element(element):
+                    element.clear()
+                    parent.remove(element)
+            self.tree = element.getroottree()
+        else:
+            self.tree = lxml.etree.parse(filename)
         self.root = self.tree.getroot()  # type: _Element
 
         self.ns = "{" + self.tree.xpath('namespace-uri(.)') + "}"  # type: str
@@ -88,11 +220,19 @@ class Earxml:
     def findall(self, xpath, start_element=None):
         if start_element is None:
             start_element = self.root
+        indexed = self._indexed_range(xpath, start_element)
+        if indexed is not None:
+            elements, first, last = indexed
+            return elements[first:last]
         return start_element.findall('.//' + self.ns + xpath)
 
     def find(self, xpath, start_element=None):
         if start_element is None:
             start_element = self.root
+        indexed = self._indexed_range(xpath, start_element)
+        if indexed is not None:
+            elements, first, last = indexed
+            return elements[first] if first < last else None
         return start_element.find('.//' + self.ns + xpath)
 
     @staticmethod
@@ -112,12 +252,17 @@ class Earxml:
         return xpath
 
     def get_short_name_path_of_element(self, xml_element):
-        path = ""
-        while xml_element != self.root:
+        # walk up to the next element with known path, then store the paths on the way down
+        uncached = []
+        while xml_element not in self.ar_path_cache and xml_element != self.root:
+            uncached.append(xml_element)
+            xml_element = xml_element.getparent()
+        path = self.ar_path_cache.get(xml_element, "")
+        for xml_element in reversed(uncached):
             current_short_name = self.get_short_name(xml_element)
             if len(current_short_name) > 0:
-                path = "/" + current_short_name + path
-            xml_element = xml_element.getparent()
+                path = path + "/" + current_short_name
+            self.ar_path_cache[xml_element] = path
         return path.strip()
 
     def get_referencable_parent(self, xml_element):
@@ -136,17 +281,35 @@ class Earxml:
             xml_element = xml_element.getparent()
         return None
 
+    def decoded(self, kind, key, decode, *args):
+        # type: (str, typing.Hashable, typing.Callable, *typing.Any) -> typing.Any
+        """Return decode(*args), decoded only once per kind and key (usually the referenced element).
+
+        The results are shared, callers must not modify them. decode_hits and decode_misses count
+        the lookups per kind for profiling.
+        """
+        try:
+            value = self.decode_cache[kind, key]
+        except KeyError:
+            self.decode_misses[kind] += 1
+            value = self.decode_cache[kind, key] = decode(*args)
+        else:
+            self.decode_hits[kind] += 1
+        return value
+
     def find_references_of_type(self, element, xml_tag, referencable_parent=False):
-        referencing_elements = []
         current_ar_path = self.get_short_name_path_of_element(element)
-
-        for reference in self.path_cache[current_ar_path]:
-            element = self.get_referencable_parent(reference)
-            if element.tag == self.ns + xml_tag:
-                referencing_elements.append(reference)
+        referrers = self.referrer_cache.get(current_ar_path)
+        if referrers is None:
+            # group the references once by the tag of their referencable parent
+            referrers = self.referrer_cache[current_ar_path] = dict()
+            for reference in self.path_cache[current_ar_path]:
+                parent = self.get_referencable_parent(reference)
+                referrers.setdefault(parent.tag, []).append((reference, parent))
+        references = referrers.get(self.ns + xml_tag, [])
         if referencable_parent:
-            referencing_elements = [self.get_referencable_parent(a) for a in referencing_elements]
-        return referencing_elements
+            return [parent for _, parent in references]
+        return [reference for reference, _ in references]
 
     def get_short_name_path(self, shortname_path):
         if shortname_path in self.xml_element_cache:
@@ -268,15 +431,15 @@ class Earxml:
                     result_list = [self.xml_element_cache[a.text][0].getparent() for start in result_list for a in
                                    self.get_all_sub_by_name(start, value) if a.text in self.xml_element_cache]
                 elif token == ">":
-                    result_list = [self.xml_element_cache[self.get_sub_by_name(a, value).text][0].getparent() for a in result_list
-                                   if self.get_sub_by_name(a, value) is not None and self.get_sub_by_name(a, value).text in self.xml_element_cache]
+                    references = [self.get_sub_by_name(a, value) for a in result_list]
+                    result_list = [self.xml_element_cache[reference.text][0].getparent() for reference in references
+                                   if reference is not None and reference.text in self.xml_element_cache]
                 elif token == "<<":
                     result_list = [c for a in result_list for c in
                                    self.find_references_of_type(a, value, referencable_parent=True)]
                 elif token == "<":
-                    result_list = [self.find_references_of_type(a, value, referencable_parent=True)[0]
-                                   for a in result_list
-                                   if len(self.find_references_of_type(a, value, referencable_parent=True)) > 0]
+                    referrers = [self.find_references_of_type(a, value, referencable_parent=True) for a in result_list]
+                    result_list = [references[0] for references in referrers if len(references) > 0]
                 elif token == ":":
                     filtered_results = []
                     for item in result_list:
@@ -1098,6 +1261,41 @@ def eval_type_of_signal(type_encoding, base_type, ea):
     return is_signed, is_float
 
 
+def get_isignal_receivers(isignal, ea):
+    # type: (_Element, Earxml) -> typing.Tuple[typing.List[str], typing.Optional[str]]
+    """Return the receiving ECUs of the (last) I-SIGNAL-TRIGGERING of isignal and
+    the ECU of the signal port of the first triggering if it is receiving."""
+    receiver = []  # type: typing.List[str]
+
+    for triggering in ea.selector(isignal, "<<I-SIGNAL-TRIGGERING"):
+        try:
+            reciving_ecu_instances = ea.selector(triggering, ">>I-SIGNAL-PORT-REF//COMMUNICATION-DIRECTION:IN/../../..")
+            receiver = [ea.get_short_name(a) for a in reciving_ecu_instances]
+        except IndexError:
+            pass
+
+    port_receiver = None
+    communication_direction = ea.selector(isignal, "<I-SIGNAL-TRIGGERING>I-SIGNAL-PORT-REF/COMMUNICATION-DIRECTION")
+    if len(communication_direction) > 0 and communication_direction[0].text == "IN":
+        port_receiver = ea.get_short_name(ea.get_ecu_instance(communication_direction[0]))
+    return receiver, port_receiver
+
+
+def get_isignal_base_type(isignal, ea):
+    # type: (_Element, Earxml) -> typing.Tuple[typing.Optional[_Element], str]
+    """Return the base type of isignal (AR4) or its system signal (AR3) and its encoding."""
+    base_type = ea.follow_ref(isignal, "BASE-TYPE-REF")  # AR4
+    if base_type is None:
+        a = ea.selector(isignal, ">SYSTEM-SIGNAL-REF>DATA-TYPE-REF>BASE-TYPE-REF")
+        if len(a) > 0:
+            base_type = a[0]
+    try:
+        type_encoding = ea.get_child(base_type, "BASE-TYPE-ENCODING").text
+    except AttributeError:
+        type_encoding = "None"
+    return base_type, type_encoding
+
+
 def ar_byteorder_is_little(in_string):
     if in_string == 'MOST-SIGNIFICANT-BYTE-LAST' or in_string == 'OPAQUE':
         return True
@@ -1145,24 +1343,8 @@ def get_signals(signal_array, frame, ea, multiplex_id, float_factory, bit_offset
                 'Frame %s, no isignal for %s found',
                 frame.name, ea.get_child(signal, "SHORT-NAME").text)
 
-        receiver = []  # type: typing.List[str]
-
-        for triggering in ea.selector(isignal, "<<I-SIGNAL-TRIGGERING"):
-            try:
-                reciving_ecu_instances = ea.selector(triggering, ">>I-SIGNAL-PORT-REF//COMMUNICATION-DIRECTION:IN/../../..")
-                receiver = [ea.get_short_name(a) for a in reciving_ecu_instances]
-            except IndexError:
-                pass
-
-        base_type = ea.follow_ref(isignal, "BASE-TYPE-REF")  # AR4
-        if base_type is None:
-            a = ea.selector(isignal, ">SYSTEM-SIGNAL-REF>DATA-TYPE-REF>BASE-TYPE-REF")
-            if len(a) > 0:
-                base_type = a[0]
-        try:
-            type_encoding = ea.get_child(base_type, "BASE-TYPE-ENCODING").text
-        except AttributeError:
-            type_encoding = "None"
+        receiver, port_receiver = ea.decoded("receivers", isignal, get_isignal_receivers, isignal, ea)
+        base_type, type_encoding = ea.decoded("base_type", isignal, get_isignal_base_type, isignal, ea)
         signal_name = None  # type: typing.Optional[str]
         signal_name_elem = ea.get_child(isignal, "LONG-NAME")
         if signal_name_elem is not None:
@@ -1263,7 +1445,8 @@ def get_signals(signal_array, frame, ea, multiplex_id, float_factory, bit_offset
             compu_method = ea.follow_ref(system_signal, "COMPU-METHOD-REF")
 
         # decode compuMethod:
-        (values, factor, offset, unit_elem, const) = decode_compu_method(compu_method, ea, float_factory)
+        (values, factor, offset, unit_elem, const) = ea.decoded(
+            "compu_method", compu_method, decode_compu_method, compu_method, ea, float_factory)
 
         if signal_min is not None:
             signal_min *= factor
@@ -1275,7 +1458,8 @@ def get_signals(signal_array, frame, ea, multiplex_id, float_factory, bit_offset
         if base_type is None:
             base_type = ea.follow_ref(datdefprops, "BASE-TYPE-REF")
 
-        (is_signed, is_float) = eval_type_of_signal(type_encoding, base_type, ea)
+        (is_signed, is_float) = ea.decoded(
+            "signal_type", (type_encoding, base_type), eval_type_of_signal, type_encoding, base_type, ea)
 
         unit_element = ea.follow_ref(isignal, "UNIT-REF")
         display_name = ea.get_child(unit_element, "DISPLAY-NAME")
@@ -1335,7 +1519,7 @@ def get_signals(signal_array, frame, ea, multiplex_id, float_factory, bit_offset
                 factor=factor,
                 offset=offset,
                 unit=signal_unit,
-                receivers=receiver,
+                receivers=list(receiver),
                 multiplex=multiplex_id,
                 comment=signal_description,
                 is_float=is_float)
@@ -1349,12 +1533,8 @@ def get_signals(signal_array, frame, ea, multiplex_id, float_factory, bit_offset
                 # startbit of motorola coded signals are MSB in arxml
                 new_signal.set_startbit(int(start_bit.text, 0) + bit_offset, bitNumbering=1)
 
-            communication_direction = ea.selector(isignal, "<I-SIGNAL-TRIGGERING>I-SIGNAL-PORT-REF/COMMUNICATION-DIRECTION")
-            if len(communication_direction) > 0:
-                ecu = ea.get_ecu_instance(communication_direction[0])
-
-                if communication_direction[0].text == "IN":
-                    new_signal.add_receiver(ea.get_short_name(ecu))
+            if port_receiver is not None:
+                new_signal.add_receiver(port_receiver)
 
             if base_type is not None:
                 temp = ea.get_child(base_type, "SHORT-NAME")
@@ -2028,96 +2208,183 @@ def decode_flexray_helper(ea, float_factory):
     return found_matrixes
 
 
-def decode_can_helper(ea, float_factory, ignore_cluster_info):
-    found_matrixes = {}
+def get_can_clusters(ea):
+    # type: (Earxml) -> typing.List[_Element]
+    return ea.findall('CAN-CLUSTER') + ea.findall('J-1939-CLUSTER')
+
+
+def get_can_frame_triggerings(ea, cc):
+    # type: (Earxml, _Element) -> typing.List[_Element]
+    return ea.selector(cc, "/CAN-PHYSICAL-CHANNEL//CAN-FRAME-TRIGGERING")
+
+
+def decode_can_cluster(ea, cc, float_factory, ignore_cluster_info, headers_are_littleendian, nodes,
+                       first_triggerings=None, start_values=True):
+    # type: (Earxml, _Element, typing.Callable, bool, bool, typing.Dict[_Element, canmatrix.Ecu], typing.Optional[typing.Dict[_Element, _Element]], bool) -> typing.Tuple[str, canmatrix.CanMatrix]
+    """Decode one CAN or J1939 cluster, return bus name and matrix.
+
+    ECUs are shared by all clusters decoded with the same nodes dictionary.
+    With start_values the GenMsgStartValue attribute of the frames is set (see Frame.start_value_payload).
+    first_triggerings (parallel import only) maps frames to their first triggering in an earlier cluster,
+    these frames are decoded from that triggering and copied like in the serial import.
+    """
+    db = canmatrix.CanMatrix()
+    # Defines not jet imported...
+    db.add_ecu_defines("NWM-Stationsadresse", 'HEX 0 63')
+    db.add_ecu_defines("NWM-Knoten", 'ENUM  "nein","ja"')
+    db.add_signal_defines("LongName", 'STRING')
+    db.add_signal_defines("CompuMethodName", 'STRING')
+    db.add_signal_defines("ISignalName", 'STRING')
+    db.add_signal_defines("SysSignalName", 'STRING')
+    db.add_frame_defines("GenMsgDelayTime", 'INT 0 65535')
+    db.add_frame_defines("GenMsgNrOfRepetitions", 'INT 0 65535')
+    db.add_frame_defines("GenMsgStartValue", 'STRING')
+    db.add_frame_defines("FrameTriggeringName", 'STRING')
+    db.add_frame_defines("PduName", 'STRING')
+    db.add_frame_defines("GenMsgStartDelayTime", 'INT 0 65535')
+
+    db.add_frame_defines(
+        "GenMsgSendType",
+        'ENUM  "cyclicX","spontanX","cyclicIfActiveX","spontanWithDelay","cyclicAndSpontanX","cyclicAndSpontanWithDelay","spontanWithRepitition","cyclicIfActiveAndSpontanWD","cyclicIfActiveFast","cyclicWithRepeatOnDemand","none"')
+
     if ignore_cluster_info is True:
-        ccs = [lxml.etree.Element("ignoreClusterInfo")]  # type: typing.Sequence[_Element]
+        can_frame_trig = ea.findall('CAN-FRAME-TRIGGERING')
+        bus_name = ""
     else:
-        ccs = ea.findall('CAN-CLUSTER') + ea.findall('J-1939-CLUSTER')
+        speed = ea.get_child(cc, "SPEED")
+        baudrate_elem = ea.find("BAUDRATE", cc)
+        fd_baudrate_elem = ea.find("CAN-FD-BAUDRATE", cc)
+
+        logger.debug("Busname: " + ea.get_element_name(cc))
+        bus_name = ea.get_element_name(cc)
+
+        if speed is not None:
+            db.baudrate = int(speed.text, 0)
+        elif baudrate_elem is not None:
+            db.baudrate = int(baudrate_elem.text, 0)
+
+        logger.debug("Baudrate: " + str(db.baudrate))
+        if fd_baudrate_elem is not None:
+            db.fd_baudrate = int(fd_baudrate_elem.text, 0)
+
+        can_frame_trig = get_can_frame_triggerings(ea, cc)
+
+    multiplex_translation = {}  # type: typing.Dict[str, str]
+    for frameTrig in can_frame_trig:  # type: _Element
+        if first_triggerings:
+            frame_elem = ea.follow_ref(frameTrig, "FRAME-REF")
+            if frame_elem in first_triggerings and frame_elem not in frames_cache:
+                get_frame(first_triggerings[frame_elem], ea, {}, float_factory, headers_are_littleendian)
+        frame = get_frame(frameTrig, ea, multiplex_translation, float_factory, headers_are_littleendian)
+        if frame is not None:
+            frame.is_j1939 = "J-1939" in cc.tag
+            
+            comm_directions = ea.selector(frameTrig, ">>FRAME-PORT-REF/COMMUNICATION-DIRECTION")
+            for comm_direction in comm_directions:
+                ecu_elem = ea.get_ecu_instance(element=comm_direction)
+                if ecu_elem is not None:
+                    if ecu_elem in nodes:
+                        ecu = nodes[ecu_elem]
+                    else:
+                        ecu = process_ecu(ecu_elem, ea)
+                        nodes[ecu_elem] = ecu
+
+                    # In Case Neither transmitter Nor receiver
+                    if comm_direction.text == "OUT":
+                        frame.add_transmitter(ecu.name)
+                    elif comm_direction.text == "IN":
+                        frame.add_receiver(ecu.name)
+                    else:
+                        pass
+                    db.add_ecu(ecu)
+            db.add_frame(frame)
+    for frame in db.frames:
+        if frame.is_pdu_container:
+            continue
+        for sig in frame.signals:
+            sig.receivers = list(set(frame.receivers).intersection(sig.receivers))
+        if start_values:
+            frame.add_attribute("GenMsgStartValue", frame.start_value_payload.hex())
+        # frame.update_receiver()
+    return bus_name, db
 
-    headers_are_littleendian = containters_are_little_endian(ea)
+
+# Earxml of a worker process of the parallel import, see decode_can_clusters_parallel
+_worker_earxml = None  # type: typing.Optional[Earxml]
+
+
+def _open_worker_earxml(source, streaming):  # type: (typing.Union[str, bytes], bool) -> None
+    global _worker_earxml
+    if _worker_earxml is not None:  # forked workers inherit the parsed file
+        return
+    _worker_earxml = Earxml()
+    _worker_earxml.open(source if isinstance(source, str) else io.BytesIO(source), streaming)
+
+
+def _decode_can_cluster_task(cluster_index, float_factory, start_values):
+    # type: (int, typing.Callable, bool) -> typing.Tuple[str, canmatrix.CanMatrix, typing.List[str]]
+    """Decode one cluster in a worker process, return bus name, matrix and the AR paths of its ECUs."""
+    global frames_cache
+    frames_cache = {}
+    ea = _worker_earxml
+    ccs = get_can_clusters(ea)
+    # frames already decoded in earlier clusters are copied from their first decoding in the serial import
+    first_triggerings = {}  # type: typing.Dict[_Element, _Element]
+    for cc in ccs[:cluster_index]:
+        for frame_triggering in get_can_frame_triggerings(ea, cc):
+            if ea.get_child(frame_triggering, "IDENTIFIER") is None:
+                continue
+            frame_elem = ea.follow_ref(frame_triggering, "FRAME-REF")
+            if frame_elem is not None and frame_elem not in first_triggerings:
+                first_triggerings[frame_elem] = frame_triggering
     nodes = {}  # type: typing.Dict[_Element, canmatrix.Ecu]
+    bus_name, db = decode_can_cluster(ea, ccs[cluster_index], float_factory, False,
+                                      containters_are_little_endian(ea), nodes, first_triggerings, start_values)
+    ecu_paths = {id(ecu): ea.get_short_name_path_of_element(ecu_elem) for ecu_elem, ecu in nodes.items()}
+    return bus_name, db, [ecu_paths[id(ecu)] for ecu in db.ecus]
 
-    for cc in ccs:  # type: _Element
-        db = canmatrix.CanMatrix()
-        # Defines not jet imported...
-        db.add_ecu_defines("NWM-Stationsadresse", 'HEX 0 63')
-        db.add_ecu_defines("NWM-Knoten", 'ENUM  "nein","ja"')
-        db.add_signal_defines("LongName", 'STRING')
-        db.add_signal_defines("CompuMethodName", 'STRING')
-        db.add_signal_defines("ISignalName", 'STRING')
-        db.add_signal_defines("SysSignalName", 'STRING')
-        db.add_frame_defines("GenMsgDelayTime", 'INT 0 65535')
-        db.add_frame_defines("GenMsgNrOfRepetitions", 'INT 0 65535')
-        db.add_frame_defines("GenMsgStartValue", 'STRING')
-        db.add_frame_defines("FrameTriggeringName", 'STRING')
-        db.add_frame_defines("PduName", 'STRING')
-        db.add_frame_defines("GenMsgStartDelayTime", 'INT 0 65535')
-
-        db.add_frame_defines(
-            "GenMsgSendType",
-            'ENUM  "cyclicX","spontanX","cyclicIfActiveX","spontanWithDelay","cyclicAndSpontanX","cyclicAndSpontanWithDelay","spontanWithRepitition","cyclicIfActiveAndSpontanWD","cyclicIfActiveFast","cyclicWithRepeatOnDemand","none"')
-
-        if ignore_cluster_info is True:
-            can_frame_trig = ea.findall('CAN-FRAME-TRIGGERING')
-            bus_name = ""
-        else:
-            speed = ea.get_child(cc, "SPEED")
-            baudrate_elem = ea.find("BAUDRATE", cc)
-            fd_baudrate_elem = ea.find("CAN-FD-BAUDRATE", cc)
 
-            logger.debug("Busname: " + ea.get_element_name(cc))
-            bus_name = ea.get_element_name(cc)
+def decode_can_clusters_parallel(ea, cluster_count, float_factory, source, streaming, workers, start_values=True):
+    # type: (Earxml, int, typing.Callable, typing.Union[str, bytes], bool, int, bool) -> typing.Dict[str, canmatrix.CanMatrix]
+    """Decode the CAN clusters in a pool of worker processes.
 
-            if speed is not None:
-                db.baudrate = int(speed.text, 0)
-            elif baudrate_elem is not None:
-                db.baudrate = int(baudrate_elem.text, 0)
+    Forked workers use the already parsed ea, otherwise every worker parses source once.
+    The matrices are merged in cluster order, ECUs are shared between the matrices like in the serial import.
+    """
+    global _worker_earxml
+    found_matrixes = {}
+    shared_ecus = {}  # type: typing.Dict[str, canmatrix.Ecu]
+    _worker_earxml = ea
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                min(workers, cluster_count), initializer=_open_worker_earxml, initargs=(source, streaming)) as pool:
+            for bus_name, db, ecu_paths in pool.map(
+                    _decode_can_cluster_task, range(cluster_count), itertools.repeat(float_factory),
+                    itertools.repeat(start_values)):
+                db.ecus = [shared_ecus.setdefault(path, ecu) for path, ecu in zip(ecu_paths, db.ecus)]
+                found_matrixes[bus_name] = db
+    finally:
+        _worker_earxml = None
+    return found_matrixes
 
-            logger.debug("Baudrate: " + str(db.baudrate))
-            if fd_baudrate_elem is not None:
-                db.fd_baudrate = int(fd_baudrate_elem.text, 0)
 
-            can_frame_trig = ea.selector(cc, "/CAN-PHYSICAL-CHANNEL//CAN-FRAME-TRIGGERING")
+def decode_can_helper(ea, float_factory, ignore_cluster_info, workers=1, source=None, streaming=False,
+                      start_values=True):
+    # type: (Earxml, typing.Callable, bool, int, typing.Union[str, bytes, None], bool, bool) -> typing.Dict[str, canmatrix.CanMatrix]
+    found_matrixes = {}
+    if ignore_cluster_info is True:
+        ccs = [lxml.etree.Element("ignoreClusterInfo")]  # type: typing.Sequence[_Element]
+    else:
+        ccs = get_can_clusters(ea)
+        if workers > 1 and len(ccs) > 1 and source is not None:
+            return decode_can_clusters_parallel(ea, len(ccs), float_factory, source, streaming, workers, start_values)
 
-        multiplex_translation = {}  # type: typing.Dict[str, str]
-        for frameTrig in can_frame_trig:  # type: _Element
-            frame = get_frame(frameTrig, ea, multiplex_translation, float_factory, headers_are_littleendian)
-            if frame is not None:
-                frame.is_j1939 = "J-1939" in cc.tag
-                
-                comm_directions = ea.selector(frameTrig, ">>FRAME-PORT-REF/COMMUNICATION-DIRECTION")
-                for comm_direction in comm_directions:
-                    ecu_elem = ea.get_ecu_instance(element=comm_direction)
-                    if ecu_elem is not None:
-                        if ecu_elem in nodes:
-                            ecu = nodes[ecu_elem]
-                        else:
-                            ecu = process_ecu(ecu_elem, ea)
-                            nodes[ecu_elem] = ecu
+    headers_are_littleendian = containters_are_little_endian(ea)
+    nodes = {}  # type: typing.Dict[_Element, canmatrix.Ecu]
 
-                        # In Case Neither transmitter Nor receiver
-                        if comm_direction.text == "OUT":
-                            frame.add_transmitter(ecu.name)
-                        elif comm_direction.text == "IN":
-                            frame.add_receiver(ecu.name)
-                        else:
-                            pass
-                        db.add_ecu(ecu)
-                db.add_frame(frame)
-        for frame in db.frames:
-            if frame.is_pdu_container:
-                continue
-            sig_value_hash = dict()
-            for sig in frame.signals:
-                sig.receivers = list(set(frame.receivers).intersection(sig.receivers))
-                try:
-                    sig_value_hash[sig.name] = sig.phys2raw()
-                except AttributeError:
-                    sig_value_hash[sig.name] = 0
-            frame_data = frame.encode(sig_value_hash)
-            frame.add_attribute("GenMsgStartValue", "".join(["%02x" % x for x in frame_data]))
-            # frame.update_receiver()
+    for cc in ccs:  # type: _Element
+        bus_name, db = decode_can_cluster(ea, cc, float_factory, ignore_cluster_info, headers_are_littleendian, nodes,
+                                          start_values=start_values)
         found_matrixes[bus_name] = db
 
     return found_matrixes
@@ -2168,12 +2435,24 @@ def load(file, **options):
 
     decode_ethernet = options.get("decode_ethernet", False)
     decode_flexray = options.get("decode_flexray", False)
+    streaming = options.get("arxmlStreaming", False)
+    workers = int(options.get("arxmlWorkers", 1))
+    start_values = options.get("arxmlStartValues", True)
 
     result = {}
     logger.debug("Read arxml ...")
 
+    source = None  # type: typing.Union[str, bytes, None]
+    if workers > 1:
+        # worker processes parse the file again
+        if isinstance(file, str):
+            source = file
+        else:
+            source = file.read()
+            file = io.BytesIO(source)
+
     ea = Earxml()
-    ea.open(file)
+    ea.open(file, streaming)
 
     com_module = ea.get_short_name_path("/ActiveEcuC/Com")
 
@@ -2194,7 +2473,8 @@ def load(file, **options):
     if decode_flexray:
         result.update(decode_flexray_helper(ea, float_factory))
 
-    result.update(decode_can_helper(ea, float_factory, ignore_cluster_info))
+    result.update(decode_can_helper(ea, float_factory, ignore_cluster_info, workers, source, streaming, start_values))
+    logger.debug("decode cache hits: %s, misses: %s", dict(ea.decode_hits), dict(ea.decode_misses))
 
     result = canmatrix.cancluster.CanCluster(result)
 
@@ -106,838 +106,935 @@ def create_comment_string(comment_class, comment_ident, comment, export_encoding
     return comment_string
 
 
-def dump(in_db, f, **options):
-    # type: (canmatrix.CanMatrix, typing.IO, **typing.Any) -> None
-    # create copy because export changes database
-    db = copy.deepcopy(in_db)
-
-    dbc_export_encoding = options.get("dbcExportEncoding", 'iso-8859-1')
-    dbc_export_comment_encoding = options.get("dbcExportCommentEncoding",  dbc_export_encoding)
-    compatibility = options.get('compatibility', True)
-    dbc_unique_signal_names_per_frame = options.get("dbcUniqueSignalNames", compatibility)
-    ignore_encoding_errors= options.get("ignoreEncodingErrors",  "ignore")
-    write_val_table = options.get("writeValTable", True)
-
-    whitespace_replacement = options.get("whitespaceReplacement", '_')
-    if whitespace_replacement in ['', None] or {' ', '\t'}.intersection(whitespace_replacement):
-        logger.warning("Settings may result in whitespace in DBC variable names.  This is not supported by the DBC format.")
-
-    if db.contains_fd and db.contains_j1939:
-        db.add_frame_defines("VFrameFormat",
-                             'ENUM  "StandardCAN","ExtendedCAN","reserved","J1939PG","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","StandardCAN_FD","ExtendedCAN_FD"')
-        logger.warning("dbc export not fully compatible to candb, because both J1939 and CAN_FD frames are defined")
-
-    elif db.contains_fd:
-        db.add_global_defines("BusType", "STRING")
-        db.add_attribute("BusType", "CAN FD")
-        db.add_frame_defines("VFrameFormat", 'ENUM  "StandardCAN","ExtendedCAN","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","StandardCAN_FD","ExtendedCAN_FD"')
-    elif db.contains_j1939:
-        db.add_global_defines("ProtocolType", "STRING")
-        db.add_attribute("ProtocolType", "J1939")
-        db.add_frame_defines("VFrameFormat", 'ENUM  "StandardCAN","ExtendedCAN","reserved","J1939PG"')
-
-    if db.contains_fd or db.contains_j1939:
-        for frame in db.frames:
-            if frame.is_fd:
-                if frame.arbitration_id.extended:
-                    frame.add_attribute("VFrameFormat", "ExtendedCAN_FD")
-                else:
-                    frame.add_attribute("VFrameFormat", "StandardCAN_FD")
-            elif frame.is_j1939:
-                frame.add_attribute("VFrameFormat", "J1939PG")
-            else:
-                if frame.arbitration_id.extended:
-                    frame.add_attribute("VFrameFormat", "ExtendedCAN")
+def _attribute_value(value):  # type: (typing.Any) -> typing.Any
+    """Return value as add_attribute of ecus, frames, signals and matrices stores it."""
+    try:
+        value = str(value)
+    except UnicodeDecodeError:
+        pass
+    if type(value) == str:
+        value = value.strip()
+    return value
+
+
+class _DbcWriter(object):
+    """Writes a CanMatrix as dbc without changing or copying it.
+
+    What the export changes (shortened long names, implicit defines like VFrameFormat, cycle times and start values
+    as attributes, enum attribute values as keys) is kept in side tables: the names and attributes of changed ecus,
+    frames and signals by id and copies of the defines, matrix attributes and env vars.
+    The encoded output is collected and written in chunks of chunk_size bytes.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self, db, **options):  # type: (canmatrix.CanMatrix, **typing.Any) -> None
+        self.db = db
+        self.encoding = options.get("dbcExportEncoding", 'iso-8859-1')
+        self.comment_encoding = options.get("dbcExportCommentEncoding", self.encoding)
+        self.compatibility = options.get('compatibility', True)
+        self.unique_signal_names_per_frame = options.get("dbcUniqueSignalNames", self.compatibility)
+        self.ignore_encoding_errors = options.get("ignoreEncodingErrors", "ignore")
+        self.write_val_table = options.get("writeValTable", True)
+        self.whitespace_replacement = options.get("whitespaceReplacement", '_')
+        if self.whitespace_replacement in ['', None] or {' ', '\t'}.intersection(self.whitespace_replacement):
+            logger.warning("Settings may result in whitespace in DBC variable names.  This is not supported by the DBC format.")
+
+        self.names = {}  # type: typing.Dict[int, str]
+        self.changed_attributes = {}  # type: typing.Dict[int, typing.Dict[str, typing.Any]]
+        self.attributes = dict(db.attributes)
+        self.frame_defines = dict(db.frame_defines)
+        self.signal_defines = dict(db.signal_defines)
+        self.ecu_defines = dict(db.ecu_defines)
+        self.env_defines = dict(db.env_defines)
+        self.global_defines = dict(db.global_defines)
+        self.env_vars = dict(db.env_vars)
+        self.frames = list(db.frames)
+        self.output_names = collections.defaultdict(dict)  # type: typing.Dict[canmatrix.Frame, typing.Dict[canmatrix.Signal, str]]
+        self.f = None  # type: typing.Optional[typing.IO]
+        self.chunks = []  # type: typing.List[bytes]
+        self.chunks_size = 0
+
+    def name(self, obj):  # type: (typing.Any) -> str
+        return self.names.get(id(obj), obj.name)
+
+    def attributes_of(self, obj):  # type: (typing.Any) -> typing.Dict[str, typing.Any]
+        """Return the exported attributes of an ecu, frame or signal."""
+        return self.changed_attributes.get(id(obj), obj.attributes)
+
+    def changed_attributes_of(self, obj):  # type: (typing.Any) -> typing.Dict[str, typing.Any]
+        """Return the exported attributes of an ecu, frame or signal for changing them."""
+        attributes = self.changed_attributes.get(id(obj))
+        if attributes is None:
+            attributes = self.changed_attributes[id(obj)] = dict(obj.attributes)
+        return attributes
+
+    def add_attribute(self, obj, attribute, value):  # type: (typing.Any, str, typing.Any) -> None
+        self.changed_attributes_of(obj)[attribute] = _attribute_value(value)
+
+    @staticmethod
+    def add_define(defines, name, definition):  # type: (typing.Dict[str, canmatrix.Define], str, str) -> None
+        if name not in defines:
+            defines[name] = canmatrix.Define(definition)
+
+    def write_bytes(self, data):  # type: (bytes) -> None
+        self.chunks.append(data)
+        self.chunks_size += len(data)
+        if self.chunks_size >= self.chunk_size:
+            self.flush()
+
+    def write_text(self, text, errors=None):  # type: (str, typing.Optional[str]) -> None
+        self.write_bytes(text.encode(self.encoding, errors or self.ignore_encoding_errors))
+
+    def flush(self):  # type: () -> None
+        if self.chunks:
+            self.f.write(b"".join(self.chunks))
+            self.chunks = []
+            self.chunks_size = 0
+
+    def enum_attribs_to_keys(self):  # type: () -> None
+        """CanMatrix.enum_attribs_to_keys on the exported attributes."""
+        for define_name, define in self.ecu_defines.items():
+            if define.type == "ENUM":
+                for ecu in self.db.ecus:
+                    value = self.attributes_of(ecu).get(define_name)
+                    if define_name in self.attributes_of(ecu) and len(value) > 0:
+                        self.changed_attributes_of(ecu)[define_name] = str(define.values.index(value))
+        for define_name, define in self.frame_defines.items():
+            if define.type == "ENUM":
+                for frame in self.frames:
+                    value = self.attributes_of(frame).get(define_name)
+                    if define_name in self.attributes_of(frame) and len(value) > 0:
+                        self.changed_attributes_of(frame)[define_name] = str(define.values.index(value))
+        for define_name, define in self.signal_defines.items():
+            if define.type == "ENUM":
+                for frame in self.frames:
+                    for signal in frame.signals:
+                        if define_name in self.attributes_of(signal):
+                            value = self.attributes_of(signal)[define_name]
+                            self.changed_attributes_of(signal)[define_name] = str(define.values.index(value))
+
+    def add_implicit_frame_formats(self):  # type: () -> None
+        db = self.db
+        if db.contains_fd and db.contains_j1939:
+            self.add_define(self.frame_defines, "VFrameFormat",
+                            'ENUM  "StandardCAN","ExtendedCAN","reserved","J1939PG","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","StandardCAN_FD","ExtendedCAN_FD"')
+            logger.warning("dbc export not fully compatible to candb, because both J1939 and CAN_FD frames are defined")
+
+        elif db.contains_fd:
+            self.add_define(self.global_defines, "BusType", "STRING")
+            self.attributes["BusType"] = _attribute_value("CAN FD")
+            self.add_define(self.frame_defines, "VFrameFormat", 'ENUM  "StandardCAN","ExtendedCAN","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","reserved","StandardCAN_FD","ExtendedCAN_FD"')
+        elif db.contains_j1939:
+            self.add_define(self.global_defines, "ProtocolType", "STRING")
+            self.attributes["ProtocolType"] = _attribute_value("J1939")
+            self.add_define(self.frame_defines, "VFrameFormat", 'ENUM  "StandardCAN","ExtendedCAN","reserved","J1939PG"')
+
+        if db.contains_fd or db.contains_j1939:
+            for frame in self.frames:
+                if frame.is_fd:
+                    if frame.arbitration_id.extended:
+                        self.add_attribute(frame, "VFrameFormat", "ExtendedCAN_FD")
+                    else:
+                        self.add_attribute(frame, "VFrameFormat", "StandardCAN_FD")
+                elif frame.is_j1939:
+                    self.add_attribute(frame, "VFrameFormat", "J1939PG")
                 else:
-                    frame.add_attribute("VFrameFormat", "StandardCAN")
-
-    db.enum_attribs_to_keys()
-
-    # free signals are in special frame in dbc...
-    if len(db.signals) > 0:
-        free_signals_dummy_frame = canmatrix.Frame("VECTOR__INDEPENDENT_SIG_MSG")
-        # set arbitration id manualy, constructor would not allow this special id
-        free_signals_dummy_frame.arbitration_id.extended = True
-        free_signals_dummy_frame.arbitration_id.id = 0x40000000
-        free_signals_dummy_frame.signals = db.signals
-        db.add_frame(free_signals_dummy_frame)
-
-    # shorten long environment variable names
-    for env_var_name in copy.deepcopy(db.env_vars):
-        if len(env_var_name) > 32:
-            db.add_env_attribute(env_var_name, "SystemEnvVarLongSymbol", env_var_name)
-            db.env_vars[env_var_name[:32]] = db.env_vars.pop(env_var_name)
-            db.add_env_defines("SystemEnvVarLongSymbol", "STRING")
-
-    header = "VERSION \"created by canmatrix\"\n\n\nNS_ :\n\nBS_:\n\n"
-    f.write(header.encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # ECUs
-    f.write("BU_: ".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    for ecu in db.ecus:
-        # fix long ecu names:
-        if len(ecu.name) > 32:
-            ecu.add_attribute("SystemNodeLongSymbol",  ecu.name)
-            ecu.name = ecu.name[0:32]
-            db.add_ecu_defines("SystemNodeLongSymbol", "STRING")
-
-        f.write((ecu.name + " ").encode(dbc_export_encoding, ignore_encoding_errors))
-
-    f.write("\n\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    if write_val_table:
-        # ValueTables
-        for table in sorted(db.value_tables):
-            f.write(("VAL_TABLE_ " + table).encode(dbc_export_encoding, ignore_encoding_errors))
-            for row in db.value_tables[table]:
-                f.write(' {} "{}"'.format(str(row), db.value_tables[table][row]).encode(dbc_export_encoding, ignore_encoding_errors))
-            f.write(";\n".encode(dbc_export_encoding, ignore_encoding_errors))
-        f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
+                    if frame.arbitration_id.extended:
+                        self.add_attribute(frame, "VFrameFormat", "ExtendedCAN")
+                    else:
+                        self.add_attribute(frame, "VFrameFormat", "StandardCAN")
+
+    def shorten_env_var_names(self):  # type: () -> None
+        for env_var_name in list(self.env_vars):
+            if len(env_var_name) > 32:
+                env_var = dict(self.env_vars.pop(env_var_name))
+                env_var["attributes"] = dict(env_var.get("attributes", {}), SystemEnvVarLongSymbol=env_var_name)
+                self.env_vars[env_var_name[:32]] = env_var
+                self.add_define(self.env_defines, "SystemEnvVarLongSymbol", "STRING")
+
+    def name_signals(self):  # type: () -> typing.List[typing.Any]
+        """Shorten frame and signal names, give unique output names and add cycle times and start values.
+
+        Return the raw start values of all signals.
+        """
+        whitespace_replacement = self.whitespace_replacement
+        raw_start_values = []
+        for frame in self.frames:
+            # fix long frame names , warn if the frame name exceeds 32 characters
+            frame_name = self.name(frame)
+            if len(frame_name) > 32:
+                self.add_attribute(frame, "SystemMessageLongSymbol", frame_name)
+                logger.warning("Frame %s name exceeds 32 characters, consider updating the frame name within"
+                               " character limit(Max 32 characters) ", frame_name)
+                frame_name = self.names[id(frame)] = frame_name[0:32]
+                self.add_define(self.frame_defines, "SystemMessageLongSymbol", "STRING")
+
+            # fix long signal names, warn if the signal name exceeds 32 characters
+            for s in frame.signals:
+                signal_name = self.name(s)
+                if len(signal_name) > 32:
+                    self.add_attribute(s, "SystemSignalLongSymbol", signal_name)
+                    logger.warning("Signal %s::%s name exceeds 32 characters, consider updating the signal name "
+                                   "within the character limit(Max 32 characters)", frame_name, signal_name)
+                    self.names[id(s)] = signal_name[0:32]
+                    self.add_define(self.signal_defines, "SystemSignalLongSymbol", "STRING")
+
+            normalized_names = collections.OrderedDict((
+                (s, normalize_name(self.name(s), whitespace_replacement))
+                for s in frame.signals
+            ))
+
+            # remove "-" from frame names
+            if self.compatibility:
+                frame_name = re.sub("[^A-Za-z0-9]", whitespace_replacement, frame_name)
+                if frame_name[0].isdigit():
+                    frame_name = "_" + frame_name
+                self.names[id(frame)] = frame_name
+
+            duplicate_signal_totals = collections.Counter(normalized_names.values())
+            duplicate_signal_counter = collections.Counter()  # type: typing.Counter[str]
+
+            if frame.cycle_time != 0:
+                self.add_attribute(frame, "GenMsgCycleTime", frame.cycle_time)
 
-    output_names = collections.defaultdict(dict)  # type: typing.Dict[canmatrix.Frame, typing.Dict[canmatrix.Signal, str]]
-
-    for frame in db.frames:
-        # fix long frame names , warn if the frame name exceeds 32 characters
-        if len(frame.name) > 32:
-            frame.add_attribute("SystemMessageLongSymbol", frame.name)
-            logger.warning("Frame %s name exceeds 32 characters, consider updating the frame name within"
-                           " character limit(Max 32 characters) ", frame.name)
-            frame.name = frame.name[0:32]
-            db.add_frame_defines("SystemMessageLongSymbol", "STRING")
-
-        # fix long signal names, warn if the signal name exceeds 32 characters
-        for s in frame.signals:
-            if len(s.name) > 32:
-                s.add_attribute("SystemSignalLongSymbol", s.name)
-                logger.warning("Signal %s::%s name exceeds 32 characters, consider updating the signal name "
-                               "within the character limit(Max 32 characters)", frame.name, s.name)
-                s.name = s.name[0:32]
-                db.add_signal_defines("SystemSignalLongSymbol", "STRING")
-
-        normalized_names = collections.OrderedDict((
-            (s, normalize_name(s.name, whitespace_replacement))
-            for s in frame.signals
-        ))
-
-        # remove "-" from frame names
-        if compatibility:
-            frame.name = re.sub("[^A-Za-z0-9]", whitespace_replacement, frame.name)
-            if frame.name[0].isdigit():
-                frame.name = "_" + frame.name
-
-        duplicate_signal_totals = collections.Counter(normalized_names.values())
-        duplicate_signal_counter = collections.Counter()  # type: typing.Counter[str]
-
-        numbered_names = collections.OrderedDict()  # type: ignore
-
-        if frame.cycle_time != 0:
-            frame.add_attribute("GenMsgCycleTime", frame.cycle_time)
-
-        for signal in frame.signals:
-            if signal.cycle_time != 0:
-                signal.add_attribute("GenSigCycleTime", signal.cycle_time)
-            if signal.initial_value != 0 and "GenSigStartValue" not in db.signal_defines:
-                db.add_signal_defines("GenSigStartValue", 'FLOAT 0 100000000000')
-                
-            if "GenSigStartValue" in db.signal_defines:
-                if signal.phys2raw(None) != 0:
-                    if db.signal_defines["GenSigStartValue"].defaultValue is None:
-                        signal.add_attribute("GenSigStartValue", signal.phys2raw(None))
-                        
-            name = normalized_names[signal]
-            if compatibility:
-                name = re.sub("[^A-Za-z0-9]", whitespace_replacement, name)
-                if name[0].isdigit():
-                    name = whitespace_replacement + name
-            duplicate_signal_counter[name] += 1
-            if dbc_unique_signal_names_per_frame and duplicate_signal_totals[name] > 1:
-                # TODO: pad to 01 in case of 10+ instances, for example?
-                name += str(duplicate_signal_counter[name] - 1)
-            output_names[frame][signal] = name
-
-    if len(db.frames) > 0:
-        if max([x.cycle_time for x in db.frames]) > 0:
-            db.add_frame_defines("GenMsgCycleTime", 'INT 0 65535')
-        if len([s for fr in db.frames for s in fr.signals]) > 0:
-            if max([x.cycle_time for y in db.frames for x in y.signals]) > 0:
-                db.add_signal_defines("GenSigCycleTime", 'INT 0 65535')
-
-            if max([x.phys2raw(None) for y in db.frames for x in y.signals]) > 0 or min([x.phys2raw(None) for y in db.frames for x in y.signals]) < 0:
-                db.add_signal_defines("GenSigStartValue", 'FLOAT 0 100000000000')
-
-
-
-    # Frames
-    for frame in db.frames:
-        multiplex_written = False
-        if len(frame.transmitters) == 0:
-            frame.add_transmitter("Vector__XXX")
-
-        f.write(
-            ("BO_ %d " %
-             frame.arbitration_id.to_compound_integer() +
-             frame.name +
-             ": %d " %
-             frame.size +
-             frame.transmitters[0] +
-             "\n").encode(dbc_export_encoding, ignore_encoding_errors))
-
-        duplicate_signal_totals = collections.Counter(
-            normalize_name(s.name, whitespace_replacement) for s in frame.signals
-        )
-        duplicate_signal_counter = collections.Counter()
-        for signal in frame.signals:
-            if signal.multiplex == 'Multiplexor' and multiplex_written and not frame.is_complex_multiplexed:
-                continue
-            signal_line = " SG_ " + output_names[frame][signal] + " "
-
-            if signal.mux_val is not None:
-                signal_line += "m{}".format(int(signal.mux_val))
-                if signal.multiplex != 'Multiplexor':
-                    signal_line += " "
-
-            if signal.multiplex == 'Multiplexor':
-                signal_line += "M "
-                multiplex_written = True
-
-            start_bit = signal.get_startbit(bit_numbering=1)
-
-            if signal.is_signed:
-                sign = '-'
-            else:
-                sign = '+'
-            signal_line += (": %d|%d@%d%c" %
-                            (start_bit,
-                             signal.size,
-                             signal.is_little_endian,
-                             sign))
-            signal_line += " (%s,%s)" % (format_float(signal.factor), format_float(signal.offset))
-            signal_line += " [{}|{}]".format(format_float(signal.min), format_float(signal.max))
-            signal_line += ' "'
-
-            if signal.unit is None:
-                signal.unit = ""
-            signal_line += signal.unit
-            signal_line += '" '
-
-            if len(signal.receivers) == 0:
-                signal.add_receiver('Vector__XXX')
-            signal_line += ','.join(signal.receivers) + "\n"
-            f.write(signal_line.encode(dbc_export_encoding, ignore_encoding_errors))
-
-        f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # second Sender:
-    for frame in db.frames:
-        if len(frame.transmitters) > 1:
-            f.write(("BO_TX_BU_ %d : %s;\n" % (frame.arbitration_id.to_compound_integer(), ','.join(frame.transmitters))).encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # frame comments
-    # wow, there are dbcs where comments are encoded with other coding than rest of dbc...
-    for frame in db.frames:
-        f.write(create_comment_string("BO_", "%d " % frame.arbitration_id.to_compound_integer(), frame.comment, dbc_export_encoding, dbc_export_comment_encoding, dbc_export_encoding))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # signal comments
-    for frame in db.frames:
-        for signal in frame.signals:
-            if signal.comment:
-                name = output_names[frame][signal]
-                f.write(create_comment_string(
-                    "SG_",
-                    "%d " % frame.arbitration_id.to_compound_integer() + name,
-                    signal.comment,
-                    dbc_export_encoding,
-                    dbc_export_comment_encoding, dbc_export_encoding))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # ecu comments
-    for ecu in db.ecus:
-        if ecu.comment:
-            f.write(create_comment_string("BU_", ecu.name, ecu.comment, dbc_export_encoding,
-                                          dbc_export_comment_encoding, dbc_export_encoding))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    defaults = {}  # type: typing.Dict[str, str]
-
-    # write defines
-    for (data_type, define) in sorted(list(db.frame_defines.items())):
-        f.write(create_define(data_type, define, "BO_", defaults).encode(dbc_export_encoding, 'replace'))
-
-    for (data_type, define) in sorted(list(db.signal_defines.items())):
-        f.write(create_define(data_type, define, "SG_", defaults).encode(dbc_export_encoding, 'replace'))
-
-    for (data_type, define) in sorted(list(db.ecu_defines.items())):
-        f.write(create_define(data_type, define, "BU_", defaults).encode(dbc_export_encoding, 'replace'))
-
-    for (data_type, define) in sorted(list(db.env_defines.items())):
-        f.write(create_define(data_type, define, "EV_", defaults).encode(dbc_export_encoding, 'replace'))
-
-    for (data_type, define) in sorted(list(db.global_defines.items())):
-        f.write(create_define(data_type, define, "", defaults).encode(dbc_export_encoding, 'replace'))
+            for signal in frame.signals:
+                if signal.cycle_time != 0:
+                    self.add_attribute(signal, "GenSigCycleTime", signal.cycle_time)
+                if signal.initial_value != 0 and "GenSigStartValue" not in self.signal_defines:
+                    self.add_define(self.signal_defines, "GenSigStartValue", 'FLOAT 0 100000000000')
+
+                raw_start_value = signal.phys2raw(None)
+                raw_start_values.append(raw_start_value)
+                if "GenSigStartValue" in self.signal_defines:
+                    if raw_start_value != 0:
+                        if self.signal_defines["GenSigStartValue"].defaultValue is None:
+                            self.add_attribute(signal, "GenSigStartValue", raw_start_value)
+
+                name = normalized_names[signal]
+                if self.compatibility:
+                    name = re.sub("[^A-Za-z0-9]", whitespace_replacement, name)
+                    if name[0].isdigit():
+                        name = whitespace_replacement + name
+                duplicate_signal_counter[name] += 1
+                if self.unique_signal_names_per_frame and duplicate_signal_totals[name] > 1:
+                    # TODO: pad to 01 in case of 10+ instances, for example?
+                    name += str(duplicate_signal_counter[name] - 1)
+                self.output_names[frame][signal] = name
+        return raw_start_values
+
+    def write(self, f):  # type: (typing.IO) -> None
+        self.f = f
+        db = self.db
+        self.add_implicit_frame_formats()
+        self.enum_attribs_to_keys()
+
+        # free signals are in special frame in dbc...
+        if len(db.signals) > 0:
+            free_signals_dummy_frame = canmatrix.Frame("VECTOR__INDEPENDENT_SIG_MSG")
+            # set arbitration id manualy, constructor would not allow this special id
+            free_signals_dummy_frame.arbitration_id.extended = True
+            free_signals_dummy_frame.arbitration_id.id = 0x40000000
+            free_signals_dummy_frame.signals = db.signals
+            self.frames.append(free_signals_dummy_frame)
+
+        # shorten long environment variable names
+        self.shorten_env_var_names()
+
+        header = "VERSION \"created by canmatrix\"\n\n\nNS_ :\n\nBS_:\n\n"
+        self.write_text(header)
+
+        # ECUs
+        self.write_text("BU_: ")
+
+        for ecu in db.ecus:
+            # fix long ecu names:
+            ecu_name = self.name(ecu)
+            if len(ecu_name) > 32:
+                self.add_attribute(ecu, "SystemNodeLongSymbol", ecu_name)
+                ecu_name = self.names[id(ecu)] = ecu_name[0:32]
+                self.add_define(self.ecu_defines, "SystemNodeLongSymbol", "STRING")
+
+            self.write_text(ecu_name + " ")
+
+        self.write_text("\n\n")
+
+        if self.write_val_table:
+            # ValueTables
+            for table in sorted(db.value_tables):
+                self.write_text("VAL_TABLE_ " + table)
+                for row in db.value_tables[table]:
+                    self.write_text(' {} "{}"'.format(str(row), db.value_tables[table][row]))
+                self.write_text(";\n")
+            self.write_text("\n")
+
+        raw_start_values = self.name_signals()
+        frames = self.frames
+        output_names = self.output_names
+
+        if len(frames) > 0:
+            if max([x.cycle_time for x in frames]) > 0:
+                self.add_define(self.frame_defines, "GenMsgCycleTime", 'INT 0 65535')
+            if len(raw_start_values) > 0:
+                if max([x.cycle_time for y in frames for x in y.signals]) > 0:
+                    self.add_define(self.signal_defines, "GenSigCycleTime", 'INT 0 65535')
+
+                if max(raw_start_values) > 0 or min(raw_start_values) < 0:
+                    self.add_define(self.signal_defines, "GenSigStartValue", 'FLOAT 0 100000000000')
+
+        # Frames
+        for frame in frames:
+            multiplex_written = False
+            transmitters = frame.transmitters or ["Vector__XXX"]
+
+            self.write_text(
+                "BO_ %d " %
+                frame.arbitration_id.to_compound_integer() +
+                self.name(frame) +
+                ": %d " %
+                frame.size +
+                transmitters[0] +
+                "\n")
 
-    for define_name in sorted(defaults):
-        f.write(('BA_DEF_DEF_ "' + define_name + '" ').encode(dbc_export_encoding, ignore_encoding_errors) +
-                defaults[define_name].encode(dbc_export_encoding, 'replace') + ';\n'.encode(dbc_export_encoding, ignore_encoding_errors))
+            for signal in frame.signals:
+                if signal.multiplex == 'Multiplexor' and multiplex_written and not frame.is_complex_multiplexed:
+                    continue
+                signal_line = " SG_ " + output_names[frame][signal] + " "
 
-    # ecu-attributes:
-    for ecu in db.ecus:
-        for attrib, val in sorted(ecu.attributes.items()):
-            f.write(create_attribute_string(attrib, "BU_", ecu.name, val, db.ecu_defines[attrib].type == "STRING").encode(dbc_export_encoding, ignore_encoding_errors))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
+                if signal.mux_val is not None:
+                    signal_line += "m{}".format(int(signal.mux_val))
+                    if signal.multiplex != 'Multiplexor':
+                        signal_line += " "
 
-    # global-attributes:
-    for attrib, val in sorted(db.attributes.items()):
-        f.write(create_attribute_string(attrib, "", "", val, db.global_defines[attrib].type == "STRING").encode(
-            dbc_export_encoding, ignore_encoding_errors))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
+                if signal.multiplex == 'Multiplexor':
+                    signal_line += "M "
+                    multiplex_written = True
 
-    # messages-attributes:
-    for frame in db.frames:
-        for attrib, val in sorted(frame.attributes.items()):
-            f.write(create_attribute_string(attrib, "BO_", str(frame.arbitration_id.to_compound_integer()), val, db.frame_defines[attrib].type == "STRING").encode(dbc_export_encoding, ignore_encoding_errors))
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
+                start_bit = signal.get_startbit(bit_numbering=1)
 
-    # signal-attributes:
-    for frame in db.frames:
-        for signal in frame.signals:
-            for attrib, val in sorted(signal.attributes.items()):
-                name = output_names[frame][signal]
-                if isinstance(val, float):
-                    val = format_float(val)
-                if attrib in db.signal_defines:
-                    f.write(create_attribute_string(
-                        attrib, "SG_", '%d ' % frame.arbitration_id.to_compound_integer() + name, val,
-                        db.signal_defines[attrib].type == "STRING").encode(dbc_export_encoding, ignore_encoding_errors)
-                    )
-
-    f.write("\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    for env_var_name, env_var in db.env_vars.items():
-        if "attributes" in env_var:
-            for attribute, value in env_var["attributes"].items():
-                f.write(create_attribute_string(attribute, "EV_", "", value,
-                                                db.env_defines[attribute].type == "STRING").encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # signal-values:
-    for frame in db.frames:
-        for signal in frame.signals:
-            if signal.values:
-                f.write(
-                    ('VAL_ %d ' %
-                     frame.arbitration_id.to_compound_integer() +
-                     output_names[frame][signal]).encode(dbc_export_encoding, ignore_encoding_errors))
-                for attr_name, val in sorted(signal.values.items(), key=lambda x: int(x[0])):
-                    if '"' in val:
-                        val = val.replace('"', '\\"')
-                    f.write(
-                        (' ' + str(attr_name) + ' "' + val + '"').encode(dbc_export_encoding, ignore_encoding_errors))
-
-                f.write(";\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    # SIG_VALTYPE
-    for frame in db.frames:
-        for signal in frame.signals:
-            if signal.is_float:
-                if int(signal.size) > 32:
-                    f.write(('SIG_VALTYPE_ %d %s : 2;\n' % (frame.arbitration_id.to_compound_integer(), output_names[frame][signal])).encode(
-                        dbc_export_encoding, ignore_encoding_errors))
+                if signal.is_signed:
+                    sign = '-'
                 else:
-                    f.write(('SIG_VALTYPE_ %d %s : 1;\n' % (frame.arbitration_id.to_compound_integer(), output_names[frame][signal])).encode(
-                        dbc_export_encoding, ignore_encoding_errors))
-
-    # signal-groups:
-    for frame in db.frames:
-        for sigGroup in frame.signalGroups:
-            f.write(("SIG_GROUP_ " + str(frame.arbitration_id.to_compound_integer()) + " " + sigGroup.name +
-                     " " + str(sigGroup.id) + " :").encode(dbc_export_encoding, ignore_encoding_errors))
-            for signal in sigGroup.signals:
-                f.write((" " + output_names[frame][signal]).encode(dbc_export_encoding, ignore_encoding_errors))
-            f.write(";\n".encode(dbc_export_encoding, ignore_encoding_errors))
-
-    for frame in db.frames:
-        if frame.is_complex_multiplexed:
+                    sign = '+'
+                signal_line += (": %d|%d@%d%c" %
+                                (start_bit,
+                                 signal.size,
+                                 signal.is_little_endian,
+                                 sign))
+                signal_line += " (%s,%s)" % (format_float(signal.factor), format_float(signal.offset))
+                signal_line += " [{}|{}]".format(format_float(signal.min), format_float(signal.max))
+                signal_line += ' "'
+
+                if signal.unit is not None:
+                    signal_line += signal.unit
+                signal_line += '" '
+
+                signal_line += ','.join(signal.receivers or ['Vector__XXX']) + "\n"
+                self.write_text(signal_line)
+
+            self.write_text("\n")
+        self.write_text("\n")
+
+        # second Sender:
+        for frame in frames:
+            if len(frame.transmitters) > 1:
+                self.write_text("BO_TX_BU_ %d : %s;\n" % (frame.arbitration_id.to_compound_integer(), ','.join(frame.transmitters)))
+
+        # frame comments
+        # wow, there are dbcs where comments are encoded with other coding than rest of dbc...
+        for frame in frames:
+            self.write_bytes(create_comment_string("BO_", "%d " % frame.arbitration_id.to_compound_integer(), frame.comment, self.encoding, self.comment_encoding, self.encoding))
+        self.write_text("\n")
+
+        # signal comments
+        for frame in frames:
             for signal in frame.signals:
-                if signal.muxer_for_signal is not None:
-                    f.write(("SG_MUL_VAL_ %d %s %s " % (frame.arbitration_id.to_compound_integer(), output_names[frame][signal], signal.muxer_for_signal)).encode(dbc_export_encoding, ignore_encoding_errors))
-                    f.write((", ".join(["%d-%d" % (a, b) for a, b in signal.mux_val_grp])).encode(dbc_export_encoding, ignore_encoding_errors))
+                if signal.comment:
+                    name = output_names[frame][signal]
+                    self.write_bytes(create_comment_string(
+                        "SG_",
+                        "%d " % frame.arbitration_id.to_compound_integer() + name,
+                        signal.comment,
+                        self.encoding,
+                        self.comment_encoding, self.encoding))
+        self.write_text("\n")
+
+        # ecu comments
+        for ecu in db.ecus:
+            if ecu.comment:
+                self.write_bytes(create_comment_string("BU_", self.name(ecu), ecu.comment, self.encoding,
+                                                       self.comment_encoding, self.encoding))
+        self.write_text("\n")
+
+        defaults = {}  # type: typing.Dict[str, str]
+
+        # write defines
+        for defines, define_type in ((self.frame_defines, "BO_"), (self.signal_defines, "SG_"), (self.ecu_defines, "BU_"),
+                                     (self.env_defines, "EV_"), (self.global_defines, "")):
+            for (data_type, define) in sorted(list(defines.items())):
+                # check_define replaces unsupported types (the attributes are written as STRING then), not in the matrix
+                define = defines[data_type] = copy.copy(define)
+                self.write_text(create_define(data_type, define, define_type, defaults), 'replace')
+
+        for define_name in sorted(defaults):
+            self.write_bytes(('BA_DEF_DEF_ "' + define_name + '" ').encode(self.encoding, self.ignore_encoding_errors) +
+                             defaults[define_name].encode(self.encoding, 'replace') + ';\n'.encode(self.encoding, self.ignore_encoding_errors))
+
+        # ecu-attributes:
+        for ecu in db.ecus:
+            for attrib, val in sorted(self.attributes_of(ecu).items()):
+                self.write_text(create_attribute_string(attrib, "BU_", self.name(ecu), val, self.ecu_defines[attrib].type == "STRING"))
+        self.write_text("\n")
+
+        # global-attributes:
+        for attrib, val in sorted(self.attributes.items()):
+            self.write_text(create_attribute_string(attrib, "", "", val, self.global_defines[attrib].type == "STRING"))
+        self.write_text("\n")
+
+        # messages-attributes:
+        for frame in frames:
+            for attrib, val in sorted(self.attributes_of(frame).items()):
+                self.write_text(create_attribute_string(attrib, "BO_", str(frame.arbitration_id.to_compound_integer()), val, self.frame_defines[attrib].type == "STRING"))
+        self.write_text("\n")
+
+        # signal-attributes:
+        for frame in frames:
+            for signal in frame.signals:
+                for attrib, val in sorted(self.attributes_of(signal).items()):
+                    name = output_names[frame][signal]
+                    if isinstance(val, float):
+                        val = format_float(val)
+                    if attrib in self.signal_defines:
+                        self.write_text(create_attribute_string(
+                            attrib, "SG_", '%d ' % frame.arbitration_id.to_compound_integer() + name, val,
+                            self.signal_defines[attrib].type == "STRING"))
+
+        self.write_text("\n")
+
+        for env_var_name, env_var in self.env_vars.items():
+            if "attributes" in env_var:
+                for attribute, value in env_var["attributes"].items():
+                    self.write_text(create_attribute_string(attribute, "EV_", "", value,
+                                                            self.env_defines[attribute].type == "STRING"))
+
+        # signal-values:
+        for frame in frames:
+            for signal in frame.signals:
+                if signal.values:
+                    self.write_text('VAL_ %d ' % frame.arbitration_id.to_compound_integer() + output_names[frame][signal])
+                    for attr_name, val in sorted(signal.values.items(), key=lambda x: int(x[0])):
+                        if '"' in val:
+                            val = val.replace('"', '\\"')
+                        self.write_text(' ' + str(attr_name) + ' "' + val + '"')
 
-                    f.write(";\n".encode(dbc_export_encoding, ignore_encoding_errors))
+                    self.write_text(";\n")
 
-    for env_var_name in db.env_vars:
-        env_var = db.env_vars[env_var_name]
-        f.write(("EV_ {0} : {1} [{2}|{3}] \"{4}\" {5} {6} {7} {8};\n".format(
-            env_var_name, env_var["varType"], env_var["min"],
-            env_var["max"], env_var["unit"], env_var["initialValue"],
-            env_var["evId"], env_var["accessType"],
-            ",".join(env_var["accessNodes"]))).encode(dbc_export_encoding, ignore_encoding_errors))
+        # SIG_VALTYPE
+        for frame in frames:
+            for signal in frame.signals:
+                if signal.is_float:
+                    if int(signal.size) > 32:
+                        self.write_text('SIG_VALTYPE_ %d %s : 2;\n' % (frame.arbitration_id.to_compound_integer(), output_names[frame][signal]))
+                    else:
+                        self.write_text('SIG_VALTYPE_ %d %s : 1;\n' % (frame.arbitration_id.to_compound_integer(), output_names[frame][signal]))
+
+        # signal-groups:
+        for frame in frames:
+            for sigGroup in frame.signalGroups:
+                self.write_text("SIG_GROUP_ " + str(frame.arbitration_id.to_compound_integer()) + " " + sigGroup.name +
+                                " " + str(sigGroup.id) + " :")
+                for signal in sigGroup.signals:
+                    self.write_text(" " + output_names[frame][signal])
+                self.write_text(";\n")
+
+        for frame in frames:
+            if frame.is_complex_multiplexed:
+                for signal in frame.signals:
+                    if signal.muxer_for_signal is not None:
+                        self.write_text("SG_MUL_VAL_ %d %s %s " % (frame.arbitration_id.to_compound_integer(), output_names[frame][signal], signal.muxer_for_signal))
+                        self.write_text(", ".join(["%d-%d" % (a, b) for a, b in signal.mux_val_grp]))
 
+                        self.write_text(";\n")
 
-class _FollowUps(object):
-    NOTHING, SIGNAL_COMMENT, FRAME_COMMENT, BOARD_UNIT_COMMENT, GLOBAL_COMMENT = range(5)
+        for env_var_name in self.env_vars:
+            env_var = self.env_vars[env_var_name]
+            self.write_text("EV_ {0} : {1} [{2}|{3}] \"{4}\" {5} {6} {7} {8};\n".format(
+                env_var_name, env_var["varType"], env_var["min"],
+                env_var["max"], env_var["unit"], env_var["initialValue"],
+                env_var["evId"], env_var["accessType"],
+                ",".join(env_var["accessNodes"])))
+        self.flush()
 
 
-def load(f, **options):  # type: (typing.IO, **typing.Any) -> canmatrix.CanMatrix
-    dbc_import_encoding = options.get("dbcImportEncoding", 'iso-8859-1')
-    dbc_comment_encoding = options.get("dbcImportCommentEncoding", dbc_import_encoding)
-    float_factory = options.get('float_factory', default_float_factory)
+def dump(in_db, f, **options):
+    # type: (canmatrix.CanMatrix, typing.IO, **typing.Any) -> None
+    """Write in_db as dbc, the matrix is not changed (see _DbcWriter)."""
+    _DbcWriter(in_db, **options).write(f)
 
-    i = 0
 
-    follow_up = _FollowUps.NOTHING
-    comment = ""
-    signal = None  # type: typing.Optional[canmatrix.Signal]
-    frame = None
-    board_unit = None
-    db = canmatrix.CanMatrix()
-    frames_by_id = {}  # type: typing.Dict[int, canmatrix.Frame]
+class _FollowUps(object):
+    NOTHING, SIGNAL_COMMENT, FRAME_COMMENT, BOARD_UNIT_COMMENT, GLOBAL_COMMENT = range(5)
 
-    def hash_arbitration_id(arbitration_id):  # type: (canmatrix.ArbitrationId) -> int
-        return hash((arbitration_id.id, arbitration_id.extended))
 
-    def get_frame_by_id(arbitration_id):  # type: (canmatrix.ArbitrationId) -> typing.Optional[canmatrix.Frame]
+# grammar of the dbc lines, compiled once (see _DbcParser)
+_patterns = {
+    "frame": r"^BO_ ([^\ ]+) ([^\ ]+) *: *([^\ ]+) ([^\ ]+)",
+    "signal": r"^SG_ +(\S+) *: *(\d+)\|(\d+)@(\d+)([\+|\-]) *\(([0-9.+\-eE]+), *([0-9.+\-eE]+)\) *\[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] +\"(.*)\" +(.*)",
+    "multiplexed_signal": r"^SG_ +(.+?) +(.+?) *: *(\d+)\|(\d+)@(\d+)([\+|\-]) *\(([0-9.+\-eE]+),([0-9.+\-eE]+)\) *\[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] +\"(.*)\" +(.*)",
+    "frame_transmitters": r"^BO_TX_BU_ ([0-9]+) *: *(.+) *;",
+    "signal_comment": r"^CM_ +SG_ +(\S+) +(\S+) +\"(.*)\" *;",
+    "signal_comment_start": r"^CM_ +SG_ +(\S+) +(\S+) +\"(.*)",
+    "frame_comment": r"^CM_ +BO_ +(\S+) +\"(.*)\" *;",
+    "frame_comment_start": r"^CM_ +BO_ +(\S+) +\"(.*)",
+    "ecu_comment": r"^CM_ +BU_ +(\S+) +\"(.*)\" *;",
+    "ecu_comment_start": r"^CM_ +BU_ +(\S+) +\"(.*)",
+    "comment_end": r'.*" *;\Z',
+    "ecus": r"^BU_\:(.*)",
+    "values": r"^VAL_ +(\d+)? *(\S+) +(.*) *;",
+    "value_table": r"^VAL_TABLE_ +(\S+) +(.*) *;",
+    "typed_define": r"^\"(.+?)\" +(.+); *",
+    "global_define": r"^BA_DEF_ +\"(.+?)\" +(.+) *;",
+    "define_default": r"^BA_DEF_DEF_ +\"(.+?)\" +(.+?) *;",
+    "attribute": r"^BA_ +\".+?\" +(.+)",
+    "frame_attribute": r"^BA_ +\"(.+?)\" +BO_ +(\d+) +(.+) *; *",
+    "signal_attribute": r"^BA_ +\"(.+?)\" +SG_ +(\d+) +(\S+) +(.+) *; *",
+    "env_attribute": r"^BA_ +\"(.+?)\" +EV_ +(\S+) +(.*) *; *",
+    "ecu_attribute": r"^BA_ +\"(.*?)\" +BU_ +(\S+) +(.+) *; *",
+    "global_attribute": r"^BA_ +\"([A-Za-z0-9\-_]+)\" +([\"\S\-\.]+) *; *",
+    "signal_group": r"^SIG_GROUP_ +(\S+) +(\S+) +(\S+) +\:(.*) *; *",
+    "signal_value_type": r"^SIG_VALTYPE_ +(\S+) +(\S+)\s*\:(.*) *; *",
+    "signal_mux_values": r"^SG_MUL_VAL_ +([0-9]+) +([\S\-]+) +([\S\-]+) +(.*) *; *",
+    "env_var": r"^EV_ +([\S\-\_]+?) *\: +([0-9]+) +\[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] +\"(.*?)\" +([0-9.+\-eE]+) +([0-9.+\-eE]+) +([\S\-]+?) +(.*); *",
+}
+_compiled_patterns = {name: re.compile(pattern) for name, pattern in _patterns.items()}
+# patterns which are also matched on the undecoded line, units and comments have their own encoding
+_raw_pattern_names = (
+    "signal", "multiplexed_signal", "signal_comment", "signal_comment_start", "frame_comment", "frame_comment_start",
+    "ecu_comment", "ecu_comment_start", "typed_define", "global_define", "define_default")
+_compiled_raw_patterns = {}  # type: typing.Dict[str, typing.Dict[str, typing.Pattern[bytes]]]
+
+# id and extended flag of a compound id, like ArbitrationId.from_compound_integer
+_frame_key_mask = ((1 << 29) - 1) | (1 << 31)
+
+
+class _DbcParser(object):
+    """Parses the lines of a dbc file into a CanMatrix in a single pass.
+
+    Lines are dispatched by their first three characters to the handlers of the keywords,
+    all patterns are compiled once per process (per encoding for the undecoded lines).
+    """
+
+    def __init__(self, db, dbc_import_encoding, dbc_comment_encoding):
+        # type: (canmatrix.CanMatrix, str, str) -> None
+        self.db = db
+        self.dbc_import_encoding = dbc_import_encoding
+        self.dbc_comment_encoding = dbc_comment_encoding
+        if dbc_import_encoding not in _compiled_raw_patterns:
+            _compiled_raw_patterns[dbc_import_encoding] = {
+                name: re.compile(_patterns[name].encode(dbc_import_encoding)) for name in _raw_pattern_names}
+        self.raw_patterns = _compiled_raw_patterns[dbc_import_encoding]
+        self.line_number = 0
+        self.follow_up = _FollowUps.NOTHING
+        self.comment = ""
+        self.signal = None  # type: typing.Optional[canmatrix.Signal]
+        self.frame = None  # type: typing.Optional[canmatrix.Frame]
+        self.board_unit = None  # type: typing.Optional[canmatrix.Ecu]
+        self.frames_by_id = {}  # type: typing.Dict[int, canmatrix.Frame]
+        # first three characters of a line: (prefix, handler) in order of precedence
+        self.handlers = {
+            "BO_": [("BO_ ", self.parse_frame), ("BO_TX_BU_ ", self.parse_frame_transmitters)],
+            "SG_": [("SG_ ", self.parse_signal), ("SG_MUL_VAL_ ", self.parse_signal_mux_values)],
+            "CM_": [("CM_ SG_ ", self.parse_signal_comment), ("CM_ BO_ ", self.parse_frame_comment),
+                    ("CM_ BU_ ", self.parse_ecu_comment)],
+            "BU_": [("BU_:", self.parse_ecus)],
+            "VAL": [("VAL_ ", self.parse_values), ("VAL_TABLE_ ", self.parse_value_table)],
+            "BA_": [("BA_DEF_", self.parse_define), ("BA_ ", self.parse_attribute)],
+            "SIG": [("SIG_GROUP_ ", self.parse_signal_group), ("SIG_VALTYPE_ ", self.parse_signal_value_type)],
+            "EV_": [("EV_ ", self.parse_env_var)],
+        }  # type: typing.Dict[str, typing.List[typing.Tuple[str, typing.Callable[[str, bytes], None]]]]
+
+    def frame_by_id(self, frame_id):  # type: (str) -> typing.Optional[canmatrix.Frame]
+        """Return frame of a compound id given in the dbc, raise for invalid ids like ArbitrationId."""
+        compound = int(frame_id)
         try:
-            return frames_by_id[hash_arbitration_id(arbitration_id)]
+            return self.frames_by_id[compound & _frame_key_mask]
         except KeyError:
+            canmatrix.ArbitrationId.from_compound_integer(compound)
             return None
 
-    def add_frame_by_id(new_frame):  # type: (canmatrix.Frame) -> None
-        frames_by_id[hash_arbitration_id(new_frame.arbitration_id)] = new_frame
+    def error(self, line):  # type: (bytes) -> None
+        logger.error("Error decoding line: %d (%s)" % (self.line_number, line))
 
-    for line in f:
-        i = i + 1
-        l = line.strip()
-        if len(l) == 0:
-            continue
+    def parse(self, lines):  # type: (typing.Iterable[bytes]) -> None
+        for line in lines:
+            self.line_number += 1
+            l = line.strip()
+            if len(l) == 0:
+                continue
+            try:
+                if self.follow_up != _FollowUps.NOTHING:
+                    self.parse_comment_line(line, l)
+                    continue
+                decoded = l.decode(self.dbc_import_encoding).strip()
+                for prefix, handler in self.handlers.get(decoded[:3], ()):
+                    if decoded.startswith(prefix):
+                        handler(decoded, l)
+                        break
+            except:
+                print("error with line no: %d" % self.line_number)
+                print(line)
+
+    def parse_comment_line(self, line, l):  # type: (bytes, bytes) -> None
+        """Continuation line of a multi line comment."""
         try:
-        # if 1==1:
+            self.comment += "\n" + l.decode(self.dbc_comment_encoding).replace('\\"', '"')
+        except:
+            self.error(line)
+        if _compiled_patterns["comment_end"].match(l.decode(self.dbc_import_encoding).strip()) is not None:
+            follow_up = self.follow_up
+            self.follow_up = _FollowUps.NOTHING
             if follow_up == _FollowUps.SIGNAL_COMMENT:
+                target = self.signal  # type: typing.Any
+            elif follow_up == _FollowUps.FRAME_COMMENT:
+                target = self.frame
+            else:
+                target = self.board_unit
+            if target is not None:
+                target.add_comment(self.comment[:-1].strip()[:-1])
+
+    def parse_frame(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["frame"].match(decoded)
+        self.frame = canmatrix.Frame(temp.group(2), arbitration_id=int(temp.group(1)),
+                                     size=int(temp.group(3)), transmitters=temp.group(4).split())
+        self.db.frames.append(self.frame)
+        self.frames_by_id[self.frame.arbitration_id.to_compound_integer()] = self.frame
+
+    def parse_signal(self, decoded, l):  # type: (str, bytes) -> None
+        dbc_import_encoding = self.dbc_import_encoding
+        original_line = l
+        if decoded.strip().endswith(r'"'):
+            decoded += r" Vector__XXX"
+            original_line += b" Vector__XXX"
+        temp = _compiled_patterns["signal"].match(decoded)
+        temp_raw = self.raw_patterns["signal"].match(original_line)
+        if temp:
+            receiver = [b.strip() for b in temp.group(11).split(',')]
+
+            temp_signal = canmatrix.Signal(
+                temp.group(1),
+                start_bit=int(temp.group(2)),
+                size=int(temp.group(3)),
+                is_little_endian=(int(temp.group(4)) == 1),
+                is_signed=(temp.group(5) == '-'),
+                factor=temp.group(6),
+                offset=temp.group(7),
+                min=temp.group(8),
+                max=temp.group(9),
+                unit=temp_raw.group(10).decode(dbc_import_encoding),
+                receivers=receiver,
+            )
+            if not temp_signal.is_little_endian:
+                # startbit of motorola coded signals are MSB in dbc
+                temp_signal.set_startbit(int(temp.group(2)), bitNumbering=1)
+            self.frame.add_signal(temp_signal)
+        else:
+            temp = _compiled_patterns["multiplexed_signal"].match(decoded)
+            temp_raw = self.raw_patterns["multiplexed_signal"].match(original_line)
+            receiver = [b.strip() for b in temp.group(12).split(',')]
+            multiplex = temp.group(2)  # type: typing.Union[str, int]
+
+            is_complex_multiplexed = False
+            is_multiplexer = False
+
+            if multiplex == 'M':
+                multiplex = 'Multiplexor'
+                is_multiplexer = True
+            elif multiplex.endswith('M'):
+                is_complex_multiplexed = True
+                multiplex = multiplex[:-1]
+
+            if multiplex != 'Multiplexor':
                 try:
-                    comment += "\n" + l.decode(dbc_comment_encoding).replace('\\"', '"')
+                    multiplex = int(multiplex[1:])
                 except:
-                    logger.error("Error decoding line: %d (%s)" % (i, line))
-                if re.match(r'.*" *;\Z',l.decode(dbc_import_encoding).strip()) is not None:
-                    follow_up = _FollowUps.NOTHING
-                    if signal is not None:
-                        signal.add_comment(comment[:-1].strip()[:-1])
-                continue
-            elif follow_up == _FollowUps.FRAME_COMMENT:
+                    raise Exception('error decoding line', l)
+
+            temp_signal = canmatrix.Signal(
+                temp.group(1),
+                start_bit=int(temp.group(3)),
+                size=int(temp.group(4)),
+                is_little_endian=(int(temp.group(5)) == 1),
+                is_signed=(temp.group(6) == '-'),
+                factor=temp.group(7),
+                offset=temp.group(8),
+                min=temp.group(9),
+                max=temp.group(10),
+                unit=temp_raw.group(11).decode(dbc_import_encoding),
+                receivers=receiver,
+                multiplex=multiplex,
+            )
+
+            if is_complex_multiplexed or is_multiplexer:
+                temp_signal.is_multiplexer = True
+                temp_signal.multiplex = 'Multiplexor'
+
+            if not temp_signal.is_little_endian:
+                # startbit of motorola coded signals are MSB in dbc
+                temp_signal.set_startbit(int(temp.group(3)), bitNumbering=1)
+            self.frame.add_signal(temp_signal)
+
+            if is_complex_multiplexed:
+                self.frame.is_complex_multiplexed = True
+
+    def parse_frame_transmitters(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["frame_transmitters"].match(decoded)
+        self.frame = self.frame_by_id(temp.group(1))
+        for ecu_name in temp.group(2).split(','):
+            self.frame.add_transmitter(ecu_name)
+
+    def parse_signal_comment(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["signal_comment"].match(decoded)
+        temp_raw = self.raw_patterns["signal_comment"].match(l)
+        if temp:
+            self.frame = self.frame_by_id(temp.group(1))
+            self.signal = self.frame.signal_by_name(temp.group(2))
+            if self.signal:
                 try:
-                    comment += "\n" + l.decode(dbc_comment_encoding).replace('\\"', '"')
+                    self.signal.add_comment(temp_raw.group(3).decode(
+                        self.dbc_comment_encoding).replace('\\"', '"'))
                 except:
-                    logger.error("Error decoding line: %d (%s)" % (i, line))
-                if re.match(r'.*" *;\Z',l.decode(dbc_import_encoding).strip()) is not None:
-                    follow_up = _FollowUps.NOTHING
-                    if frame is not None:
-                        frame.add_comment(comment[:-1].strip()[:-1])
-                continue
-            elif follow_up == _FollowUps.BOARD_UNIT_COMMENT:
+                    self.error(l)
+        else:
+            temp = _compiled_patterns["signal_comment_start"].match(decoded)
+            temp_raw = self.raw_patterns["signal_comment_start"].match(l)
+            if temp:
+                self.frame = self.frame_by_id(temp.group(1))
+                self.signal = self.frame.signal_by_name(temp.group(2))
                 try:
-                    comment += "\n" + \
-                        l.decode(dbc_comment_encoding).replace('\\"', '"')
+                    self.comment = temp_raw.group(3).decode(
+                        self.dbc_comment_encoding).replace('\\"', '"')
                 except:
-                    logger.error("Error decoding line: %d (%s)" % (i, line))
-                if re.match(r'.*" *;\Z',l.decode(dbc_import_encoding).strip()) is not None:
-                    follow_up = _FollowUps.NOTHING
-                    if board_unit is not None:
-                        board_unit.add_comment(comment[:-1].strip()[:-1])
-                continue
-            decoded = l.decode(dbc_import_encoding).strip()
-            if decoded.startswith("BO_ "):
-                regexp = re.compile(r"^BO_ ([^\ ]+) ([^\ ]+) *: *([^\ ]+) ([^\ ]+)")
-                temp = regexp.match(decoded)
-    #            db.frames.addFrame(Frame(temp.group(1), temp.group(2), temp.group(3), temp.group(4)))
-                frame = canmatrix.Frame(temp.group(2), arbitration_id=int(temp.group(1)),
-                                        size=int(temp.group(3)), transmitters=temp.group(4).split())
-                db.frames.append(frame)
-                add_frame_by_id(frame)
-            elif decoded.startswith("SG_ "):
-                original_line = l
-                if decoded.strip().endswith(r'"'):
-                    decoded += r" Vector__XXX"
-                    original_line += b" Vector__XXX"
-                pattern = r"^SG_ +(\S+) *: *(\d+)\|(\d+)@(\d+)([\+|\-]) *\(([0-9.+\-eE]+), *([0-9.+\-eE]+)\) *\[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] +\"(.*)\" +(.*)"
-                regexp = re.compile(pattern)
-                temp = regexp.match(decoded)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp_raw = regexp_raw.match(original_line)
-                if temp:
-                    receiver = [b.strip() for b in temp.group(11).split(',')]
-
-                    extras = {}  # type: typing.Dict[typing.Any, typing.Any]
-#                    if float_factory is not None:
-#                        extras['float_factory'] = float_factory
-
-                    temp_signal = canmatrix.Signal(
-                        temp.group(1),
-                        start_bit=int(temp.group(2)),
-                        size=int(temp.group(3)),
-                        is_little_endian=(int(temp.group(4)) == 1),
-                        is_signed=(temp.group(5) == '-'),
-                        factor=temp.group(6),
-                        offset=temp.group(7),
-                        min=temp.group(8),
-                        max=temp.group(9),
-                        unit=temp_raw.group(10).decode(dbc_import_encoding),
-                        receivers=receiver,
-                        **extras
-                    )
-                    if not temp_signal.is_little_endian:
-                        # startbit of motorola coded signals are MSB in dbc
-                        temp_signal.set_startbit(int(temp.group(2)), bitNumbering=1)
-                    frame.add_signal(temp_signal)
-    #                db.frames.addSignalToLastFrame(tempSig)
-                else:
-                    pattern = r"^SG_ +(.+?) +(.+?) *: *(\d+)\|(\d+)@(\d+)([\+|\-]) *\(([0-9.+\-eE]+),([0-9.+\-eE]+)\) *\[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] +\"(.*)\" +(.*)"
-                    regexp = re.compile(pattern)
-                    regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                    temp = regexp.match(decoded)
-                    temp_raw = regexp_raw.match(original_line)
-                    receiver = [b.strip() for b in temp.group(12).split(',')]
-                    multiplex = temp.group(2)  # type: str
-
-                    is_complex_multiplexed = False
-                    is_multiplexer = False
-
-                    if multiplex == 'M':
-                        multiplex = 'Multiplexor'
-                        is_multiplexer = True
-                    elif multiplex.endswith('M'):
-                        is_complex_multiplexed = True
-                        multiplex = multiplex[:-1]
-
-                    if multiplex != 'Multiplexor':
-                        try:
-                            multiplex = int(multiplex[1:])
-                        except:
-                            raise Exception('error decoding line', line)
-
-                    extras = {}
-#                    if float_factory is not None:
-#                        extras['float_factory'] = float_factory
-
-                    temp_signal = canmatrix.Signal(
-                        temp.group(1),
-                        start_bit=int(temp.group(3)),
-                        size=int(temp.group(4)),
-                        is_little_endian=(int(temp.group(5)) == 1),
-                        is_signed=(temp.group(6) == '-'),
-                        factor=temp.group(7),
-                        offset=temp.group(8),
-                        min=temp.group(9),
-                        max=temp.group(10),
-                        unit=temp_raw.group(11).decode(dbc_import_encoding),
-                        receivers=receiver,
-                        multiplex=multiplex,
-                        **extras
-                    )
-
-                    if is_complex_multiplexed or is_multiplexer:
-                        temp_signal.is_multiplexer = True
-                        temp_signal.multiplex = 'Multiplexor'
-
-                    if not temp_signal.is_little_endian:
-                        # startbit of motorola coded signals are MSB in dbc
-                        temp_signal.set_startbit(int(temp.group(3)), bitNumbering=1)
-                    frame.add_signal(temp_signal)
-
-                    if is_complex_multiplexed:
-                        frame.is_complex_multiplexed = True
-
-            elif decoded.startswith("BO_TX_BU_ "):
-                regexp = re.compile(r"^BO_TX_BU_ ([0-9]+) *: *(.+) *;")
-                temp = regexp.match(decoded)
-                frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                for ecu_name in temp.group(2).split(','):
-                    frame.add_transmitter(ecu_name)
-            elif decoded.startswith("CM_ SG_ "):
-                pattern = r"^CM_ +SG_ +(\S+) +(\S+) +\"(.*)\" *;"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(decoded)
-                temp_raw = regexp_raw.match(l)
-                if temp:
-                    frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                    signal = frame.signal_by_name(temp.group(2))
-                    if signal:
-                        try:
-                            signal.add_comment(temp_raw.group(3).decode(
-                                dbc_comment_encoding).replace('\\"', '"'))
-                        except:
-                            logger.error(
-                                "Error decoding line: %d (%s)" %
-                                (i, line))
-                else:
-                    pattern = r"^CM_ +SG_ +(\S+) +(\S+) +\"(.*)"
-                    regexp = re.compile(pattern)
-                    regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                    temp = regexp.match(decoded)
-                    temp_raw = regexp_raw.match(l)
-                    if temp:
-                        frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                        signal = frame.signal_by_name(temp.group(2))
-                        try:
-                            comment = temp_raw.group(3).decode(
-                                dbc_comment_encoding).replace('\\"', '"')
-                        except:
-                            logger.error(
-                                "Error decoding line: %d (%s)" %
-                                (i, line))
-                        follow_up = _FollowUps.SIGNAL_COMMENT
-
-            elif decoded.startswith("CM_ BO_ "):
-                pattern = r"^CM_ +BO_ +(\S+) +\"(.*)\" *;"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(decoded)
-                temp_raw = regexp_raw.match(l)
-                if temp:
-                    frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                    if frame:
-                        try:
-                            frame.add_comment(temp_raw.group(2).decode(
-                                dbc_comment_encoding).replace('\\"', '"'))
-                        except:
-                            logger.error(
-                                "Error decoding line: %d (%s)" %
-                                (i, line))
-                else:
-                    pattern = r"^CM_ +BO_ +(\S+) +\"(.*)"
-                    regexp = re.compile(pattern)
-                    regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                    temp = regexp.match(decoded)
-                    temp_raw = regexp_raw.match(l)
-                    if temp:
-                        frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                        try:
-                            comment = temp_raw.group(2).decode(
-                                dbc_comment_encoding).replace('\\"', '"')
-                        except:
-                            logger.error(
-                                "Error decoding line: %d (%s)" %
-                                (i, line))
-                        follow_up = _FollowUps.FRAME_COMMENT
-            elif decoded.startswith("CM_ BU_ "):
-                pattern = r"^CM_ +BU_ +(\S+) +\"(.*)\" *;"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(decoded)
-                temp_raw = regexp_raw.match(l)
-                if temp:
-                    board_unit = db.ecu_by_name(temp.group(1))
-                    if board_unit:
-                        try:
-                            board_unit.add_comment(temp_raw.group(2).decode(
-                                dbc_comment_encoding).replace('\\"', '"'))
-                        except:
-                            logger.error("Error decoding line: %d (%s)" % (i, line))
-                else:
-                    pattern = r"^CM_ +BU_ +(\S+) +\"(.*)"
-                    regexp = re.compile(pattern)
-                    regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                    temp = regexp.match(decoded)
-                    temp_raw = regexp_raw.match(l)
-                    if temp:
-                        board_unit = db.ecu_by_name(temp.group(1))
-                        if board_unit:
-                            try:
-                                comment = temp_raw.group(2).decode(
-                                    dbc_comment_encoding).replace('\\"', '"')
-                            except:
-                                logger.error(
-                                    "Error decoding line: %d (%s)" %
-                                    (i, line))
-                            follow_up = _FollowUps.BOARD_UNIT_COMMENT
-            elif decoded.startswith("BU_:"):
-                pattern = r"^BU_\:(.*)"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(decoded)
-                if temp:
-                    my_temp_list = temp.group(1).split(' ')
-                    for ele in my_temp_list:
-                        if len(ele.strip()) > 1:
-                            db.ecus.append(canmatrix.Ecu(ele))
-
-            elif decoded.startswith("VAL_ "):
-                regexp = re.compile(r"^VAL_ +(\d+)? *(\S+) +(.*) *;")
-                temp = regexp.match(decoded)
-                if temp:
-                    frame_id = temp.group(1)
-                    signal_name = temp.group(2)
-                    temp_list = list(canmatrix.utils.escape_aware_split(temp.group(3), '"'))
-
-                    if frame_id:  # value for Frame
-                        try:
-                            frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(frame_id)))
-                            sg = frame.signal_by_name(signal_name)
-                            for i in range(math.floor(len(temp_list) / 2)):
-                                val = temp_list[i * 2 + 1]
-                                val = val.replace('\\"', '"')
-                                if sg:
-                                    sg.add_values(temp_list[i * 2], val)
-                        except:
-                            logger.error("Error with Line: " + str(temp_list))
-                    else:                        
-                        try:
-                            values = db.env_vars[signal_name]['values']
-                            for i in range(math.floor(len(temp_list) / 2)):
-                                val = temp_list[i * 2 + 1]
-                                val = val.replace('\\"', '"')
-                                values[temp_list[i * 2].strip()]=val
-                        except:
-                            logger.error("Error with Line: " + str(temp_list))
-
-            elif decoded.startswith("VAL_TABLE_ "):
-                regexp = re.compile(r"^VAL_TABLE_ +(\S+) +(.*) *;")
-                temp = regexp.match(decoded)
-                if temp:
-                    table_name = temp.group(1)
-                    temp_list = temp.group(2).split('"')
-                    value_hash = {}
+                    self.error(l)
+                self.follow_up = _FollowUps.SIGNAL_COMMENT
+
+    def parse_frame_comment(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["frame_comment"].match(decoded)
+        temp_raw = self.raw_patterns["frame_comment"].match(l)
+        if temp:
+            self.frame = self.frame_by_id(temp.group(1))
+            if self.frame:
+                try:
+                    self.frame.add_comment(temp_raw.group(2).decode(
+                        self.dbc_comment_encoding).replace('\\"', '"'))
+                except:
+                    self.error(l)
+        else:
+            temp = _compiled_patterns["frame_comment_start"].match(decoded)
+            temp_raw = self.raw_patterns["frame_comment_start"].match(l)
+            if temp:
+                self.frame = self.frame_by_id(temp.group(1))
+                try:
+                    self.comment = temp_raw.group(2).decode(
+                        self.dbc_comment_encoding).replace('\\"', '"')
+                except:
+                    self.error(l)
+                self.follow_up = _FollowUps.FRAME_COMMENT
+
+    def parse_ecu_comment(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["ecu_comment"].match(decoded)
+        temp_raw = self.raw_patterns["ecu_comment"].match(l)
+        if temp:
+            self.board_unit = self.db.ecu_by_name(temp.group(1))
+            if self.board_unit:
+                try:
+                    self.board_unit.add_comment(temp_raw.group(2).decode(
+                        self.dbc_comment_encoding).replace('\\"', '"'))
+                except:
+                    self.error(l)
+        else:
+            temp = _compiled_patterns["ecu_comment_start"].match(decoded)
+            temp_raw = self.raw_patterns["ecu_comment_start"].match(l)
+            if temp:
+                self.board_unit = self.db.ecu_by_name(temp.group(1))
+                if self.board_unit:
                     try:
-                        for i in range(math.floor(len(temp_list) / 2)):
-                            val = temp_list[i * 2 + 1]
-                            value_hash[temp_list[i * 2].strip()] = val.strip()
+                        self.comment = temp_raw.group(2).decode(
+                            self.dbc_comment_encoding).replace('\\"', '"')
                     except:
-                        logger.error("Error with Line: " + str(temp_list))
-                    db.add_value_table(table_name, value_hash)
-                else:
-                    logger.debug(l)
-
-            elif decoded.startswith("BA_DEF_") and decoded[7:].strip()[:3] in ["SG_", "BO_", "BU_", "EV_"]:
-                substring = decoded[7:].strip()
-                define_type = substring[:3]
-                substring = substring[3:].strip()
-                pattern = r"^\"(.+?)\" +(.+); *"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(substring)
-                substring_line = l[7:].strip()[3:].strip()
-                temp_raw = regexp_raw.match(substring_line)
-                if temp:
-                    if define_type == "SG_":
-                        db.add_signal_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
-                    elif define_type == "BO_":
-                        db.add_frame_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
-                    elif define_type == "BU_":
-                        db.add_ecu_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
-                    elif define_type == "EV_":
-                        db.add_env_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
-
-            elif decoded.startswith("BA_DEF_ "):
-                pattern = r"^BA_DEF_ +\"(.+?)\" +(.+) *;"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(decoded)
-                temp_raw = regexp_raw.match(l)
-                if temp:
-                    db.add_global_defines(temp.group(1),
-                                          temp_raw.group(2).decode(dbc_import_encoding))
-
-            elif decoded.startswith("BA_ "):
-                regexp = re.compile(r"^BA_ +\".+?\" +(.+)")
-                tempba = regexp.match(decoded)
-
-                if tempba.group(1).strip().startswith("BO_ "):
-                    regexp = re.compile(r"^BA_ +\"(.+?)\" +BO_ +(\d+) +(.+) *; *")
-                    temp = regexp.match(decoded)
-                    get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(2)))).add_attribute(
-                        temp.group(1), temp.group(3))
-                elif tempba.group(1).strip().startswith("SG_ "):
-                    regexp = re.compile(r"^BA_ +\"(.+?)\" +SG_ +(\d+) +(\S+) +(.+) *; *")
-                    temp = regexp.match(decoded)
-                    if temp is not None:
-                        get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(2)))).signal_by_name(
-                            temp.group(3)).add_attribute(temp.group(1), temp.group(4))
-                elif tempba.group(1).strip().startswith("EV_ "):
-                    regexp = re.compile(r"^BA_ +\"(.+?)\" +EV_ +(\S+) +(.*) *; *")
-                    temp = regexp.match(decoded)
-                    if temp is not None:
-                        db.add_env_attribute(temp.group(2), temp.group(1), temp.group(3))
-                elif tempba.group(1).strip().startswith("BU_ "):
-                    regexp = re.compile(r"^BA_ +\"(.*?)\" +BU_ +(\S+) +(.+) *; *")
-                    temp = regexp.match(decoded)
-                    db.ecu_by_name(
-                        temp.group(2)).add_attribute(
-                        temp.group(1),
-                        temp.group(3))
-                else:
-                    regexp = re.compile(
-                        r"^BA_ +\"([A-Za-z0-9\-_]+)\" +([\"\S\-\.]+) *; *")
-                    temp = regexp.match(decoded)
-                    if temp:
-                        db.add_attribute(temp.group(1), temp.group(2))
-
-            elif decoded.startswith("SIG_GROUP_ "):
-                regexp = re.compile(r"^SIG_GROUP_ +(\S+) +(\S+) +(\S+) +\:(.*) *; *")
-                temp = regexp.match(decoded)
-                frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                if frame is not None:
-                    signal_array = temp.group(4).split(' ')
-                    frame.add_signal_group(temp.group(2), temp.group(3), signal_array)  # todo wrong annotation in canmatrix? Id is a string?
-
-            elif decoded.startswith("SIG_VALTYPE_ "):
-                regexp = re.compile(r"^SIG_VALTYPE_ +(\S+) +(\S+)\s*\:(.*) *; *")
-                temp = regexp.match(decoded)
-                frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(temp.group(1))))
-                if frame:
-                    signal = frame.signal_by_name(temp.group(2))
-                    signal.is_float = True
+                        self.error(l)
+                    self.follow_up = _FollowUps.BOARD_UNIT_COMMENT
+
+    def parse_ecus(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["ecus"].match(decoded)
+        if temp:
+            my_temp_list = temp.group(1).split(' ')
+            for ele in my_temp_list:
+                if len(ele.strip()) > 1:
+                    self.db.ecus.append(canmatrix.Ecu(ele))
+
+    def parse_values(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["values"].match(decoded)
+        if temp:
+            frame_id = temp.group(1)
+            signal_name = temp.group(2)
+            temp_list = list(canmatrix.utils.escape_aware_split(temp.group(3), '"'))
+
+            if frame_id:  # value for Frame
+                try:
+                    self.frame = self.frame_by_id(frame_id)
+                    sg = self.frame.signal_by_name(signal_name)
+                    for i in range(math.floor(len(temp_list) / 2)):
+                        val = temp_list[i * 2 + 1]
+                        val = val.replace('\\"', '"')
+                        if sg:
+                            sg.add_values(temp_list[i * 2], val)
+                except:
+                    logger.error("Error with Line: " + str(temp_list))
+            else:
+                try:
+                    values = self.db.env_vars[signal_name]['values']
+                    for i in range(math.floor(len(temp_list) / 2)):
+                        val = temp_list[i * 2 + 1]
+                        val = val.replace('\\"', '"')
+                        values[temp_list[i * 2].strip()] = val
+                except:
+                    logger.error("Error with Line: " + str(temp_list))
+
+    def parse_value_table(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["value_table"].match(decoded)
+        if temp:
+            table_name = temp.group(1)
+            temp_list = temp.group(2).split('"')
+            value_hash = {}
+            try:
+                for i in range(math.floor(len(temp_list) / 2)):
+                    val = temp_list[i * 2 + 1]
+                    value_hash[temp_list[i * 2].strip()] = val.strip()
+            except:
+                logger.error("Error with Line: " + str(temp_list))
+            self.db.add_value_table(table_name, value_hash)
+        else:
+            logger.debug(l)
+
+    def parse_define(self, decoded, l):  # type: (str, bytes) -> None
+        db = self.db
+        dbc_import_encoding = self.dbc_import_encoding
+        if decoded[7:].strip()[:3] in ["SG_", "BO_", "BU_", "EV_"]:
+            substring = decoded[7:].strip()
+            define_type = substring[:3]
+            substring = substring[3:].strip()
+            temp = _compiled_patterns["typed_define"].match(substring)
+            substring_line = l[7:].strip()[3:].strip()
+            temp_raw = self.raw_patterns["typed_define"].match(substring_line)
+            if temp:
+                if define_type == "SG_":
+                    db.add_signal_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
+                elif define_type == "BO_":
+                    db.add_frame_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
+                elif define_type == "BU_":
+                    db.add_ecu_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
+                elif define_type == "EV_":
+                    db.add_env_defines(temp.group(1), temp_raw.group(2).decode(dbc_import_encoding))
+
+        elif decoded.startswith("BA_DEF_ "):
+            temp = _compiled_patterns["global_define"].match(decoded)
+            temp_raw = self.raw_patterns["global_define"].match(l)
+            if temp:
+                db.add_global_defines(temp.group(1),
+                                      temp_raw.group(2).decode(dbc_import_encoding))
+
+        elif decoded.startswith("BA_DEF_DEF_ "):
+            temp = _compiled_patterns["define_default"].match(decoded)
+            temp_raw = self.raw_patterns["define_default"].match(l)
+            if temp:
+                db.add_define_default(temp.group(1),
+                                      temp_raw.group(2).decode(dbc_import_encoding))
+
+    def parse_attribute(self, decoded, l):  # type: (str, bytes) -> None
+        db = self.db
+        tempba = _compiled_patterns["attribute"].match(decoded)
+
+        if tempba.group(1).strip().startswith("BO_ "):
+            temp = _compiled_patterns["frame_attribute"].match(decoded)
+            self.frame_by_id(temp.group(2)).add_attribute(temp.group(1), temp.group(3))
+        elif tempba.group(1).strip().startswith("SG_ "):
+            temp = _compiled_patterns["signal_attribute"].match(decoded)
+            if temp is not None:
+                self.frame_by_id(temp.group(2)).signal_by_name(
+                    temp.group(3)).add_attribute(temp.group(1), temp.group(4))
+        elif tempba.group(1).strip().startswith("EV_ "):
+            temp = _compiled_patterns["env_attribute"].match(decoded)
+            if temp is not None:
+                db.add_env_attribute(temp.group(2), temp.group(1), temp.group(3))
+        elif tempba.group(1).strip().startswith("BU_ "):
+            temp = _compiled_patterns["ecu_attribute"].match(decoded)
+            db.ecu_by_name(
+                temp.group(2)).add_attribute(
+                temp.group(1),
+                temp.group(3))
+        else:
+            temp = _compiled_patterns["global_attribute"].match(decoded)
+            if temp:
+                db.add_attribute(temp.group(1), temp.group(2))
+
+    def parse_signal_group(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["signal_group"].match(decoded)
+        self.frame = self.frame_by_id(temp.group(1))
+        if self.frame is not None:
+            signal_array = temp.group(4).split(' ')
+            self.frame.add_signal_group(temp.group(2), temp.group(3), signal_array)  # todo wrong annotation in canmatrix? Id is a string?
+
+    def parse_signal_value_type(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["signal_value_type"].match(decoded)
+        self.frame = self.frame_by_id(temp.group(1))
+        if self.frame:
+            self.signal = self.frame.signal_by_name(temp.group(2))
+            self.signal.is_float = True
     #                SIG_VALTYPE_ 0 float : 1;
 
-            elif decoded.startswith("BA_DEF_DEF_ "):
-                pattern = r"^BA_DEF_DEF_ +\"(.+?)\" +(.+?) *;"
-                regexp = re.compile(pattern)
-                regexp_raw = re.compile(pattern.encode(dbc_import_encoding))
-                temp = regexp.match(decoded)
-                temp_raw = regexp_raw.match(l)
-                if temp:
-                    db.add_define_default(temp.group(1),
-                                          temp_raw.group(2).decode(dbc_import_encoding))
-            elif decoded.startswith("SG_MUL_VAL_ "):
-                pattern = r"^SG_MUL_VAL_ +([0-9]+) +([\S\-]+) +([\S\-]+) +(.*) *; *"
-                regexp = re.compile(pattern)
-                temp = regexp.match(decoded)
-                if temp:
-                    frame_id = temp.group(1)
-                    signal_name = temp.group(2)
-                    muxer_for_signal = temp.group(3)
-                    mux_val_groups = temp.group(4).split(',')
-                    frame = get_frame_by_id(canmatrix.ArbitrationId.from_compound_integer(int(frame_id)))
-                    if frame is not None:
-                        signal = frame.signal_by_name(signal_name)
-                        frame.is_complex_multiplexed = True
-                        signal.muxer_for_signal = muxer_for_signal
-                        for muxVal in mux_val_groups:
-                            mux_val_min, mux_val_max = muxVal.split("-")
-                            mux_val_min_number = int(mux_val_min)
-                            mux_val_max_number = int(mux_val_max)
-                            signal.mux_val_grp.append([mux_val_min_number, mux_val_max_number])
-            elif decoded.startswith("EV_ "):
-                pattern = r"^EV_ +([\S\-\_]+?) *\: +([0-9]+) +\[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] +\"(.*?)\" +([0-9.+\-eE]+) +([0-9.+\-eE]+) +([\S\-]+?) +(.*); *"
-                regexp = re.compile(pattern)
-                temp = regexp.match(decoded)
-
-                var_name = temp.group(1)
-                var_type = temp.group(2)
-                min_value = temp.group(3)
-                max_value = temp.group(4)
-                unit = temp.group(5)
-                initial_value = temp.group(6)
-                ev_id = temp.group(7)
-                access_type = temp.group(8)
-                access_nodes = temp.group(9).split(",")
-                db.add_env_var(var_name, {"varType": var_type, "min": min_value, "max": max_value, "unit": unit,
-                                          "initialValue": initial_value, "evId": ev_id, "accessType": access_type,
-                                          "accessNodes": access_nodes, "values": {}})
-
-        # else:
-        except:
-            print("error with line no: %d" % i)
-            print(line)
+    def parse_signal_mux_values(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["signal_mux_values"].match(decoded)
+        if temp:
+            frame_id = temp.group(1)
+            signal_name = temp.group(2)
+            muxer_for_signal = temp.group(3)
+            mux_val_groups = temp.group(4).split(',')
+            self.frame = self.frame_by_id(frame_id)
+            if self.frame is not None:
+                self.signal = self.frame.signal_by_name(signal_name)
+                self.frame.is_complex_multiplexed = True
+                self.signal.muxer_for_signal = muxer_for_signal
+                for muxVal in mux_val_groups:
+                    mux_val_min, mux_val_max = muxVal.split("-")
+                    mux_val_min_number = int(mux_val_min)
+                    mux_val_max_number = int(mux_val_max)
+                    self.signal.mux_val_grp.append([mux_val_min_number, mux_val_max_number])
+
+    def parse_env_var(self, decoded, l):  # type: (str, bytes) -> None
+        temp = _compiled_patterns["env_var"].match(decoded)
+
+        var_name = temp.group(1)
+        var_type = temp.group(2)
+        min_value = temp.group(3)
+        max_value = temp.group(4)
+        unit = temp.group(5)
+        initial_value = temp.group(6)
+        ev_id = temp.group(7)
+        access_type = temp.group(8)
+        access_nodes = temp.group(9).split(",")
+        self.db.add_env_var(var_name, {"varType": var_type, "min": min_value, "max": max_value, "unit": unit,
+                                       "initialValue": initial_value, "evId": ev_id, "accessType": access_type,
+                                       "accessNodes": access_nodes, "values": {}})
+
+
+def load(f, **options):  # type: (typing.Union[typing.IO, canmatrix.utils.Buffer], **typing.Any) -> canmatrix.CanMatrix
+    """Load a dbc from a binary file object or a buffer (bytes, bytearray, memoryview, mmap)."""
+    dbc_import_encoding = options.get("dbcImportEncoding", 'iso-8859-1')
+    dbc_comment_encoding = options.get("dbcImportCommentEncoding", dbc_import_encoding)
+    float_factory = options.get('float_factory', default_float_factory)
+
+    db = canmatrix.CanMatrix()
+    _DbcParser(db, dbc_import_encoding, dbc_comment_encoding).parse(canmatrix.utils.iter_lines(f))
 # Backtracking
     env_var_names = list(db.env_vars.keys())
     for env_var_name in env_var_names:
@@ -970,7 +1067,7 @@ def load(f, **options):  # type: (typing.IO, **typing.Any) -> canmatrix.CanMatri
             else:
                 default_value = signal.phys2raw(None)
             gen_sig_start_value = float_factory(signal.attributes.get("GenSigStartValue", default_value))
-            signal.initial_value = (gen_sig_start_value * signal.factor) + signal.offset
+            signal.initial_value = (gen_sig_start_value * float_factory(signal.factor)) + float_factory(signal.offset)
             signal.cycle_time = int(signal.attributes.get("GenSigCycleTime", 0))
             if signal.attribute("SystemSignalLongSymbol") is not None:
                 signal.name = signal.attribute("SystemSignalLongSymbol")[1:-1]
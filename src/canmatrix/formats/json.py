@@ -25,15 +25,28 @@
 # (https://github.com/ericevenchick/CANard)
 
 import json
+import os
+import re
 import typing
 from builtins import *
 import decimal
 import canmatrix
+import canmatrix.utils
 
 
-def dump(db, f, **options):
-    # type: (canmatrix.CanMatrix, typing.BinaryIO, **str) -> None
+def _start_bit(signal, motorola_bit_format):  # type: (canmatrix.Signal, str) -> int
+    if not signal.is_little_endian:
+        if motorola_bit_format == "msb":
+            return signal.get_startbit(bit_numbering=1)
+        elif motorola_bit_format == "msbreverse":
+            return signal.get_startbit()
+    # motorola_bit_format == "lsb"
+    return signal.get_startbit(bit_numbering=1, start_little=True)
+
 
+def _export_message(db, frame, **options):
+    # type: (canmatrix.CanMatrix, canmatrix.Frame, **str) -> typing.Dict[str, typing.Any]
+    """Return the entry of frame in "messages"."""
     export_canard = options.get('jsonExportCanard', False)
     motorola_bit_format = options.get('jsonMotorolaBitFormat', "lsb")
     export_all = options.get('jsonExportAll', False)
@@ -41,143 +54,125 @@ def dump(db, f, **options):
     number_converter = float if native_types else str
     additional_frame_columns = [x for x in options.get("additionalFrameAttributes", "").split(",") if x]
 
-
-    export_dict = {}
-    if export_all:
-        export_dict['enumerations'] = db.value_tables
-
-    export_dict['messages'] = []
-
     if export_canard:
-        for frame in db.frames:
-            signals = {}
-            for signal in frame.signals:
-                signals[
-                    signal.get_startbit(
-                        bit_numbering=1,
-                        start_little=True)] = {
-                    "name": signal.name,
-                    "bit_length": signal.size,
-                    "factor": signal.factor,
-                    "offset": signal.offset}
-            export_dict['messages'].append(
-                {"name": frame.name, "id": hex(frame.arbitration_id.id), "signals": signals})
+        signals = {}
+        for signal in frame.signals:
+            signals[
+                signal.get_startbit(
+                    bit_numbering=1,
+                    start_little=True)] = {
+                "name": signal.name,
+                "bit_length": signal.size,
+                "factor": signal.factor,
+                "offset": signal.offset}
+        return {"name": frame.name, "id": hex(frame.arbitration_id.id), "signals": signals}
 
     elif export_all is False:
-        for frame in db.frames:
-            symbolic_signals = []
-            for signal in frame.signals:
-                if not signal.is_little_endian:
-                    if motorola_bit_format == "msb":
-                        start_bit = signal.get_startbit(bit_numbering=1)
-                    elif motorola_bit_format == "msbreverse":
-                        start_bit = signal.get_startbit()
-                    else:  # motorola_bit_format == "lsb"
-                        start_bit = signal.get_startbit(bit_numbering=1, start_little=True)
-                else:
-                    start_bit = signal.get_startbit(bit_numbering=1, start_little=True)
-
-                symbolic_signals.append({
-                    "name": signal.name,
-                    "start_bit": start_bit,
-                    "bit_length": signal.size,
-                    "factor": number_converter(signal.factor),
-                    "offset": number_converter(signal.offset),
-                    "is_big_endian": signal.is_little_endian is False,
-                    "is_signed": signal.is_signed,
-                    "is_float": signal.is_float,
-                })
-            symbolic_frame = {"name": frame.name,
-                              "id": int(frame.arbitration_id.id),
-                              "is_extended_frame": frame.arbitration_id.extended,
-                              "is_fd": frame.is_fd,
-                              "signals": symbolic_signals}
-            frame_attributes = {
-                attr: frame.attribute(attr)
-                for attr in additional_frame_columns
-                if frame.attribute(attr) is not None  # don't export None parameters
-            }
-            if frame_attributes:  # only add attributes if there are any
-                symbolic_frame["attributes"] = frame_attributes
-            export_dict['messages'].append(symbolic_frame)
-    else:  # export_all
-        _define_mapping = {"signal_defines": db.signal_defines, "frame_defines": db.frame_defines,
-                           "global_defines": db.global_defines, "env_defines": db.env_defines, "ecu_defines": db.ecu_defines}
-        for define_type in _define_mapping:
-            export_dict[define_type] = [{"name": a,
-                                         "define": _define_mapping[define_type][a].definition,
-                                         "default": _define_mapping[define_type][a].defaultValue,
-                                         "type": _define_mapping[define_type][a].type} for a in _define_mapping[define_type]]
-        export_dict['ecus'] = {ecu.name: ecu.comment for ecu in db.ecus}
-        export_dict['attributes'] = db.attributes
-        export_dict['value_tables'] = db.value_tables
-        export_dict['env_vars'] = db.env_vars
-        export_dict['baudrate'] = db.baudrate
-        export_dict['fd_baudrate'] = db.fd_baudrate
-
-        for frame in db.frames:
-            frame_attributes = {attribute: frame.attribute(attribute, db=db) for attribute in db.frame_defines}
-            symbolic_signals = []
-            for signal in frame.signals:
-                attributes = {attribute: signal.attribute(attribute, db=db) for attribute in db.signal_defines}
-                values = {key: signal.values[key] for key in signal.values}
-                if not signal.is_little_endian:
-                    if motorola_bit_format == "msb":
-                        start_bit = signal.get_startbit(bit_numbering=1)
-                    elif motorola_bit_format == "msbreverse":
-                        start_bit = signal.get_startbit()
-                    else:  # motorola_bit_format == "lsb"
-                        start_bit = signal.get_startbit(bit_numbering=1, start_little=True)
-                else:  # motorola_bit_format == "lsb"
-                    start_bit = signal.get_startbit(bit_numbering=1, start_little=True)
-
-                symbolic_signal = {
-                    "name": signal.name,
-                    "start_bit": start_bit,
-                    "bit_length": signal.size,
-                    "factor": number_converter(signal.factor),
-                    "offset": number_converter(signal.offset),
-                    "min": number_converter(signal.min),
-                    "max": number_converter(signal.max),
-                    "is_big_endian": signal.is_little_endian is False,
-                    "is_signed": signal.is_signed,
-                    "is_float": signal.is_float,
-                    "comment": signal.comment,
-                    "comments": signal.comments,
-                    "attributes": attributes,
-                    "initial_value": number_converter(signal.initial_value),
-                    "values": values,
-                    "is_multiplexer": signal.is_multiplexer,
-                    "mux_value": signal.mux_val,
-                    "receivers": signal.receivers,
-                }
-                if signal.multiplex is not None:
-                    symbolic_signal["multiplex"] = signal.multiplex
-                if signal.unit:
-                    symbolic_signal["unit"] = signal.unit
-                if signal.muxer_for_signal is not None:
-                    symbolic_signal["muxer_for_signal"] = signal.muxer_for_signal
-                if signal.mux_val_grp:
-                    symbolic_signal["mux_val_grp"] = signal.mux_val_grp
-
-                symbolic_signals.append(symbolic_signal)
-
-            export_dict['messages'].append(
-                {"name": frame.name,
-                 "id": int(frame.arbitration_id.id),
-                 "is_extended_frame": frame.arbitration_id.extended,
-                 "is_fd": frame.is_fd,
-                 "signals": symbolic_signals,
-                 "attributes": frame_attributes,
-                 "comment": frame.comment,
-                 "length": frame.size,
-                 "is_complex_multiplexed": frame.is_complex_multiplexed,
-                 "mux_names": frame.mux_names,
-                 "cycle_time": frame.cycle_time,
-                 "is_j1939": frame.is_j1939,
-                 "header_id": frame.header_id,
-                 "pdu_name": frame.pdu_name,
-                 "transmitters": frame.transmitters})
+        symbolic_signals = []
+        for signal in frame.signals:
+            symbolic_signals.append({
+                "name": signal.name,
+                "start_bit": _start_bit(signal, motorola_bit_format),
+                "bit_length": signal.size,
+                "factor": number_converter(signal.factor),
+                "offset": number_converter(signal.offset),
+                "is_big_endian": signal.is_little_endian is False,
+                "is_signed": signal.is_signed,
+                "is_float": signal.is_float,
+            })
+        symbolic_frame = {"name": frame.name,
+                          "id": int(frame.arbitration_id.id),
+                          "is_extended_frame": frame.arbitration_id.extended,
+                          "is_fd": frame.is_fd,
+                          "signals": symbolic_signals}
+        frame_attributes = {
+            attr: frame.attribute(attr)
+            for attr in additional_frame_columns
+            if frame.attribute(attr) is not None  # don't export None parameters
+        }
+        if frame_attributes:  # only add attributes if there are any
+            symbolic_frame["attributes"] = frame_attributes
+        return symbolic_frame
+
+    # export_all
+    frame_attributes = {attribute: frame.attribute(attribute, db=db) for attribute in db.frame_defines}
+    symbolic_signals = []
+    for signal in frame.signals:
+        attributes = {attribute: signal.attribute(attribute, db=db) for attribute in db.signal_defines}
+        values = {key: signal.values[key] for key in signal.values}
+
+        symbolic_signal = {
+            "name": signal.name,
+            "start_bit": _start_bit(signal, motorola_bit_format),
+            "bit_length": signal.size,
+            "factor": number_converter(signal.factor),
+            "offset": number_converter(signal.offset),
+            "min": number_converter(signal.min),
+            "max": number_converter(signal.max),
+            "is_big_endian": signal.is_little_endian is False,
+            "is_signed": signal.is_signed,
+            "is_float": signal.is_float,
+            "comment": signal.comment,
+            "comments": signal.comments,
+            "attributes": attributes,
+            "initial_value": number_converter(signal.initial_value),
+            "values": values,
+            "is_multiplexer": signal.is_multiplexer,
+            "mux_value": signal.mux_val,
+            "receivers": signal.receivers,
+        }
+        if signal.multiplex is not None:
+            symbolic_signal["multiplex"] = signal.multiplex
+        if signal.unit:
+            symbolic_signal["unit"] = signal.unit
+        if signal.muxer_for_signal is not None:
+            symbolic_signal["muxer_for_signal"] = signal.muxer_for_signal
+        if signal.mux_val_grp:
+            symbolic_signal["mux_val_grp"] = signal.mux_val_grp
+
+        symbolic_signals.append(symbolic_signal)
+
+    return {"name": frame.name,
+            "id": int(frame.arbitration_id.id),
+            "is_extended_frame": frame.arbitration_id.extended,
+            "is_fd": frame.is_fd,
+            "signals": symbolic_signals,
+            "attributes": frame_attributes,
+            "comment": frame.comment,
+            "length": frame.size,
+            "is_complex_multiplexed": frame.is_complex_multiplexed,
+            "mux_names": frame.mux_names,
+            "cycle_time": frame.cycle_time,
+            "is_j1939": frame.is_j1939,
+            "header_id": frame.header_id,
+            "pdu_name": frame.pdu_name,
+            "transmitters": frame.transmitters}
+
+
+def _export_matrix(db, **options):
+    # type: (canmatrix.CanMatrix, **str) -> typing.Dict[str, typing.Any]
+    """Return everything of the export except "messages"."""
+    export_dict = {}  # type: typing.Dict[str, typing.Any]
+    if options.get('jsonExportAll', False):
+        export_dict['enumerations'] = db.value_tables
+        if not options.get('jsonExportCanard', False):
+            _define_mapping = {"signal_defines": db.signal_defines, "frame_defines": db.frame_defines,
+                               "global_defines": db.global_defines, "env_defines": db.env_defines, "ecu_defines": db.ecu_defines}
+            for define_type in _define_mapping:
+                export_dict[define_type] = [{"name": a,
+                                             "define": _define_mapping[define_type][a].definition,
+                                             "default": _define_mapping[define_type][a].defaultValue,
+                                             "type": _define_mapping[define_type][a].type} for a in _define_mapping[define_type]]
+            export_dict['ecus'] = {ecu.name: ecu.comment for ecu in db.ecus}
+            export_dict['attributes'] = db.attributes
+            export_dict['value_tables'] = db.value_tables
+            export_dict['env_vars'] = db.env_vars
+            export_dict['baudrate'] = db.baudrate
+            export_dict['fd_baudrate'] = db.fd_baudrate
+    return export_dict
+
+
+def _write(export_dict, f):  # type: (typing.Mapping[str, typing.Any], typing.BinaryIO) -> None
     import io
     temp = io.TextIOWrapper(f, encoding='UTF-8')
 
@@ -190,13 +185,95 @@ def dump(db, f, **options):
         temp.detach()
 
 
-def load(f, **_options):
-    # type: (typing.BinaryIO, **str) -> canmatrix.CanMatrix
+def dump(db, f, **options):
+    # type: (canmatrix.CanMatrix, typing.BinaryIO, **str) -> None
+    export_dict = _export_matrix(db, **options)
+    export_dict['messages'] = [_export_message(db, frame, **options) for frame in db.frames]
+    _write(export_dict, f)
 
-    db = canmatrix.CanMatrix()
 
+# path separators, characters not allowed in windows file names and the escape character
+_escaped_file_name_chars = re.compile(r'[\x00-\x1f<>:"/\\|?*%]')
+
+
+def _escape_file_name_char(char):  # type: (str) -> str
+    return "%{:02X}".format(ord(char))
+
+
+def fragment_path(directory, frame_name=None):  # type: (str, typing.Optional[str]) -> str
+    """Return the path of the fragment of a frame in a fragment directory, without frame_name of matrix.json.
+
+    Path separators and other characters not allowed in file names are escaped like in URLs ("a/b" is a%2Fb.json),
+    as well as the first character of names reserved by windows (CON, NUL, ...). Every frame name has its own file,
+    the real name is stored in the fragment.
+    """
+    if frame_name is None:
+        return os.path.join(directory, "matrix.json")
+    file_name = _escaped_file_name_chars.sub(lambda match: _escape_file_name_char(match.group()), frame_name)
+    if file_name.split(".")[0].upper() in canmatrix.utils.reserved_file_names:
+        file_name = _escape_file_name_char(file_name[0]) + file_name[1:]
+    return os.path.join(directory, "frames", file_name + ".json")
+
+
+def dump_fragments(db, directory, frame_names=None, **options):
+    # type: (canmatrix.CanMatrix, str, typing.Optional[typing.Iterable[str]], **str) -> typing.List[str]
+    """Write the matrix as JSON fragments to directory, see load_fragments.
+
+    Every frame is written to frames/<frame name>.json (its entry in "messages" of dump, see fragment_path),
+    everything else to matrix.json, where "messages" lists the frame names.
+    Frames are identified by name, of frames with the same name only the first one is written.
+
+    :param frame_names: write only the fragments of these frames (and matrix.json), all if None
+    :return: the written paths
+    """
+    export_dict = _export_matrix(db, **options)
+    export_dict['messages'] = []
+    selected = None if frame_names is None else set(frame_names)
+    if not os.path.isdir(os.path.join(directory, "frames")):
+        os.makedirs(os.path.join(directory, "frames"))
+    written = []
+    seen = set()  # type: typing.Set[str]
+    for frame in db.frames:
+        if frame.name in seen:
+            continue
+        seen.add(frame.name)
+        export_dict['messages'].append(frame.name)
+        if selected is not None and frame.name not in selected:
+            continue
+        path = fragment_path(directory, frame.name)
+        with open(path, "wb") as fragment:
+            _write(_export_message(db, frame, **options), fragment)
+        written.append(path)
+    with open(fragment_path(directory), "wb") as matrix:
+        _write(export_dict, matrix)
+    written.append(fragment_path(directory))
+    return written
+
+
+def load_fragments(directory, **options):
+    # type: (str, **str) -> canmatrix.CanMatrix
+    """Load a matrix written by dump_fragments."""
+    with open(fragment_path(directory), "rb") as matrix:
+        json_data = json.load(matrix)
+    messages = []
+    for frame_name in json_data.get("messages", []):
+        with open(fragment_path(directory, frame_name), "rb") as fragment:
+            messages.append(json.load(fragment))
+    json_data["messages"] = messages
+    return _load_dict(json_data)
+
+
+def load(f, **_options):
+    # type: (typing.BinaryIO, **str) -> canmatrix.CanMatrix
     import io
     json_data = json.load(io.TextIOWrapper(f, encoding='UTF-8'))
+    db = _load_dict(json_data)
+    f.close()
+    return db
+
+
+def _load_dict(json_data):  # type: (typing.Mapping[str, typing.Any]) -> canmatrix.CanMatrix
+    db = canmatrix.CanMatrix()
 
     if "enumerations" in json_data:
         for val_tab_name, val_tab_dict in json_data['enumerations'].items():
@@ -318,6 +395,5 @@ def load(f, **_options):
             elif key == 'fd_baudrate':
                 db.fd_baudrate = json_data[key]
 
-    f.close()
     db.update_ecu_list()
     return db
@@ -26,7 +26,6 @@
 import collections
 import decimal
 import logging
-import sys
 import typing
 from builtins import *
 
@@ -320,7 +319,8 @@ Title=\"{}\"
     f.write(output.encode(sym_encoding, ignore_encoding_errors))
 
 
-def load(f, **options):  # type: (typing.IO, **typing.Any) -> canmatrix.CanMatrix
+def load(f, **options):  # type: (typing.Union[typing.IO, canmatrix.utils.Buffer], **typing.Any) -> canmatrix.CanMatrix
+    """Load a sym from a binary file object or a buffer (bytes, bytearray, memoryview, mmap)."""
     if 'symImportEncoding' in options:
         sym_import_encoding = options["symImportEncoding"]
     else:
@@ -344,9 +344,10 @@ def load(f, **options):  # type: (typing.IO, **typing.Any) -> canmatrix.CanMatri
     db.add_signal_defines("DisplayDecimalPlaces", 'INT 0 65535')
     db.add_signal_defines("LongName", 'STR')
 
-    for line_count, line in enumerate(f, 1):
+    lines = canmatrix.utils.iter_lines(f)
+    for line_count, raw_line in enumerate(lines, 1):
         try:
-            line = line.decode(sym_import_encoding).strip()
+            line = raw_line.decode(sym_import_encoding).strip()
             # ignore empty line:
             if line.__len__() == 0:
                 continue
@@ -377,10 +378,7 @@ def load(f, **options):  # type: (typing.IO, **typing.Any) -> canmatrix.CanMatri
                 if line.startswith('enum'):
                     while not line[5:].strip().endswith(')'):
                         line = line.split('//')[0]
-                        if sys.version_info > (3, 0):  # is there a clean way to to it?
-                            next_line = f.readline().decode(sym_import_encoding)
-                        else:
-                            next_line = next(f).decode(sym_import_encoding)
+                        next_line = next(lines, b"").decode(sym_import_encoding)
                         if next_line == "":
                             raise EOFError("Reached EOF before finding terminator for enum :\"{}\"".format(line))
                         line += next_line.strip()
@@ -634,6 +632,8 @@ def load(f, **options):  # type: (typing.IO, **typing.Any) -> canmatrix.CanMatri
                 # else:
                 #        print "Unrecognized line: " + l + " (%d) " % i
         except Exception as e:
+            # the source line, line is not decoded yet after decoding errors
+            line = raw_line.decode(sym_import_encoding, "replace").strip()
             if not isinstance(e, ParsingError):
                 ParsingError(
                     message=str(e),
@@ -39,6 +39,10 @@ except ImportError:
 
 representers = False
 try:
+    # lists and dicts of the matrix objects are subclasses (see canmatrix.canmatrix._TrackedList and _TrackedDict),
+    # dump them as plain lists and dicts
+    yaml.add_multi_representer(list, SafeRepresenter.represent_list)
+    yaml.add_multi_representer(dict, SafeRepresenter.represent_dict)
     yaml.add_representer(int, SafeRepresenter.represent_int)
     yaml.add_representer(str, SafeRepresenter.represent_unicode)
     yaml.add_representer(list, SafeRepresenter.represent_list)
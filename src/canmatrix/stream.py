@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming decoding of CAN traces with a CanMatrix, see CanMatrix.iter_decode.
+
+Raw messages can be given as
+
+* python-can messages (attributes timestamp, arbitration_id, is_extended_id, data)
+* tuples (timestamp, arbitration_id, data), arbitration_id is a canmatrix.ArbitrationId
+  or an integer (compound integer with bit 31 set for extended ids, ids > 0x7FF are extended)
+* a bytes like buffer of packed records: little endian float64 timestamp, uint32 compound id,
+  uint8 payload length, followed by the payload (see `pack_record`)
+"""
+
+import fnmatch
+import struct
+import typing
+
+import attr
+
+import canmatrix
+
+record_header = struct.Struct("<dIB")
+
+_extended_flag = canmatrix.ArbitrationId.compound_extended_mask
+_standard_id_mask = canmatrix.ArbitrationId.standard_id_mask
+
+
+def pack_record(timestamp, arbitration_id, data):
+    # type: (float, canmatrix.ArbitrationId, bytes) -> bytes
+    """Return one packed record (header and payload) for the given message."""
+    return record_header.pack(timestamp, arbitration_id.to_compound_integer(), len(data)) + bytes(data)
+
+
+def iter_packed_records(buffer):
+    # type: (typing.Any) -> typing.Iterator[typing.Tuple[float, int, bytes]]
+    """Yield (timestamp, compound id, data) for all packed records of the buffer."""
+    with memoryview(buffer) as view:
+        offset = 0
+        while offset < len(view):
+            timestamp, compound_id, length = record_header.unpack_from(view, offset)
+            offset += record_header.size
+            yield timestamp, compound_id, bytes(view[offset:offset + length])
+            offset += length
+
+
+def compound_id(arbitration_id):  # type: (typing.Union[int, canmatrix.ArbitrationId]) -> int
+    """Return compound integer (bit 31 set for extended ids) of an ArbitrationId or integer id."""
+    if isinstance(arbitration_id, canmatrix.ArbitrationId):
+        return arbitration_id.to_compound_integer()
+    if arbitration_id > _standard_id_mask:
+        return arbitration_id | _extended_flag
+    return arbitration_id
+
+
+def iter_raw_messages(messages):
+    # type: (typing.Any) -> typing.Iterator[typing.Tuple[float, int, bytes]]
+    """Yield (timestamp, compound id, data) for python-can messages, tuples or a buffer of packed records."""
+    if isinstance(messages, (bytes, bytearray, memoryview)):
+        for record in iter_packed_records(messages):
+            yield record
+        return
+    for message in messages:
+        if hasattr(message, "is_extended_id"):
+            arbitration_id = message.arbitration_id
+            if message.is_extended_id:
+                arbitration_id |= _extended_flag
+            yield message.timestamp, arbitration_id, message.data
+        else:
+            timestamp, arbitration_id, data = message
+            yield timestamp, compound_id(arbitration_id), data
+
+
+def _matches(name, globs):  # type: (str, typing.Sequence[str]) -> bool
+    return any(fnmatch.fnmatchcase(name, glob) for glob in globs)
+
+
+@attr.s(slots=True)
+class DecodedMessage(object):
+    """
+    Contains one decoded message of a stream (see CanMatrix.iter_decode)
+
+    * timestamp: timestamp of the raw message
+    * frame: decoded frame, None for unknown ids
+    * values: dictionary with Signal Name: raw value (value on the bus)
+    """
+    timestamp = attr.ib()  # type: float
+    frame = attr.ib()  # type: typing.Optional[canmatrix.Frame]
+    values = attr.ib(factory=dict)  # type: typing.Dict[str, canmatrix.types.RawValue]
+
+    def phys_value(self, signal_name):  # type: (str) -> canmatrix.types.PhysicalValue
+        """Return the physical value (the scaled value) of a decoded signal."""
+        return self.frame.signal_by_name(signal_name).raw2phys(self.values[signal_name])
+
+    def named_value(self, signal_name):  # type: (str) -> typing.Any
+        """Return the value of the Valuetable or the physical value of a decoded signal."""
+        return self.frame.signal_by_name(signal_name).raw2phys(self.values[signal_name], decode_to_str=True)
+
+
+@attr.s
+class FramePlan(object):
+    """
+    Precomputed decoding of one frame for a stream: codec and the selected signals.
+
+    * selection: list of (signal index, signal name, mux value or None)
+    * mux_index: index of the multiplexer signal for simple multiplexed frames
+    * use_decode: complex multiplexed frames and container PDUs are decoded with Frame.decode
+    """
+    frame = attr.ib()  # type: canmatrix.Frame
+    codec = attr.ib()  # type: canmatrix.FrameCodec
+    selection = attr.ib()  # type: typing.List[typing.Tuple[int, str, typing.Optional[int]]]
+    mux_index = attr.ib(default=None)  # type: typing.Optional[int]
+    use_decode = attr.ib(default=False)  # type: bool
+
+    @classmethod
+    def from_frame(cls, frame, signal_globs):
+        # type: (canmatrix.Frame, typing.Sequence[str]) -> FramePlan
+        codec = frame.codec
+        use_decode = frame.is_complex_multiplexed or frame.is_pdu_container
+        mux_index = None
+        if frame.is_multiplexed and not use_decode:
+            mux_index = max(index for index, signal in enumerate(codec.signals) if signal.is_multiplexer)
+        selection = [
+            (index, signal.name, signal.mux_val if mux_index is not None else None)
+            for index, signal in enumerate(codec.signals)
+            if _matches(signal.name, signal_globs)
+        ]
+        return cls(frame, codec, selection, mux_index, use_decode)
+
+    def decode(self, data):  # type: (bytes) -> typing.Dict[str, canmatrix.types.RawValue]
+        """Return dictionary with Signal Name: raw value of the selected signals."""
+        if self.use_decode:
+            decoded = self.frame.decode(data)
+            return {
+                name: decoded[name].raw_value
+                for _, name, _ in self.selection
+                if isinstance(decoded.get(name), canmatrix.DecodedSignal)
+            }
+        if len(data) != self.codec.size:
+            # let Frame.unpack report the wrong length
+            self.frame.unpack(data)
+        raw_values = self.codec.unpack(data)
+        if self.mux_index is None:
+            return {name: raw_values[index] for index, name, _ in self.selection}
+        mux_value = raw_values[self.mux_index]
+        return {
+            name: raw_values[index]
+            for index, name, signal_mux_value in self.selection
+            if signal_mux_value is None or signal_mux_value == mux_value
+        }
+
+
+class StreamDecoder(object):
+    """
+    Decoder for streams of raw messages, resolves frames once per id through a lookup table.
+
+    The matrix must not be changed while the decoder is used.
+    """
+
+    def __init__(self, matrix, frame_glob="*", signal_glob="*", skip_unknown=True):
+        # type: (canmatrix.CanMatrix, typing.Union[str, typing.Sequence[str]], typing.Union[str, typing.Sequence[str]], bool) -> None
+        self.matrix = matrix
+        self.frame_globs = [frame_glob] if isinstance(frame_glob, str) else list(frame_glob)
+        self.signal_globs = [signal_glob] if isinstance(signal_glob, str) else list(signal_glob)
+        self.skip_unknown = skip_unknown
+        self.contains_j1939 = matrix.contains_j1939
+        self.plans = dict()  # type: typing.Dict[int, typing.Optional[FramePlan]]
+        self.unknown_ids = set()  # type: typing.Set[int]
+
+    def resolve_frame(self, compound):  # type: (int) -> typing.Optional[canmatrix.Frame]
+        """Find the frame of an id like CanMatrix.decode does (including J1939 PGN lookup)."""
+        arbitration_id = canmatrix.ArbitrationId.from_compound_integer(compound)
+        frame = self.matrix.frame_by_id(arbitration_id)
+        if self.contains_j1939:
+            if not arbitration_id.extended:
+                return None
+            if frame is None:
+                frame = self.matrix.frame_by_pgn(arbitration_id.pgn)
+        return frame
+
+    def plan(self, compound):  # type: (int) -> typing.Optional[FramePlan]
+        """Return the decoding plan for an id, None if the id is unknown or filtered."""
+        frame = self.resolve_frame(compound)
+        if frame is None:
+            self.unknown_ids.add(compound)
+            plan = None
+        elif not _matches(frame.name, self.frame_globs):
+            plan = None
+        else:
+            plan = FramePlan.from_frame(frame, self.signal_globs)
+        self.plans[compound] = plan
+        return plan
+
+    def iter_decode(self, messages):  # type: (typing.Any) -> typing.Iterator[DecodedMessage]
+        plans = self.plans
+        for timestamp, compound, data in iter_raw_messages(messages):
+            try:
+                plan = plans[compound]
+            except KeyError:
+                plan = self.plan(compound)
+            if plan is not None:
+                yield DecodedMessage(timestamp, plan.frame, plan.decode(data))
+            elif not self.skip_unknown and compound in self.unknown_ids:
+                yield DecodedMessage(timestamp, None)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Readers for CAN trace files (recordings of a bus), feeding CanMatrix.iter_decode or batch decoding.
+
+Supported trace formats:
+
+* candump: log files of can-utils candump -l / -L, i.e. ``(1436509052.249713) vcan0 123#11223344``
+* asc: Vector ASCII logging format (classic CAN and CANFD lines)
+* csv: comma separated values with header ``timestamp,id,extended,data`` (id and data hexadecimal)
+* binary: packed records of canmatrix.stream (float64 timestamp, uint32 compound id,
+  uint8 payload length, payload), read by mmap
+
+All readers yield raw records (timestamp, compound id, data), the compound id has bit 31 set for extended ids.
+Text files are read in chunks of lines, binary files are mapped into memory, so traces of any size
+are read in a single pass with bounded memory.
+
+(This is not canmatrix.log, which configures the logging of the command line tools.)
+"""
+
+import csv
+import io
+import itertools
+import mmap
+import os
+import typing
+
+import attr
+
+import canmatrix
+import canmatrix.stream
+
+RawRecord = typing.Tuple[float, int, typing.Union[bytes, bytearray]]
+
+_extended_flag = canmatrix.ArbitrationId.compound_extended_mask
+
+extensions = {
+    ".log": "candump",
+    ".asc": "asc",
+    ".csv": "csv",
+    ".bin": "binary",
+}
+
+csv_header = ["timestamp", "id", "extended", "data"]
+
+
+def _hex_id(id_string, base=16):  # type: (str, int) -> int
+    """Return compound id of a hexadecimal id, extended if it has more than 3 digits or ends with x."""
+    if id_string[-1] in "xX":
+        return int(id_string[:-1], base) | _extended_flag
+    compound = int(id_string, base)
+    if len(id_string) > 3:
+        compound |= _extended_flag
+    return compound
+
+
+def read_candump(lines):  # type: (typing.Iterable[str]) -> typing.Iterator[RawRecord]
+    """Yield raw records of candump log lines, remote frames are skipped."""
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 3 or not parts[0].startswith("("):
+            continue
+        frame_id, _, data = parts[2].partition("#")
+        if data.startswith("R"):
+            continue
+        if data.startswith("#"):
+            # CAN FD: ## followed by one digit of flags
+            data = data[2:]
+        yield float(parts[0][1:-1]), _hex_id(frame_id), bytearray.fromhex(data)
+
+
+def read_asc(lines):  # type: (typing.Iterable[str]) -> typing.Iterator[RawRecord]
+    """Yield raw records of Vector ASC lines, remote frames, error frames and events are skipped."""
+    base = 16
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        if parts[0] == "base":
+            base = 16 if parts[1] == "hex" else 10
+            continue
+        try:
+            timestamp = float(parts[0])
+            if parts[1] == "CANFD":
+                # <time> CANFD <channel> <dir> <id> [<name>] <brs> <esi> <dlc> <data length> <data>
+                fields = parts[5:]
+                if fields[0] not in ("0", "1"):
+                    fields = fields[1:]
+                data_length = int(fields[3])
+                frame_id = parts[4]
+                data = fields[4:4 + data_length]
+            else:
+                # <time> <channel> <id> <dir> d <dlc> <data>
+                if len(parts) < 6 or parts[4] != "d":
+                    continue
+                frame_id = parts[2]
+                data = parts[6:6 + int(parts[5], 16)]
+            compound = int(frame_id.rstrip("xX"), base)
+        except (ValueError, IndexError):
+            continue
+        if frame_id[-1] in "xX":
+            compound |= _extended_flag
+        yield timestamp, compound, bytearray(int(byte, base) for byte in data)
+
+
+def read_csv(lines):  # type: (typing.Iterable[str]) -> typing.Iterator[RawRecord]
+    """Yield raw records of csv lines (header timestamp,id,extended,data), without extended column
+    ids > 0x7FF are extended."""
+    for row in csv.DictReader(lines):
+        compound = canmatrix.stream.compound_id(int(row["id"], 16))
+        if row.get("extended", "").strip() in ("1", "True", "true"):
+            compound |= _extended_flag
+        yield float(row["timestamp"]), compound, bytearray.fromhex(row["data"])
+
+
+def write_csv(stream, messages):  # type: (typing.TextIO, typing.Any) -> None
+    """Write messages (see canmatrix.stream) as csv trace."""
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(csv_header)
+    for timestamp, compound, data in canmatrix.stream.iter_raw_messages(messages):
+        extended = compound & _extended_flag != 0
+        writer.writerow([repr(timestamp), "{:X}".format(compound & ~_extended_flag), int(extended), bytes(data).hex()])
+
+
+def write_binary(stream, messages):  # type: (typing.BinaryIO, typing.Any) -> None
+    """Write messages (see canmatrix.stream) as packed records."""
+    for timestamp, compound, data in canmatrix.stream.iter_raw_messages(messages):
+        stream.write(canmatrix.stream.record_header.pack(timestamp, compound, len(data)))
+        stream.write(data)
+
+
+def read_binary_file(path):  # type: (str) -> typing.Iterator[RawRecord]
+    """Yield raw records of a file of packed records, the file is mapped into memory."""
+    with open(path, "rb") as trace_file:
+        if os.fstat(trace_file.fileno()).st_size == 0:
+            return
+        mapped = mmap.mmap(trace_file.fileno(), 0, access=mmap.ACCESS_READ)
+        records = canmatrix.stream.iter_packed_records(mapped)
+        try:
+            for record in records:
+                yield record
+        finally:
+            records.close()
+            mapped.close()
+
+
+def _iter_lines(stream, chunk_size):  # type: (typing.TextIO, int) -> typing.Iterator[str]
+    """Yield lines of stream, read in chunks of about chunk_size characters."""
+    while True:
+        lines = stream.readlines(chunk_size)
+        if not lines:
+            return
+        for line in lines:
+            yield line
+
+
+text_readers = {
+    "candump": read_candump,
+    "asc": read_asc,
+    "csv": read_csv,
+}
+
+
+def iter_trace(path, trace_format=None, chunk_size=1 << 20):
+    # type: (str, typing.Optional[str], int) -> typing.Iterator[RawRecord]
+    """Yield raw records (timestamp, compound id, data) of a trace file.
+
+    :param str path: path of the trace file
+    :param str trace_format: candump, asc, csv or binary, default: guessed from the file extension
+    :param int chunk_size: text files are read in chunks of about this many characters
+    """
+    if trace_format is None:
+        trace_format = extensions.get(os.path.splitext(path)[1].lower())
+    if trace_format == "binary":
+        for record in read_binary_file(path):
+            yield record
+        return
+    if trace_format not in text_readers:
+        raise ValueError("Unknown trace format {} for {}".format(trace_format, path))
+    newline = "" if trace_format == "csv" else None
+    with io.open(path, "r", encoding="ascii", errors="replace", newline=newline) as trace_file:
+        for record in text_readers[trace_format](_iter_lines(trace_file, chunk_size)):
+            yield record
+
+
+def decode_trace(matrix, path, trace_format=None, **kwargs):
+    # type: (canmatrix.CanMatrix, str, typing.Optional[str], typing.Any) -> typing.Iterator[canmatrix.stream.DecodedMessage]
+    """Decode a trace file with CanMatrix.iter_decode, kwargs are passed to iter_decode."""
+    return matrix.iter_decode(iter_trace(path, trace_format), **kwargs)
+
+
+@attr.s
+class FrameColumns(object):
+    """
+    Contains the decoded messages of one frame of a chunk (see iter_columns)
+
+    * frame: decoded frame
+    * timestamps: numpy array (float64) with the timestamps of the messages
+    * columns: dictionary with Signal Name: canmatrix.batch.DecodedColumn
+    """
+    frame = attr.ib()  # type: canmatrix.Frame
+    timestamps = attr.ib()  # type: typing.Any
+    columns = attr.ib()  # type: typing.Dict[str, typing.Any]
+
+
+def iter_columns(matrix, messages, chunk_size=65536, frame_glob="*", signal_glob="*"):
+    # type: (canmatrix.CanMatrix, typing.Any, int, typing.Union[str, typing.Sequence[str]], typing.Union[str, typing.Sequence[str]]) -> typing.Iterator[typing.Dict[str, FrameColumns]]
+    """Decode messages in chunks into columns (needs numpy, see extra "batch").
+
+    For every chunk of chunk_size messages a dictionary with Frame Name: FrameColumns is yielded,
+    the payloads of every frame are decoded with Frame.decode_batch.
+    Unknown ids and container PDUs are skipped.
+
+    :param matrix: CanMatrix to decode with
+    :param messages: messages (see canmatrix.stream), i.e. the records of iter_trace
+    :param int chunk_size: number of messages per chunk
+    :param frame_glob: glob or list of globs, only frames with matching names are decoded
+    :param signal_glob: glob or list of globs, only signals with matching names are decoded
+    """
+    import numpy
+
+    decoder = canmatrix.stream.StreamDecoder(matrix, frame_glob, signal_glob)
+    plans = decoder.plans
+    records = canmatrix.stream.iter_raw_messages(messages)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        grouped = dict()  # type: typing.Dict[str, typing.Tuple[canmatrix.stream.FramePlan, typing.List[float], bytearray]]
+        for timestamp, compound, data in chunk:
+            try:
+                plan = plans[compound]
+            except KeyError:
+                plan = decoder.plan(compound)
+            if plan is None or plan.frame.is_pdu_container:
+                continue
+            if len(data) != plan.frame.size:
+                # let Frame.unpack report the wrong length
+                plan.frame.unpack(data)
+            if plan.frame.name not in grouped:
+                grouped[plan.frame.name] = (plan, [], bytearray())
+            _, timestamps, payloads = grouped[plan.frame.name]
+            timestamps.append(timestamp)
+            payloads += data
+        result = dict()
+        for name, (plan, timestamps, payloads) in grouped.items():
+            selected = {signal_name for _, signal_name, _ in plan.selection}
+            columns = plan.frame.decode_batch(bytes(payloads))
+            result[name] = FrameColumns(
+                plan.frame,
+                numpy.array(timestamps, dtype=numpy.float64),
+                {signal_name: column for signal_name, column in columns.items() if signal_name in selected},
+            )
+        yield result
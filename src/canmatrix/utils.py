@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
 import csv
+import io
+import mmap
+import re
 import shlex
 import sys
 import typing
@@ -134,3 +137,67 @@ def decode_number(value, float_factory):  # type(string) -> (int)
         value = value[2:]
 
     return int(value, base)
+
+
+# path separators, control characters and characters not allowed in windows file names
+unsafe_file_name_chars = re.compile(r'[\x00-\x1f<>:"/\\|?*]')
+reserved_file_names = frozenset(
+    ["CON", "PRN", "AUX", "NUL"] + ["COM%d" % i for i in range(1, 10)] + ["LPT%d" % i for i in range(1, 10)]
+)
+
+
+def safe_file_name(name, used=None):  # type: (str, typing.Optional[typing.Set[str]]) -> str
+    """
+    Return name usable as file name in a directory, i.e. for files named after frames.
+
+    Path separators and characters not allowed in file names are replaced by "_", trailing dots and spaces
+    are removed, empty names, names starting with "." and reserved names (CON, NUL, COM1, ...) get a "_" prefix.
+
+    :param name: name to convert
+    :param used: lower case file names already used, the returned name is made unique and added to it
+    :return: file name
+    """
+    file_name = unsafe_file_name_chars.sub("_", name).rstrip(" .")
+    if not file_name or file_name.startswith(".") or file_name.split(".")[0].upper() in reserved_file_names:
+        file_name = "_" + file_name
+    if used is not None:
+        unique_name = file_name
+        number = 1
+        while unique_name.lower() in used:
+            number += 1
+            unique_name = "{}_{}".format(file_name, number)
+        used.add(unique_name.lower())
+        file_name = unique_name
+    return file_name
+
+
+Buffer = typing.Union[bytes, bytearray, memoryview, mmap.mmap]
+line_chunk_size = 1 << 20  # type: int
+
+
+def iter_lines(source):  # type: (typing.Union[typing.Iterable[bytes], Buffer]) -> typing.Iterator[bytes]
+    """
+    Iterate the lines (with line end) of a binary file object or of a buffer.
+
+    Buffers (bytes, bytearray, memoryview, mmap) are split lazily, the content is never copied as a whole:
+    mmap and bytes are read line by line, other buffers in chunks of line_chunk_size bytes.
+    """
+    if isinstance(source, mmap.mmap):
+        source.seek(0)
+        return iter(source.readline, b"")
+    if isinstance(source, bytes):
+        return iter(io.BytesIO(source))  # shares the buffer of bytes
+    if isinstance(source, (bytearray, memoryview)):
+        return _iter_chunked_lines(memoryview(source).cast("B"))
+    return iter(source)
+
+
+def _iter_chunked_lines(view):  # type: (memoryview) -> typing.Iterator[bytes]
+    rest = b""
+    for start in range(0, len(view), line_chunk_size):
+        lines = io.BytesIO(rest + view[start:start + line_chunk_size].tobytes()).readlines()
+        rest = lines.pop() if not lines[-1].endswith(b"\n") else b""
+        for line in lines:
+            yield line
+    if rest:
+        yield rest
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 import canmatrix.formats.arxml
+import copy
 import decimal
 
+import lxml.etree
+import pytest
+
 try:
     from pathlib import Path
 except ImportError:
@@ -50,3 +54,96 @@ def test_decode_compu_method_1():
     assert values == {'0': 'no trailer detected', '1': 'trailer detected'}
     assert factor == 42
     assert offset == 17
+
+
+def test_element_index_matches_lxml_search():
+    ea = canmatrix.formats.arxml.Earxml()
+    ea.open("tests/files/arxml/ARXMLContainerTest.arxml")
+    for start in [ea.root] + ea.findall("AR-PACKAGE") + ea.findall("I-SIGNAL-I-PDU"):
+        for tag in ["SHORT-NAME", "I-SIGNAL-TO-I-PDU-MAPPING", "I-SIGNAL-REF", "NOT-EXISTING"]:
+            assert ea.findall(tag, start) == start.findall(".//" + ea.ns + tag)
+            assert ea.find(tag, start) is start.find(".//" + ea.ns + tag)
+
+
+def test_element_index_references():
+    ea = canmatrix.formats.arxml.Earxml()
+    ea.open("tests/files/arxml/ARXMLContainerTest.arxml")
+    mapping_tag = "I-SIGNAL-TO-I-PDU-MAPPING"
+    referenced = 0
+    for isignal in ea.findall("I-SIGNAL"):
+        path = ea.get_short_name_path_of_element(isignal)
+        assert ea.get_short_name_path(path) is isignal
+        expected = [reference for reference in ea.path_cache[path]
+                    if ea.get_referencable_parent(reference).tag == ea.ns + mapping_tag]
+        assert ea.find_references_of_type(isignal, mapping_tag) == expected
+        assert ea.selector(isignal, "<<" + mapping_tag) == [ea.get_referencable_parent(a) for a in expected]
+        referenced += len(expected)
+    assert referenced > 0
+
+
+def test_streaming_import():
+    test_file = "tests/files/arxml/ARXMLContainerTest.arxml"
+    ea = canmatrix.formats.arxml.Earxml()
+    ea.open(test_file, streaming=True)
+    assert ea.findall("SYSTEM") == []
+    assert len(ea.findall("I-SIGNAL")) > 0
+
+
+@pytest.mark.parametrize("test_file", [
+    "tests/files/arxml/ARXMLContainerTest.arxml",
+    "tests/files/arxml/ARXMLSecuredPDUTest.arxml",
+])
+def test_streaming_import_matches_import(test_file):
+    matrix = canmatrix.formats.arxml.load(test_file)
+    streamed = canmatrix.formats.arxml.load(test_file, arxmlStreaming=True)
+    assert list(streamed) == list(matrix)
+    for name, db in matrix.items():
+        assert [frame.name for frame in streamed[name]] == [frame.name for frame in db]
+        for frame, streamed_frame in zip(db, streamed[name]):
+            assert [signal.name for signal in streamed_frame] == [signal.name for signal in frame]
+            assert [pdu.name for pdu in streamed_frame.pdus] == [pdu.name for pdu in frame.pdus]
+        assert [ecu.name for ecu in streamed[name].ecus] == [ecu.name for ecu in db.ecus]
+
+
+def test_parallel_import_matches_import(tmp_path):
+    # second cluster triggering the same frames with other identifiers
+    tree = lxml.etree.parse("tests/files/arxml/ARXMLSecuredPDUTest.arxml")
+    ns = tree.getroot().tag[:-len("AUTOSAR")]
+    cluster = next(tree.getroot().iter(ns + "CAN-CLUSTER"))
+    second_cluster = copy.deepcopy(cluster)
+    second_cluster.find(ns + "SHORT-NAME").text = "CAN2"
+    for identifier in second_cluster.iter(ns + "IDENTIFIER"):
+        identifier.text = str(int(identifier.text) + 1)
+    cluster.addnext(second_cluster)
+    test_file = str(tmp_path / "two_clusters.arxml")
+    tree.write(test_file)
+
+    matrix = canmatrix.formats.arxml.load(test_file)
+    parallel = canmatrix.formats.arxml.load(test_file, arxmlWorkers=2)
+    assert list(parallel) == list(matrix) == ["CAN", "CAN2"]
+    for name, db in matrix.items():
+        assert [(frame.name, frame.arbitration_id, frame.receivers, frame.attributes) for frame in parallel[name]] == \
+            [(frame.name, frame.arbitration_id, frame.receivers, frame.attributes) for frame in db]
+        assert [ecu.name for ecu in parallel[name].ecus] == [ecu.name for ecu in db.ecus]
+    assert parallel["CAN"].ecus[0] is parallel["CAN2"].ecus[0]
+
+
+def test_referenced_definitions_are_decoded_once():
+    ea = canmatrix.formats.arxml.Earxml()
+    ea.open("tests/files/arxml/ARXMLContainerTest.arxml")
+    for frame_triggering in ea.findall("CAN-FRAME-TRIGGERING"):
+        canmatrix.formats.arxml.get_frame(frame_triggering, ea, {}, decimal.Decimal, False)
+    # all signals share one compu method
+    assert len(ea.findall("COMPU-METHOD")) == 1
+    assert ea.decode_misses["compu_method"] == 1
+    assert ea.decode_hits["compu_method"] == ea.decode_misses["receivers"] - 1
+
+
+def test_lazy_start_values():
+    test_file = "tests/files/arxml/ARXML_min_max.arxml"
+    matrix = canmatrix.formats.arxml.load(test_file)
+    lazy = canmatrix.formats.arxml.load(test_file, arxmlStartValues=False)
+    for name, db in matrix.items():
+        for frame, lazy_frame in zip(db, lazy[name]):
+            assert "GenMsgStartValue" not in lazy_frame.attributes
+            assert lazy_frame.start_value_payload.hex() == frame.attributes["GenMsgStartValue"]
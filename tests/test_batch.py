@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import io
+import struct
+import textwrap
+
+import pytest
+
+import canmatrix.formats
+
+numpy = pytest.importorskip("numpy")
+
+
+def load_dbc():
+    test_file = "tests/files/dbc/test_frame_decoding.dbc"
+    return canmatrix.formats.loadp_flat(test_file)
+
+
+def random_payloads(size, count=200):
+    return numpy.random.RandomState(42).randint(0, 256, size=(count, size)).astype(numpy.uint8)
+
+
+@pytest.mark.parametrize("frame_name", ["testFrame1", "testFrame2", "testFrameFloat"])
+def test_decode_batch_matches_decode(frame_name):
+    frame = load_dbc().frame_by_name(frame_name)
+    payloads = random_payloads(frame.size)
+    columns = frame.decode_batch(payloads)
+    for row, payload in enumerate(payloads):
+        decoded = frame.unpack(bytearray(payload))
+        for name, decoded_signal in decoded.items():
+            raw_value = decoded_signal.raw_value
+            if raw_value != raw_value:  # NaN
+                assert numpy.isnan(columns[name].raw_value[row])
+            else:
+                assert columns[name].raw_value[row] == raw_value
+
+
+def test_decode_batch_from_buffer_with_stride():
+    frame = load_dbc().frame_by_name("testFrame2")
+    payloads = random_payloads(frame.size, count=10)
+    records = b"".join(bytes(payload) + b"\xAA\xBB\xCC\xDD" for payload in payloads)
+    columns = frame.decode_batch(records, stride=12)
+    expected = frame.decode_batch(payloads)
+    for name in expected:
+        assert (columns[name].raw_value == expected[name].raw_value).all()
+
+
+def test_decode_batch_phys_value():
+    frame = canmatrix.Frame("frame", size=8)
+    frame.add_signal(canmatrix.Signal("scaled", start_bit=0, size=12, is_signed=True, factor="0.5", offset=-10))
+    frame.add_signal(canmatrix.Signal("double", start_bit=0, size=64, is_float=True, is_little_endian=False))
+    frame.add_signal(canmatrix.Signal("unsigned", start_bit=1, size=64 - 1, is_signed=False))
+    payloads = numpy.array([bytearray(struct.pack(">d", value)) for value in (1.5, -2.25)], dtype=numpy.uint8)
+    columns = frame.decode_batch(payloads)
+
+    assert columns["double"].raw_value.tolist() == [1.5, -2.25]
+    for row, payload in enumerate(payloads):
+        decoded = frame.decode(bytearray(payload))
+        assert columns["scaled"].phys_value[row] == float(decoded["scaled"].phys_value)
+        assert columns["unsigned"].raw_value[row] == decoded["unsigned"].raw_value
+
+
+@pytest.mark.parametrize("is_little_endian, is_signed", [(True, False), (False, False), (True, True)])
+def test_decode_batch_wider_than_64_bits(is_little_endian, is_signed):
+    frame = canmatrix.Frame("frame", size=16)
+    frame.add_signal(canmatrix.Signal(
+        "wide", start_bit=4 if is_little_endian else 7, size=72,
+        is_little_endian=is_little_endian, is_signed=is_signed))
+    frame.add_signal(canmatrix.Signal("narrow", start_bit=96, size=16, is_signed=False))
+    payloads = random_payloads(frame.size, count=20)
+    columns = frame.decode_batch(payloads)
+
+    assert columns["wide"].raw_value.dtype == object
+    assert columns["narrow"].raw_value.dtype == numpy.uint64
+    assert max(abs(value) for value in columns["wide"].raw_value) >= 1 << 64
+    for row, payload in enumerate(payloads):
+        decoded = frame.decode(bytearray(payload))
+        assert columns["wide"].raw_value[row] == decoded["wide"].raw_value
+        assert columns["narrow"].raw_value[row] == decoded["narrow"].raw_value
+    with pytest.raises(ValueError):
+        canmatrix.batch.extract_column(payloads, frame.codec.fields[0])
+
+
+def test_decode_batch_wrong_size():
+    frame = load_dbc().frame_by_name("testFrame2")
+    with pytest.raises(canmatrix.DecodingFrameLength):
+        frame.decode_batch(random_payloads(7))
+
+
+def assert_matches_decode(frame, payloads, columns):
+    for row, payload in enumerate(payloads):
+        decoded = frame.decode(bytearray(payload))
+        for name, column in columns.items():
+            if name in decoded:
+                assert not numpy.ma.is_masked(column.raw_value[row])
+                assert column.raw_value[row] == decoded[name].raw_value
+            else:
+                assert numpy.ma.is_masked(column.raw_value[row])
+                assert numpy.ma.is_masked(column.phys_value[row])
+
+
+def test_decode_batch_multiplexed():
+    frame = load_dbc().frame_by_name("muxTestFrame")
+    payloads = random_payloads(frame.size)
+    columns = frame.decode_batch(payloads)
+    assert set(columns) == {signal.name for signal in frame.signals}
+    assert_matches_decode(frame, payloads, columns)
+
+
+def test_decode_batch_complex_multiplexed():
+    dbc = io.BytesIO(textwrap.dedent(u'''\
+    BO_ 2024 OBD2: 8 Vector__XXX
+    SG_ ParameterID_Service01 m1M : 23|8@0+ (1,0) [0|0] "" Vector__XXX
+    SG_ Vehicle_speed m13 : 31|8@0+ (1,0) [0|0] "" Vector__XXX
+    SG_ service M : 11|4@0+ (1,0) [0|0] "" Vector__XXX
+    SG_ MAF_air_flow_rate m16 : 31|16@0+ (0.01,0) [0|0] "grams/sec" Vector__XXX
+
+    SG_MUL_VAL_ 2024 ParameterID_Service01 service 1-1;
+    SG_MUL_VAL_ 2024 Vehicle_speed ParameterID_Service01 13-13;
+    SG_MUL_VAL_ 2024 MAF_air_flow_rate ParameterID_Service01 16-16;
+    ''').encode('utf-8'))
+    frame = canmatrix.formats.dbc.load(dbc, dbcImportEncoding="utf8").frame_by_name("OBD2")
+    payloads = numpy.array([
+        [0x03, 0x41, 0x0d, 0x20, 0xaa, 0xaa, 0xaa, 0xaa],
+        [0x03, 0x41, 0x10, 0x12, 0x34, 0xaa, 0xaa, 0xaa],
+        [0x03, 0x42, 0x10, 0x12, 0x34, 0xaa, 0xaa, 0xaa],
+        [0x03, 0x41, 0x0e, 0x12, 0x34, 0xaa, 0xaa, 0xaa],
+    ], dtype=numpy.uint8)
+    columns = frame.decode_batch(payloads)
+    assert_matches_decode(frame, payloads, columns)
+    assert columns["Vehicle_speed"].raw_value.count() == 1
+    assert columns["MAF_air_flow_rate"].phys_value[1] == 0x1234 * 0.01
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import decimal
+import os
+import pickle
+import shutil
+
+import pytest
+
+import canmatrix.cache
+import canmatrix.formats
+
+here = os.path.dirname(os.path.realpath(__file__))
+dbc_file = os.path.join(here, "files", "dbc", "test_frame_decoding.dbc")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "matrix.dbc")
+    shutil.copy(dbc_file, path)
+    return path
+
+
+def test_loadp_without_cache_dir_writes_nothing(source, tmp_path, monkeypatch):
+    monkeypatch.delenv("CANMATRIX_CACHE_DIR", raising=False)
+    canmatrix.formats.loadp(source)
+    assert os.listdir(str(tmp_path)) == ["matrix.dbc"]
+
+
+def test_loadp_uses_cache(source, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    first = canmatrix.formats.loadp_flat(source, cache_dir=cache_dir)
+    assert len(canmatrix.cache.MatrixCache(cache_dir).entries()) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("matrix parsed again")
+
+    monkeypatch.setattr(canmatrix.formats, "load", fail)
+    cached = canmatrix.formats.loadp_flat(source, cache_dir=cache_dir)
+    assert [frame.name for frame in cached] == [frame.name for frame in first]
+    assert cached.frame_by_name(first.frames[0].name).signals[0].name == first.frames[0].signals[0].name
+    assert cached.frame_by_id(first.frames[0].arbitration_id) is not None
+
+
+def test_cache_from_environment(source, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setenv("CANMATRIX_CACHE_DIR", cache_dir)
+    canmatrix.formats.loadp(source)
+    assert len(canmatrix.cache.MatrixCache(cache_dir).entries()) == 1
+
+
+def test_cache_key_depends_on_content_and_options(source):
+    key = canmatrix.cache.cache_key(source, "dbc")
+    assert canmatrix.cache.cache_key(source, "dbc") == key
+    assert canmatrix.cache.cache_key(source, "dbc", dbcImportEncoding="utf-8") != key
+    assert canmatrix.cache.cache_key(source, "dbc", float_factory=decimal.Decimal) != \
+        canmatrix.cache.cache_key(source, "dbc", float_factory=float)
+    with open(source, "ab") as matrix_file:
+        matrix_file.write(b"\n")
+    assert canmatrix.cache.cache_key(source, "dbc") != key
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = canmatrix.cache.MatrixCache(str(tmp_path), max_size=1 << 20)
+    matrix = canmatrix.CanMatrix()
+    for number, key in enumerate(["a", "b", "c"]):
+        cache.store(key, {"": matrix})
+        os.utime(cache.entry_path(key), (number, number))
+    assert cache.load("a") is not None  # a is used again, b is the oldest entry now
+    cache.max_size = 2 * os.path.getsize(cache.entry_path("a"))
+    cache.evict()
+    assert cache.load("b") is None
+    assert cache.load("a") is not None
+    assert cache.load("c") is not None
+
+
+def test_broken_cache_entry_is_dropped(tmp_path):
+    cache = canmatrix.cache.MatrixCache(str(tmp_path))
+    with open(cache.entry_path("broken"), "wb") as entry:
+        entry.write(b"no pickle")
+    assert cache.load("broken") is None
+    assert not os.path.exists(cache.entry_path("broken"))
+
+
+def test_pickled_matrix_drops_lookup_caches():
+    matrix = canmatrix.formats.loadp_flat(dbc_file)
+    frame = matrix.frames[0]
+    matrix.frame_by_name(frame.name)
+    frame.decode(bytearray(frame.size))
+    restored = pickle.loads(pickle.dumps(matrix))
+    assert restored._index is None
+    assert restored.frames[0]._codec is None
+    assert restored.frames[0]._indexes is None
+    assert restored.frame_by_name(frame.name) is restored.frames[0]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import canmatrix.canmatrix
+import canmatrix.cancluster
+
+
+def create_cluster():
+    bus1 = canmatrix.canmatrix.CanMatrix()
+    frame = canmatrix.canmatrix.Frame("frame", transmitters=["ECU1"], receivers=["ECU2"])
+    frame.add_signal(canmatrix.canmatrix.Signal("signal", receivers=["ECU2"]))
+    bus1.add_frame(frame)
+    bus1.add_ecu(canmatrix.canmatrix.Ecu("ECU1"))
+
+    bus2 = canmatrix.canmatrix.CanMatrix()
+    frame = canmatrix.canmatrix.Frame("frame", transmitters=["ECU3"], receivers=["ECU2"])
+    frame.add_signal(canmatrix.canmatrix.Signal("signal", receivers=["ECU4"]))
+    bus2.add_frame(frame)
+    bus2.add_frame(canmatrix.canmatrix.Frame("other"))
+    bus2.add_ecu(canmatrix.canmatrix.Ecu("ECU1"))
+    bus2.add_ecu(canmatrix.canmatrix.Ecu("ECU3"))
+    return canmatrix.cancluster.CanCluster(bus1=bus1, bus2=bus2)
+
+
+def test_cluster_merges_by_name():
+    cluster = create_cluster()
+    assert [frame.name for frame in cluster.frames] == ["frame", "other"]
+    assert cluster.frames[0] is cluster["bus1"].frames[0]
+    assert cluster.frames[0].transmitters == ["ECU1", "ECU3"]
+    assert cluster.frames[0].receivers == ["ECU2"]
+    assert [signal.name for signal in cluster.signals] == ["signal"]
+    assert cluster.signals[0].receivers == ["ECU2", "ECU4"]
+    assert [ecu.name for ecu in cluster.ecus] == ["ECU1", "ECU3"]
+
+
+def test_cluster_follows_matrix_changes():
+    cluster = create_cluster()
+    frames = cluster.frames
+    assert cluster.frames is frames
+
+    cluster["bus1"].add_frame(canmatrix.canmatrix.Frame("new"))
+    assert [frame.name for frame in cluster.frames] == ["frame", "new", "other"]
+    cluster["bus2"].frame_by_name("other").name = "renamed"
+    assert [frame.name for frame in cluster.frames] == ["frame", "new", "renamed"]
+    cluster["bus3"] = canmatrix.canmatrix.CanMatrix(ecus=[canmatrix.canmatrix.Ecu("ECU5")])
+    assert [ecu.name for ecu in cluster.ecus] == ["ECU1", "ECU3", "ECU5"]
+    del cluster["bus1"]
+    assert [frame.name for frame in cluster.frames] == ["frame", "renamed"]
+
+    cluster["bus2"].frames[0].add_signal(canmatrix.canmatrix.Signal("added"))
+    cluster.invalidate()
+    assert [signal.name for signal in cluster.signals] == ["signal", "added"]
+
+
+def test_routing_info():
+    cluster = canmatrix.cancluster.CanCluster()
+    mappings = [
+        {"source": "/Signals/" + source, "target": "/Signals/" + target, "ecu": "GW", "source_cluster": "CAN1",
+         "target_cluster": "CAN2", "source_type": "", "target_type": ""}
+        for source, target in [("x", "y"), ("xy", "z"), ("y", "x")]
+    ]
+    cluster.signal_gateway(mappings)
+    info = cluster.get_signal_routing_info("/Signals/x", strict_search=True)
+    assert [entry["signal"] for entry in info["source"]] == ["/Signals/y"]
+    assert [entry["signal"] for entry in info["target"]] == ["/Signals/y"]
+    info = cluster.get_signal_routing_info("x")
+    assert [entry["signal"] for entry in info["source"]] == ["/Signals/y", "/Signals/z"]
+    assert [entry["signal"] for entry in info["target"]] == ["/Signals/y"]
+    assert len(cluster.get_signal_routing_info("Signals")["source"]) == 3
+    assert cluster.get_signal_routing_info("w") == {"source": [], "target": []}
+
+    cluster.signal_gateway([dict(mappings[0], source="/Signals/w")])
+    assert len(cluster.get_signal_routing_info("w")["source"]) == 1
+
+
+def test_cluster_ignores_other_matrices():
+    cluster = create_cluster()
+    frames = cluster.frames
+    other = canmatrix.canmatrix.CanMatrix()
+    other.add_frame(canmatrix.canmatrix.Frame("foreign"))
+    other.frame_by_name("foreign")
+    other.frames[0].name = "renamed"
+    other.frame_by_name("renamed")
+    assert cluster.frames is frames
+
+    cluster["bus2"].frames[0].name = "renamed"
+    assert [frame.name for frame in cluster.frames] == ["frame", "renamed", "other"]
+
+
+def test_cluster_does_not_use_matrix_index():
+    cluster = create_cluster()
+    db = cluster["bus1"]
+    db._index = None
+    db.frames.append(canmatrix.canmatrix.Frame("appended"))
+    assert [frame.name for frame in cluster.frames] == ["frame", "appended", "other"]
+    db.ecus[0].name = "ECU0"
+    assert [ecu.name for ecu in cluster.ecus] == ["ECU0", "ECU1", "ECU3"]
+    db.frames = [db.frames[0]]
+    assert [frame.name for frame in cluster.frames] == ["frame", "other"]
+    assert db._index is None
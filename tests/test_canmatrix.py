@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import decimal
+import fractions
+import pickle
 
 import pytest
 from builtins import *
@@ -455,6 +457,24 @@ def test_encode_decode_frame():
     assert decoded_data['signal'].raw_value == float(input_data['signal'])
 
 
+def test_frame_start_value_payload():
+    frame = canmatrix.canmatrix.Frame('frame', arbitration_id=1, size=2)
+    frame.add_signal(canmatrix.canmatrix.Signal('scaled', start_bit=0, size=8, factor=2, offset=10, initial_value=20))
+    frame.add_signal(canmatrix.canmatrix.Signal('zero', start_bit=8, size=8, offset=-5, initial_value=-5))
+    assert frame.start_value_payload == b"\x05\x00"
+    assert frame.start_value_payload == bytes(frame.encode({'scaled': 5, 'zero': 0}))
+
+    frame.signals[1].initial_value = 3
+    assert frame.start_value_payload == b"\x05\x08"
+    frame.signals[0].factor = 5
+    assert frame.start_value_payload == b"\x02\x08"
+    frame.signals[0].offset = 0
+    assert frame.start_value_payload == b"\x04\x08"
+    frame.signals[0].min = 5
+    frame.signals[0].max = 10
+    assert frame.start_value_payload == b"\x01\x08"  # initial value out of range: min
+
+
 # Frame tests
 @pytest.fixture
 def empty_frame():
@@ -1087,6 +1107,162 @@ def test_canmatrix_del_frame_by_instance(empty_matrix):
     empty_matrix.del_frame(f1)
     assert empty_matrix.frames == [f2]
 
+def test_canmatrix_index_follows_changes(empty_matrix):
+    f1 = canmatrix.Frame(name="F1", arbitration_id=canmatrix.ArbitrationId(1))
+    f2 = canmatrix.Frame(name="F2", arbitration_id=canmatrix.ArbitrationId(0x18FF1000, extended=True))
+    empty_matrix.add_frame(f1)
+    assert empty_matrix.frame_by_name("F2") is None
+    empty_matrix.add_frame(f2)
+    assert empty_matrix.frame_by_name("F2") is f2
+    assert empty_matrix.frame_by_pgn(0xFF10) is f2
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(1, extended=True)) is None
+
+    empty_matrix.rename_frame("F1", "F3")
+    assert empty_matrix.frame_by_name("F1") is None
+    assert empty_matrix.frame_by_name("F3") is f1
+
+    f1.arbitration_id.id = 5
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(1)) is None
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(5)) is f1
+    f1.header_id = 7
+    assert empty_matrix.frame_by_header_id(7) is f1
+
+    empty_matrix.del_frame(f1)
+    assert empty_matrix.frame_by_name("F3") is None
+    f4 = canmatrix.Frame(name="F4", arbitration_id=canmatrix.ArbitrationId(5))
+    empty_matrix.frames.append(f4)
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(5)) is f4
+
+
+def test_canmatrix_index_per_instance():
+    matrix1 = canmatrix.CanMatrix()
+    matrix2 = canmatrix.CanMatrix()
+    matrix1.add_frame(canmatrix.Frame(name="F1", arbitration_id=canmatrix.ArbitrationId(1)))
+    assert matrix1.frame_by_id(canmatrix.ArbitrationId(1)) is not None
+    assert matrix2.frame_by_id(canmatrix.ArbitrationId(1)) is None
+
+    index = matrix1.index
+    matrix2.add_frame(canmatrix.Frame(name="F2"))
+    matrix2.frame_by_name("F2")
+    matrix2.frames[0].name = "F3"
+    matrix2.ecus.append(canmatrix.Ecu("ECU"))
+    matrix2.ecu_by_name("ECU")
+    matrix2.ecus[0].name = "ECU2"
+    assert matrix2.frame_by_name("F3") is matrix2.frames[0]
+    assert matrix2.ecu_by_name("ECU2") is matrix2.ecus[0]
+    assert matrix1.index is index
+    matrix1.frames[0].arbitration_id.id = 2
+    assert matrix1.index is not index
+
+
+def test_canmatrix_index_follows_replaced_frames(empty_matrix):
+    f1 = canmatrix.Frame(name="F1", arbitration_id=canmatrix.ArbitrationId(1))
+    f2 = canmatrix.Frame(name="F2", arbitration_id=canmatrix.ArbitrationId(2))
+    empty_matrix.add_frame(f1)
+    empty_matrix.add_frame(f2)
+    assert empty_matrix.frame_by_name("F1") is f1
+
+    f3 = canmatrix.Frame(name="F1", arbitration_id=canmatrix.ArbitrationId(3))
+    empty_matrix.frames[0] = f3
+    assert empty_matrix.frame_by_name("F1") is f3
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(1)) is None
+
+    empty_matrix.frames.remove(f2)
+    empty_matrix.frames.append(f1)
+    assert empty_matrix.frame_by_name("F2") is None
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(1)) is f1
+
+    ecu = canmatrix.Ecu("ECU")
+    empty_matrix.add_ecu(ecu)
+    assert empty_matrix.ecu_by_name("ECU") is ecu
+    empty_matrix.ecus[0] = canmatrix.Ecu("ECU")  # equal, but a different object
+    assert empty_matrix.ecu_by_name("ECU") is empty_matrix.ecus[0]
+
+
+def test_canmatrix_index_extended_not_rebuilt(empty_matrix):
+    empty_matrix.add_frame(canmatrix.Frame(name="F1", arbitration_id=canmatrix.ArbitrationId(1)))
+    index = empty_matrix.index
+    f2 = canmatrix.Frame(name="F2", arbitration_id=canmatrix.ArbitrationId(2))
+    empty_matrix.add_frame(f2)
+    empty_matrix.add_ecu(canmatrix.Ecu("ECU"))
+    f2.comment = "no key of the index"
+    assert empty_matrix.frame_by_name("F2") is f2
+    assert empty_matrix.ecu_by_name("ECU") is empty_matrix.ecus[0]
+    assert empty_matrix.index is index
+
+
+def test_canmatrix_index_follows_assigned_lists(empty_matrix):
+    empty_matrix.add_frame(canmatrix.Frame(name="F1"))
+    assert empty_matrix.frame_by_name("F1") is not None
+    f2 = canmatrix.Frame(name="F2")
+    empty_matrix.frames = [f2]
+    assert empty_matrix.frame_by_name("F1") is None
+    assert empty_matrix.frame_by_name("F2") is f2
+    empty_matrix.frames += [canmatrix.Frame(name="F3")]
+    assert empty_matrix.frame_by_name("F3") is empty_matrix.frames[1]
+
+    s1 = canmatrix.Signal("S1")
+    f2.add_signal(s1)
+    assert f2.signal_by_name("S1") is s1
+    f2.signals = [canmatrix.Signal("S2")]
+    assert f2.signal_by_name("S1") is None
+    assert f2.signal_by_name("S2") is f2.signals[0]
+
+
+def test_canmatrix_index_first_frame_wins(empty_matrix):
+    f1 = canmatrix.Frame(name="F", arbitration_id=canmatrix.ArbitrationId(1))
+    f2 = canmatrix.Frame(name="F", arbitration_id=canmatrix.ArbitrationId(1))
+    empty_matrix.add_frame(f1)
+    empty_matrix.add_frame(f2)
+    assert empty_matrix.frame_by_name("F") is f1
+    assert empty_matrix.frame_by_id(canmatrix.ArbitrationId(1)) is f1
+    empty_matrix.remove_frame(f1)
+    assert empty_matrix.frame_by_name("F") is f2
+
+    f3 = canmatrix.Frame(name="G", arbitration_id=canmatrix.ArbitrationId(3))
+    empty_matrix.add_frame(f3)
+    assert empty_matrix.frame_by_name("G") is f3
+    f2.name = "G"
+    assert empty_matrix.frame_by_name("G") is f2
+
+
+def test_canmatrix_ecu_index(empty_matrix):
+    empty_matrix.add_ecu(canmatrix.Ecu("ECU1"))
+    empty_matrix.add_ecu(canmatrix.Ecu("ECU1"))
+    assert len(empty_matrix.ecus) == 1
+    empty_matrix.rename_ecu("ECU1", "ECU2")
+    assert empty_matrix.ecu_by_name("ECU1") is None
+    assert empty_matrix.ecu_by_name("ECU2") is empty_matrix.ecus[0]
+    empty_matrix.del_ecu("ECU2")
+    assert empty_matrix.ecu_by_name("ECU2") is None
+
+
+def test_frame_signal_by_name_after_changes():
+    frame = canmatrix.Frame(name="F")
+    s1 = frame.add_signal(canmatrix.Signal("S1"))
+    assert frame.signal_by_name("S1") is s1
+    s1.name = "S2"
+    assert frame.signal_by_name("S1") is None
+    assert frame.signal_by_name("S2") is s1
+    frame.signals.remove(s1)
+    assert frame.signal_by_name("S2") is None
+
+
+def test_frame_signal_by_name_first_signal_wins():
+    frame = canmatrix.Frame(name="F")
+    s1 = frame.add_signal(canmatrix.Signal("S1"))
+    s2 = frame.add_signal(canmatrix.Signal("S2"))
+    assert frame.signal_by_name("S2") is s2
+    s1.name = "S2"
+    assert frame.signal_by_name("S2") is s1
+    s1.name = "S1"
+    assert frame.signal_by_name("S2") is s2
+    s3 = canmatrix.Signal("S2")
+    frame.signals[0] = s3
+    assert frame.signal_by_name("S2") is s3
+    assert frame.signal_by_name("S1") is None
+
+
 def test_effective_cycle_time():
     frame = canmatrix.Frame()
     sig1 = canmatrix.Signal(name = "s1", cycle_time=1)
@@ -1142,3 +1318,141 @@ def test_frame_compress():
     assert frame.signal_by_name("Sig2").start_bit == 12
     assert frame.signal_by_name("Sig3").start_bit == 21
     assert frame.signal_by_name("Sig4").start_bit == 26
+
+
+@pytest.mark.parametrize("float_factory", [float, fractions.Fraction, decimal.Decimal])
+def test_signal_set_float_factory(float_factory):
+    signal = canmatrix.canmatrix.Signal(size=16, is_signed=False, factor="0.1", offset="-40", max=6000)
+    signal.set_float_factory(float_factory)
+    for name in ("factor", "offset", "min", "max", "initial_value"):
+        assert type(getattr(signal, name)) is float_factory
+    assert signal.raw2phys(1234) == float_factory("83.4")
+    assert signal.phys2raw(float_factory("83.4")) == 1234
+
+
+def test_signal_float_factory_keeps_decimals():
+    signal = canmatrix.canmatrix.Signal(factor="0.1")
+    signal.set_float_factory(float)
+    signal.set_float_factory(decimal.Decimal)
+    assert signal.factor == decimal.Decimal("0.1")
+    signal.set_float_factory(fractions.Fraction)
+    signal.set_float_factory(decimal.Decimal)
+    assert signal.factor == decimal.Decimal("0.1")
+
+
+def test_signal_scale_constants_follow_changes():
+    signal = canmatrix.canmatrix.Signal(size=16, factor="0.1", offset="-40")
+    signal.set_float_factory(float)
+    assert signal.scale_constants() == (0.1, -40.0)
+    signal.factor = decimal.Decimal("0.5")
+    signal.offset = 10
+    assert signal.scale_constants() == (0.5, 10.0)
+    assert type(signal.raw2phys(4)) is float
+    assert signal.raw2phys(4) == 12.0
+    assert signal.phys2raw(12.0) == 4
+
+
+def test_canmatrix_set_float_factory():
+    frame = canmatrix.canmatrix.Frame("frame", size=2)
+    frame.add_signal(canmatrix.canmatrix.Signal("signal", size=16, factor="0.5"))
+    matrix = canmatrix.canmatrix.CanMatrix(frames=[frame])
+    matrix.set_float_factory(float)
+    assert isinstance(frame.signals[0].factor, float)
+    assert frame.decode(bytearray([4, 0]))["signal"].phys_value == 2.0
+
+
+def fingerprint_matrix():
+    frame = canmatrix.canmatrix.Frame("frame", arbitration_id=0x100, size=8, comment="frame comment")
+    frame.add_signal(canmatrix.canmatrix.Signal(
+        "signal", size=8, factor="0.5", offset=-10, unit="km/h", values={0: "off"}, comment="signal comment"))
+    frame.add_signal(canmatrix.canmatrix.Signal("other", start_bit=8, size=8))
+    frame.add_attribute("GenMsgCycleTime", "100")
+    matrix = canmatrix.canmatrix.CanMatrix(frames=[frame], ecus=[canmatrix.canmatrix.Ecu("ECU")])
+    return matrix
+
+
+def test_fingerprint_is_stable():
+    matrix = fingerprint_matrix()
+    fingerprint = matrix.fingerprint()
+    assert len(fingerprint) == 64
+    assert matrix.fingerprint() == fingerprint
+    assert fingerprint_matrix().fingerprint() == fingerprint
+    # independent of the float_factory and of the order of attributes
+    other = fingerprint_matrix()
+    other.set_float_factory(float)
+    assert other.fingerprint() == fingerprint
+    matrix.frames[0].add_attribute("GenMsgSendType", "cyclic")
+    other.frames[0].attributes = {"GenMsgSendType": "cyclic", "GenMsgCycleTime": "100"}
+    assert matrix.fingerprint() == other.fingerprint()
+
+
+@pytest.mark.parametrize("change", [
+    lambda matrix: setattr(matrix.frames[0].signals[0], "factor", decimal.Decimal("0.25")),
+    lambda matrix: matrix.frames[0].signals[1].add_receiver("ECU"),
+    lambda matrix: matrix.frames[0].signals[0].add_values(1, "on"),
+    lambda matrix: matrix.frames[0].signals[0].attributes.update(GenSigStartValue="1"),
+    lambda matrix: matrix.frames[0].signals.pop(),
+    lambda matrix: setattr(matrix.frames[0].arbitration_id, "id", 0x101),
+    lambda matrix: matrix.frames[0].add_signal_group("group", 1, ["signal"]),
+    lambda matrix: matrix.ecus[0].add_comment("ECU comment"),
+    lambda matrix: matrix.value_tables.update(table={0: "off"}),
+    lambda matrix: matrix.add_signal_defines("GenSigStartValue", "INT 0 100"),
+])
+def test_fingerprint_follows_changes(change):
+    matrix = fingerprint_matrix()
+    fingerprint = matrix.fingerprint()
+    change(matrix)
+    assert matrix.fingerprint() != fingerprint
+    assert fingerprint_matrix().fingerprint() == fingerprint
+
+
+def test_fingerprint_ignore_comments_and_attributes():
+    matrix = fingerprint_matrix()
+    other = fingerprint_matrix()
+    other.frames[0].signals[0].add_comment("changed")
+    other.frames[0].add_comment("changed")
+    other.ecus[0].add_attribute("NodeLayerModules", "CANoeILNVector.dll")
+    assert other.fingerprint() != matrix.fingerprint()
+    assert other.fingerprint(ignore_comments=True) != matrix.fingerprint(ignore_comments=True)
+    assert other.fingerprint(ignore_comments=True, ignore_attributes=True) == \
+        matrix.fingerprint(ignore_comments=True, ignore_attributes=True)
+    assert other.frames[0].fingerprint(ignore_comments=True) == matrix.frames[0].fingerprint(ignore_comments=True)
+    assert other.frames[0].fingerprint() != matrix.frames[0].fingerprint()
+
+
+def test_fingerprint_not_pickled():
+    matrix = fingerprint_matrix()
+    fingerprint = matrix.fingerprint()
+    copy = pickle.loads(pickle.dumps(matrix))
+    assert copy._fingerprints is None
+    assert copy.frames[0]._fingerprints is None
+    assert copy.fingerprint() == fingerprint
+
+
+@pytest.mark.parametrize("change", [
+    lambda signal: signal.attributes.update(GenSigStartValue=True),
+    lambda signal: setattr(signal, "initial_value", True),
+    lambda signal: signal.mux_val_grp[0].append(2),
+    lambda signal: signal.scale_ranges[0].update(factor=2),
+])
+def test_fingerprint_follows_equal_and_nested_changes(change):
+    matrix = fingerprint_matrix()
+    signal = matrix.frames[0].signals[0]
+    signal.add_attribute("GenSigStartValue", 1)
+    signal.initial_value = 1
+    signal.mux_val_grp.append([0, 1])
+    signal.scale_ranges.append({"min": 0, "max": 10, "factor": 1, "offset": 0})
+    fingerprint = matrix.fingerprint()
+    change(signal)
+    assert matrix.fingerprint() != fingerprint
+
+
+def test_fingerprint_cached():
+    matrix = fingerprint_matrix()
+    fingerprint = matrix.fingerprint()
+    cached = dict(matrix.frames[0]._fingerprints)
+    assert matrix.fingerprint() is fingerprint
+    assert matrix.frames[0]._fingerprints == cached
+    matrix.frames[0].signals[0].add_comment("changed")
+    assert matrix.fingerprint() != fingerprint
+    assert matrix.frames[0]._fingerprints != cached
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import json
 import os
 import sys
 import tempfile
@@ -335,3 +336,58 @@ def test_merge(tmpdir, run):
         assert b"BO_ 291" in content
         assert b"BO_ 292" in content
         assert b"BO_ 293" in content
+
+def test_delta_export(tmpdir, run):
+    inputFile = create_dbc()
+    run("--manifest", "manifest.json", "--changes", "changes.json", inputFile, "tmp2.dbc")
+    with open("changes.json") as fd:
+        changes = json.load(fd)
+    assert changes["written"] == ["tmp2.dbc"]
+    assert changes["matrices"][""]["status"] == "added"
+
+    os.remove("tmp2.dbc")
+    run("--manifest", "manifest.json", "--changes", "changes.json", inputFile, "tmp2.dbc")
+    with open("changes.json") as fd:
+        changes = json.load(fd)
+    assert changes["written"] == ["tmp2.dbc"]  # missing outputs are written again
+    run("--manifest", "manifest.json", "--changes", "changes.json", inputFile, "tmp2.dbc")
+    with open("changes.json") as fd:
+        changes = json.load(fd)
+    assert changes["written"] == []
+    assert changes["matrices"][""]["status"] == "unchanged"
+
+    run("--manifest", "manifest.json", "--changes", "changes.json", "--deleteFrame", "testFrame2", inputFile, "tmp2.dbc")
+    with open("changes.json") as fd:
+        changes = json.load(fd)
+    assert changes["written"] == ["tmp2.dbc"]
+    assert changes["matrices"][""]["frames"]["removed"] == ["testFrame2"]
+    with open("tmp2.dbc", "rb") as fd:
+        assert b"testFrame2" not in fd.read()
+
+
+def test_delta_export_json_fragments(tmpdir, run):
+    inputFile = create_dbc()
+    run("--jsonFragments", inputFile, "tmp2.json")
+    frames = sorted(os.listdir(os.path.join("tmp2", "frames")))
+    assert frames == ["testFrame2.json", "testFrame3.json"]
+
+    run("--jsonFragments", "--baseline", inputFile, "--changes", "changes.json",
+        "--deleteFrame", "testFrame2", inputFile, "tmp2.json")
+    with open("changes.json") as fd:
+        changes = json.load(fd)
+    assert changes["written"] == [os.path.join("tmp2", "matrix.json")]
+    assert changes["removed"] == [os.path.join("tmp2", "frames", "testFrame2.json")]
+    db = canmatrix.formats.json.load_fragments("tmp2")
+    assert [frame.name for frame in db.frames] == ["testFrame3"]
+
+
+def test_json_fragments_written_without_fingerprints(tmpdir, monkeypatch):
+    import canmatrix.convert
+
+    def fingerprint_manifest(dbs, **options):
+        raise AssertionError("nothing to compare with, fingerprints are not needed")
+
+    monkeypatch.setattr(canmatrix.convert, "fingerprint_manifest", fingerprint_manifest)
+    out_file = str(tmpdir.join("tmp2.json"))
+    canmatrix.convert.convert(create_dbc(), out_file, jsonFragments=True)
+    assert sorted(os.listdir(str(tmpdir.join("tmp2", "frames")))) == ["testFrame2.json", "testFrame3.json"]
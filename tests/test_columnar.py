@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+import os
+
+import pytest
+
+import canmatrix
+import canmatrix.columnar
+
+
+def create_matrix():
+    frame = canmatrix.Frame("testFrame", arbitration_id=canmatrix.ArbitrationId(0x10), size=2)
+    frame.add_signal(canmatrix.Signal("muxer", start_bit=0, size=4, is_signed=False, multiplex="Multiplexor"))
+    frame.add_signal(canmatrix.Signal("scaled", start_bit=4, size=4, is_signed=False, factor=0.5, offset=1, unit="V",
+                                      multiplex=0))
+    frame.add_signal(canmatrix.Signal("state", start_bit=8, size=8, is_signed=True, values={1: "on", 0: "off"},
+                                      multiplex=1))
+    matrix = canmatrix.CanMatrix()
+    matrix.add_frame(frame)
+    return matrix
+
+
+messages = [
+    (0.0, 0x10, bytearray([0x30, 0x01])),
+    (0.5, 0x10, bytearray([0x31, 0x01])),
+    (1.0, 0x10, bytearray([0x31, 0xFF])),
+    (1.5, 0x11, bytearray([0x00])),
+]
+
+
+def test_frame_columns():
+    columns = canmatrix.columnar.frame_columns(create_matrix().frames[0])
+    assert [(column["name"], column["type"]) for column in columns] == [
+        ("timestamp", "float64"), ("muxer", "uint64"), ("scaled", "float64"),
+        ("state", "int64"), ("state_label", "string")]
+    assert columns[2]["unit"] == "V"
+    assert columns[2]["factor"] == "0.5"
+
+
+def test_write_trace_csv(tmp_path):
+    directory = str(tmp_path / "decoded")
+    canmatrix.columnar.write_trace(create_matrix(), messages, directory, row_group_size=2, file_format="csv")
+    assert sorted(os.listdir(directory)) == ["schema.json", "testFrame.csv"]
+    with io.open(os.path.join(directory, "testFrame.csv"), newline="") as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert rows == [
+        ["timestamp", "muxer", "scaled", "state", "state_label"],
+        ["0.0", "0", "2.5", "", ""],
+        ["0.5", "1", "", "1", "on"],
+        ["1.0", "1", "", "-1", ""],
+    ]
+    with io.open(os.path.join(directory, "schema.json")) as schema_file:
+        schema = json.load(schema_file)
+    assert schema["testFrame"]["file"] == "testFrame.csv"
+    assert schema["testFrame"]["arbitration_id"] == 0x10
+
+
+def test_row_groups_are_flushed(tmp_path):
+    matrix = create_matrix()
+    with canmatrix.columnar.ColumnarWriter(str(tmp_path), row_group_size=2, file_format="csv",
+                                           signal_glob="mux*") as writer:
+        for message in matrix.iter_decode(messages):
+            writer.write(message)
+            assert writer.partitions["testFrame"].rows < 2
+        assert writer.partitions["testFrame"].columns[-1]["name"] == "muxer"
+
+
+def test_unknown_file_format(tmp_path):
+    with pytest.raises(ValueError):
+        canmatrix.columnar.ColumnarWriter(str(tmp_path), file_format="hdf5")
+
+
+def test_write_trace_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    directory = str(tmp_path)
+    canmatrix.columnar.write_trace(create_matrix(), messages, directory, row_group_size=2, file_format="parquet")
+    parquet_file = pyarrow.parquet.ParquetFile(os.path.join(directory, "testFrame.parquet"))
+    assert parquet_file.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.column("scaled").to_pylist() == [2.5, None, None]
+    assert table.column("state_label").to_pylist() == [None, "on", None]
+    assert table.schema.field("scaled").metadata[b"unit"] == b"V"
+
+
+def create_frames(names):
+    matrix = canmatrix.CanMatrix()
+    for arbitration_id, name in enumerate(names, 1):
+        frame = canmatrix.Frame(name, arbitration_id=canmatrix.ArbitrationId(arbitration_id), size=1)
+        frame.add_signal(canmatrix.Signal("value", start_bit=0, size=8, is_signed=False))
+        matrix.add_frame(frame)
+    return matrix
+
+
+def test_file_names_are_sanitized(tmp_path):
+    directory = tmp_path / "decoded"
+    names = ["../outside", "a/b", "a_b", "CON"]
+    trace = [(float(index), index + 1, bytearray([index])) for index in range(len(names))]
+    canmatrix.columnar.write_trace(create_frames(names), trace, str(directory), file_format="csv")
+    assert sorted(os.listdir(str(directory))) == ["_.._outside.csv", "_CON.csv", "a_b.csv", "a_b_2.csv", "schema.json"]
+    assert not (tmp_path / "outside.csv").exists()
+    with io.open(str(directory / "schema.json")) as schema_file:
+        schema = json.load(schema_file)
+    assert {name: schema[name]["file"] for name in names} == {
+        "../outside": "_.._outside.csv", "a/b": "a_b.csv", "a_b": "a_b_2.csv", "CON": "_CON.csv"}
+
+
+def test_open_files_are_limited(tmp_path):
+    names = ["frame1", "frame2", "frame3"]
+    matrix = create_frames(names)
+    trace = [(float(index), index % 3 + 1, bytearray([index])) for index in range(9)]
+    with canmatrix.columnar.ColumnarWriter(str(tmp_path), row_group_size=1, file_format="csv",
+                                           max_open_files=2) as writer:
+        for message in matrix.iter_decode(trace):
+            writer.write(message)
+            assert len(writer.open_partitions) <= 2
+            assert sum(partition.sink.is_open for partition in writer.partitions.values()) <= 2
+    for offset, name in enumerate(names):
+        with io.open(str(tmp_path / (name + ".csv")), newline="") as csv_file:
+            rows = list(csv.reader(csv_file))
+        assert rows == [["timestamp", "value"]] + [[str(float(index)), str(index)] for index in range(offset, 9, 3)]
+
+
+def test_parquet_sink_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    columns = canmatrix.columnar.frame_columns(create_matrix().frames[0])
+    sink = canmatrix.columnar.ParquetSink(columns)
+    assert not sink.is_open
+    sink.open(str(tmp_path / "frame.parquet"))
+    values = [[0.0, 0.5], [0, 1], [2.5, None], [None, -1], [None, "on"]]
+    sink.write(values)
+    sink.write([[1.0], [1], [None], [1], ["on"]])
+    sink.close()
+    assert not sink.is_open
+    table = pyarrow.parquet.read_table(str(tmp_path / "frame.parquet"))
+    assert table.column_names == [column["name"] for column in columns]
+    assert [table.column(index).to_pylist() for index in range(len(columns))] == [
+        [0.0, 0.5, 1.0], [0, 1, 1], [2.5, None, None], [None, -1, 1], [None, "on", "on"]]
+    assert table.schema.field("scaled").metadata[b"factor"] == b"0.5"
+
+
+def test_parquet_parts_of_closed_files(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    names = ["frame1", "frame2"]
+    trace = [(float(index), index % 2 + 1, bytearray([index])) for index in range(6)]
+    canmatrix.columnar.write_trace(create_frames(names), trace, str(tmp_path), row_group_size=1,
+                                   file_format="parquet", max_open_files=1)
+    with io.open(str(tmp_path / "schema.json")) as schema_file:
+        schema = json.load(schema_file)
+    assert schema["frame1"]["files"] == ["frame1.parquet", "frame1_part2.parquet", "frame1_part3.parquet"]
+    table = pyarrow.parquet.read_table([str(tmp_path / name) for name in schema["frame1"]["files"]])
+    assert table.column("value").to_pylist() == [0, 2, 4]
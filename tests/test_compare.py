@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import copy
+import decimal
+
+import canmatrix
+import canmatrix.compare
+
+
+def create_matrix():
+    matrix = canmatrix.CanMatrix()
+    frame = canmatrix.Frame("Frame1", arbitration_id=canmatrix.ArbitrationId(1), size=8, comment="frame")
+    frame.add_signal(canmatrix.Signal("Signal1", size=8, start_bit=0, comment="signal", values={0: "off", 1: "on"}))
+    frame.add_signal(canmatrix.Signal("Signal2", size=8, start_bit=8, attributes={"GenSigSendType": "Cyclic"}))
+    frame.add_signal_group("Group", 1, ["Signal1", "Signal2"])
+    matrix.add_frame(frame)
+    matrix.add_frame(canmatrix.Frame("Frame2", arbitration_id=canmatrix.ArbitrationId(2), size=8))
+    return matrix
+
+
+def changes(result):
+    found = []
+    if result.result != "equal" and not result.children:
+        found.append((result.result, result.type, getattr(result.ref, "name", None)))
+    for child in result.children:
+        found.extend(changes(child))
+    return found
+
+
+def test_equal_frames_ignores():
+    frame1 = create_matrix().frames[0]
+    frame2 = copy.deepcopy(frame1)
+    assert canmatrix.compare.equal_frames(frame1, frame2)
+    frame2.signals[0].comment = "changed"
+    frame2.signals[1].add_attribute("GenSigSendType", "Spontaneous")
+    assert not canmatrix.compare.equal_frames(frame1, frame2)
+    ignore = {"comment": "*", "ATTRIBUTE": "*"}
+    assert canmatrix.compare.equal_frames(frame1, frame2, ignore)
+    frame2.signals[0].factor = 2
+    assert not canmatrix.compare.equal_frames(frame1, frame2, ignore)
+
+
+def test_equal_frames_compares_attributes_like_compare_frame():
+    frame1 = create_matrix().frames[0]
+    frame2 = copy.deepcopy(frame1)
+    # numbers of loaders with different float factories
+    frame1.attributes["GenMsgDelayTime"] = 0.1
+    frame2.attributes["GenMsgDelayTime"] = decimal.Decimal("0.1")
+    assert frame1.fingerprint() == frame2.fingerprint()
+    assert changes(canmatrix.compare.compare_frame(frame1, frame2))
+    assert not canmatrix.compare.equal_frames(frame1, frame2)
+
+
+def test_compare_db_skip_equal_frames():
+    matrix1 = create_matrix()
+    matrix2 = create_matrix()
+    matrix2.frames[0].signals[1].name = "Signal3"
+    full = canmatrix.compare.compare_db(matrix1, matrix2)
+    skipped = canmatrix.compare.compare_db(matrix1, matrix2, skip_equal_frames=True)
+    expected = [("deleted", "SIGNAL", "Signal2"), ("added", "SIGNAL", "Signal3"),
+                ("deleted", "Signal2", "Signal2"), ("added", "Signal3", "Signal3")]
+    assert changes(full) == expected
+    assert changes(skipped) == expected
+    # Frame2 is equal: walked field by field without skip_equal_frames only
+    assert full.children[1].result == skipped.children[1].result == "equal"
+    assert full.children[1].children and not skipped.children[1].children
+
+
+def test_skip_equal_frames_keeps_duplicate_signal_names():
+    # signals are compared by name, compare_frame reports the second Mux signal as changed
+    matrix = canmatrix.CanMatrix()
+    frame = canmatrix.Frame("Frame1", arbitration_id=canmatrix.ArbitrationId(1), size=8)
+    frame.add_signal(canmatrix.Signal("Mux", size=8, start_bit=0))
+    frame.add_signal(canmatrix.Signal("Mux", size=8, start_bit=8))
+    matrix.add_frame(frame)
+    expected = [("changed", "startbit", "Mux")]
+    assert changes(canmatrix.compare.compare_db(matrix, copy.deepcopy(matrix))) == expected
+    assert changes(canmatrix.compare.compare_db(matrix, copy.deepcopy(matrix), skip_equal_frames=True)) == expected
@@ -662,4 +662,52 @@ def test_env_var_with_val():
     assert var['values']['0'] == 'on'
     assert var['values']['1'] == 'off'
 
-    
\ No newline at end of file
+    
+
+def test_load_with_float_factory():
+    dbc = io.BytesIO(textwrap.dedent(u'''\
+    BO_ 1 testFrame1: 2 TEST_ECU
+     SG_ someSignal: 0|16@1+ (0.1,-40) [-40|6513.5] "degC"  CCL_TEST
+    ''').encode('utf-8'))
+    matrix = canmatrix.formats.load_flat(dbc, "dbc", float_factory=float)
+    signal = matrix.frames[0].signals[0]
+    assert (signal.factor, signal.offset, signal.min, signal.max) == (0.1, -40.0, -40.0, 6513.5)
+    assert all(isinstance(value, float) for value in (signal.factor, signal.offset, signal.min, signal.max))
+    assert matrix.frames[0].decode(bytearray([0xD2, 0x04]))["someSignal"].phys_value == 1234 * 0.1 - 40
+
+
+def test_dump_does_not_change_matrix():
+    matrix = canmatrix.CanMatrix()
+    matrix.add_frame_defines("Sendable", "BOOL False True")
+    frame = canmatrix.Frame("F" * 40, arbitration_id=canmatrix.ArbitrationId(1, extended=True), size=64, is_fd=True,
+                            cycle_time=100, attributes={"Sendable": "True"})
+    frame.add_signal(canmatrix.Signal("S" * 40, size=8, start_bit=0, initial_value=5, unit=None))
+    matrix.add_frame(frame)
+    matrix.add_ecu(canmatrix.Ecu("E" * 40))
+    defines = dict(matrix.frame_defines)
+
+    class CountingBytesIO(io.BytesIO):
+        writes = 0
+
+        def write(self, data):
+            self.writes += 1
+            return super(CountingBytesIO, self).write(data)
+
+    outdbc = CountingBytesIO()
+    canmatrix.formats.dump(matrix, outdbc, "dbc")
+    assert outdbc.writes == 1
+    assert matrix.frame_defines == defines
+    assert matrix.frame_defines["Sendable"].definition == "BOOL False True"
+    assert matrix.global_defines == {} and matrix.attributes == {}
+    assert frame.name == "F" * 40 and frame.attributes == {"Sendable": "True"} and frame.transmitters == []
+    signal = frame.signals[0]
+    assert signal.name == "S" * 40 and signal.attributes == {} and signal.receivers == [] and signal.unit is None
+    assert matrix.ecus[0].name == "E" * 40 and matrix.ecus[0].attributes == {}
+
+    output = outdbc.getvalue().decode("iso-8859-1")
+    assert 'BA_ "Sendable" BO_ 2147483649 "True";' in output
+    assert 'BA_ "SystemMessageLongSymbol" BO_ 2147483649 "{}";'.format("F" * 40) in output
+    assert 'BA_ "VFrameFormat" BO_ 2147483649 15;' in output
+    reloaded = canmatrix.formats.loads_flat(outdbc.getvalue(), "dbc")
+    assert reloaded.frames[0].name == frame.name and reloaded.frames[0].signals[0].name == signal.name
+    assert reloaded.ecus[0].name == "E" * 40
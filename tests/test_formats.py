@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 import io
+import os
+import subprocess
+import sys
 import textwrap
 
 import canmatrix.formats
@@ -24,3 +27,59 @@ def test_dump_matrix():
     ''').encode(codec)
 
     assert result == expected
+
+
+def test_loadp_many(tmp_path):
+    dbc_file = "tests/files/dbc/test_frame_decoding.dbc"
+    arxml_file = "tests/files/arxml/ARXML_min_max.arxml"
+    missing_file = str(tmp_path / "missing.dbc")
+    cluster = canmatrix.formats.loadp_many([dbc_file, arxml_file, missing_file], workers=2)
+    assert list(cluster) == ["test_frame_decoding", "ARXML_min_max_New_CanCluster"]
+    assert [frame.name for frame in cluster["test_frame_decoding"]] == \
+        [frame.name for frame in canmatrix.formats.loadp_flat(dbc_file)]
+    assert list(cluster.load_errors) == [missing_file]
+    assert isinstance(cluster.load_errors[missing_file], IOError)
+
+
+def test_iter_loadp_in_process():
+    dbc_file = "tests/files/dbc/test_frame_decoding.dbc"
+    results = list(canmatrix.formats.iter_loadp([dbc_file, "unknown.format"], workers=1))
+    assert [(path, error is None) for path, dbs, error in results] == [(dbc_file, True), ("unknown.format", False)]
+    assert list(results[0][1]) == [""]
+
+
+def test_load_from_buffers(monkeypatch):
+    dbc_file = "tests/files/dbc/test_frame_decoding.dbc"
+    expected = [frame.name for frame in canmatrix.formats.loadp_flat(dbc_file)]
+    with open(dbc_file, "rb") as source:
+        data = source.read()
+    assert [frame.name for frame in canmatrix.formats.loads_flat(memoryview(data), "dbc")] == expected
+    assert [frame.name for frame in canmatrix.formats.loads_flat(bytearray(data), "dbc")] == expected
+    monkeypatch.setattr(canmatrix.formats, "mmap_threshold", 0)
+    assert [frame.name for frame in canmatrix.formats.loadp_flat(dbc_file)] == expected
+    # formats without "bufferImporter" get a file object
+    json_matrix = canmatrix.formats.loads_flat(memoryview(b'{"messages": []}'), "json")
+    assert json_matrix.frames == []
+
+import_budget_script = """
+import sys
+import time
+start = time.perf_counter()
+import canmatrix.formats
+print(time.perf_counter() - start)
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def test_import_time_budget():
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(canmatrix.__file__))] + environment.get("PYTHONPATH", "").split(os.pathsep))
+    output = subprocess.check_output([sys.executable, "-c", import_budget_script], env=environment)
+    seconds, modules = output.decode().splitlines()
+    modules = set(modules.split())
+    # format modules and their dependencies are imported on first use
+    assert not {"canmatrix.formats.dbc", "canmatrix.formats.arxml", "canmatrix.cache", "lxml", "yaml"} & modules
+    assert float(seconds) < 1.0
+    assert "dbc" in canmatrix.formats.supportedFormats
+    assert canmatrix.formats.get_format_module("dbc") is canmatrix.formats.dbc
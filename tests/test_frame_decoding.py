@@ -269,3 +269,137 @@ def test_decoding_between_multiplexed_and_container_pdu():
     decoded = new_frame.decode(data)
     assert decoded["s11"].raw_value == 125
     assert decoded["s12"].raw_value == 200
+
+
+@pytest.mark.parametrize("frame_id", [1, 2, 3])
+def test_codec_matches_bitstring_decoding(frame_id):
+    cm = load_dbc()
+    frame = cm.frame_by_id(canmatrix.ArbitrationId(frame_id))
+    for frame_data in (bytearray(range(8)), bytearray([0x55] * 8), bytearray([0x38, 0x63, 0x8A, 0x7E, 0x58, 0xA8, 0xC5, 0x40])):
+        little, big = frame.bytes_to_bitstrings(frame_data)
+        expected = frame.bitstring_to_signal_list(frame.signals, big, little, frame.size * 8)
+        assert frame.codec.unpack(frame_data) == expected
+
+
+def test_codec_signal_exceeding_frame():
+    frame = canmatrix.Frame("frame", size=2)
+    frame.add_signal(canmatrix.Signal("inside", start_bit=0, size=8, is_little_endian=False))
+    frame.add_signal(canmatrix.Signal("exceeding", start_bit=12, size=8, is_little_endian=False, is_signed=False))
+    decoded = frame.decode(bytearray([0x81, 0x0F]))
+    assert decoded["inside"].raw_value == -127
+    assert decoded["exceeding"].raw_value == 0x0F
+
+
+def test_codec_is_rebuilt_on_signal_change():
+    frame = canmatrix.Frame("frame", size=1)
+    frame.add_signal(canmatrix.Signal("sig1", start_bit=0, size=4, is_signed=False))
+    assert frame.decode(bytearray([0x21]))["sig1"].raw_value == 1
+    codec = frame.codec
+    frame.add_signal(canmatrix.Signal("sig2", start_bit=4, size=4, is_signed=False))
+    assert frame.codec is not codec
+    assert frame.decode(bytearray([0x21]))["sig2"].raw_value == 2
+
+    frame.signals[1] = canmatrix.Signal("sig3", start_bit=4, size=4, is_signed=True)
+    assert frame.decode(bytearray([0xF1]))["sig3"].raw_value == -1
+
+    frame.signals[1].size = 3
+    frame.invalidate_codec()
+    assert frame.decode(bytearray([0xF1]))["sig3"].raw_value == -1
+    frame.signals[1].is_signed = False
+    frame.invalidate_codec()
+    assert frame.decode(bytearray([0xF1]))["sig3"].raw_value == 7
+
+
+def test_codec_follows_signal_layout_changes():
+    frame = canmatrix.Frame("frame", size=2)
+    frame.add_signal(canmatrix.Signal("sig1", start_bit=0, size=4, is_signed=False))
+    frame.add_signal(canmatrix.Signal("sig2", start_bit=4, size=4, is_signed=True))
+    frame.add_signal(canmatrix.Signal("sig3", start_bit=8, size=8, is_signed=False))
+    data = bytearray([0xF1, 0x03])
+    assert [frame.decode(data)[name].raw_value for name in ("sig1", "sig2", "sig3")] == [1, -1, 3]
+
+    frame.signals[0].size = 1
+    frame.signals[1].is_signed = False
+    frame.signals[2].start_bit = 0
+    assert [frame.decode(data)[name].raw_value for name in ("sig1", "sig2", "sig3")] == [1, 15, 0xF1]
+    frame.signals[2].is_little_endian = False
+    assert frame.decode(data)["sig3"].raw_value == 0xF1
+    frame.signals[2].start_bit = 8
+    assert frame.decode(data)["sig3"].raw_value == 3
+
+    frame.signals[2].multiplex_setter("Multiplexor")
+    frame.signals[1].multiplex_setter(2)
+    assert "sig2" not in frame.decode(data)
+    frame.signals[1].multiplex_setter(3)
+    assert frame.decode(data)["sig2"].raw_value == 15
+
+
+@pytest.mark.parametrize("frame_id", [1, 2, 3, 4])
+def test_decode_view_matches_decode(frame_id):
+    cm = load_dbc()
+    frame = cm.frame_by_id(canmatrix.ArbitrationId(frame_id))
+    for frame_data in (bytearray(range(frame.size)), bytearray([0x38, 0x63, 0x8A, 0x1E, 0x18, 0x20, 0x20, 0x00][:frame.size])):
+        decoded = frame.decode(frame_data)
+        view = frame.decode_view(frame_data)
+        assert sorted(view) == sorted(decoded)
+        for name, decoded_signal in decoded.items():
+            assert view[name].raw_value == decoded_signal.raw_value
+            assert view.raw_value(name) == decoded_signal.raw_value
+            assert view.phys_value(name) == decoded_signal.phys_value
+            assert view.named_value(name) == decoded_signal.named_value
+
+
+def test_decode_view_is_lazy():
+    frame = canmatrix.Frame("frame", arbitration_id=canmatrix.ArbitrationId(1), size=2)
+    frame.add_signal(canmatrix.Signal("muxer", start_bit=0, size=4, is_signed=False, multiplex="Multiplexor"))
+    frame.add_signal(canmatrix.Signal("muxed0", start_bit=4, size=4, is_signed=False, multiplex=0))
+    frame.add_signal(canmatrix.Signal("state", start_bit=8, size=8, is_signed=False, values={1: "on"}, factor=2))
+    view = frame.decode_view(bytearray([0x31, 0x01]))
+    assert view._raw == {}
+    assert view.named_value("state") == "on"
+    assert view.phys_value("state") == 2
+    assert set(view._raw) == {2}
+    assert "muxed0" not in view
+    with pytest.raises(KeyError):
+        view.raw_value("muxed0")
+    assert list(view) == ["muxer", "state"]
+
+    with pytest.raises(canmatrix.DecodingFrameLength):
+        frame.decode_view(bytearray(3))
+
+
+def test_codec_follows_frame_changes():
+    frame = canmatrix.Frame("frame", size=1)
+    frame.add_signal(canmatrix.Signal("sig1", start_bit=0, size=4, is_signed=False))
+    frame.add_signal(canmatrix.Signal("sig2", start_bit=4, size=4, is_signed=False))
+    codec = frame.codec
+    frame.size = 2
+    assert frame.codec is not codec
+    frame.add_signal(canmatrix.Signal("sig3", start_bit=12, size=4, is_signed=False, is_little_endian=False))
+    assert frame.decode(bytearray([0x21, 0x43]))["sig3"].raw_value == 3
+    frame.signals.remove(frame.signals[0])
+    assert list(frame.decode(bytearray([0x21, 0x43]))) == ["sig2", "sig3"]
+
+
+def test_codec_speed_up():
+    import timeit
+    frame = canmatrix.Frame("frame", size=8)
+    for index in range(8):
+        frame.add_signal(canmatrix.Signal("sig%d" % index, start_bit=8 * index, size=8, is_signed=index % 2 == 0))
+    data = bytearray(range(0x81, 0x89))
+
+    def bitstring_unpack():
+        little, big = frame.bytes_to_bitstrings(data)
+        return frame.bitstring_to_signal_list(frame.signals, big, little, frame.size * 8)
+
+    codec = frame.codec
+    assert codec.unpack(data) == bitstring_unpack()
+
+    def best(function):
+        return min(timeit.repeat(function, number=200, repeat=5))
+
+    # the cached codec is only re-checked, never rebuilt, while nothing changes
+    assert best(lambda: frame.codec) * 3 < best(lambda: codec.unpack(data))
+    assert frame.codec is codec
+    # measured about 6x on a slow machine, keep the bound loose for CI noise
+    assert best(lambda: codec.unpack(data)) * 3 < best(bitstring_unpack)
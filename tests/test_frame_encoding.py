@@ -204,3 +204,52 @@ def test_sym():
             print(h(encoded))
             print(h(expected))
             assert encoded == expected
+
+
+def test_encode_matches_bitstring_packing():
+    cm = load_dbc()
+    for frame_id, to_encode in (
+        (1, {"sig1": 35, "sig3": 2048, "sig7": 520, "sig10": 3}),
+        (2, {"secSig4": 2, "secSig10": 1280, "secSig11": -144, "secSig12": 12}),
+        (3, {"floatSignal1": 5.424999835668132e-05, "floatSignal2": -6.25}),
+    ):
+        frame = cm.frame_by_id(canmatrix.ArbitrationId(frame_id))
+        expected = frame.codec._pack_bitstrings(
+            [(signal, None, to_encode[signal.name]) for signal in frame.signals if signal.name in to_encode])
+        assert frame.encode(to_encode) == expected
+
+
+def test_encode_fd_frame():
+    frame = canmatrix.Frame("fd_frame", size=64, is_fd=True)
+    frame.add_signal(canmatrix.Signal("first", start_bit=0, size=16, is_little_endian=False, is_signed=False))
+    frame.add_signal(canmatrix.Signal("last", start_bit=496, size=16, is_little_endian=True, is_signed=True))
+    frame.add_signal(canmatrix.Signal("double", start_bit=256, size=64, is_float=True))
+
+    frame_data = frame.encode({"first": 0x1234, "last": -2, "double": 1.5})
+    expected = bytearray(64)
+    expected[0:2] = b'\x12\x34'
+    expected[32:40] = b'\x00\x00\x00\x00\x00\x00\xF8\x3F'
+    expected[62:64] = b'\xFE\xFF'
+    assert frame_data == expected
+    assert frame.decode(frame_data)["last"].raw_value == -2
+    assert frame.decode(frame_data)["double"].raw_value == 1.5
+
+
+def test_encode_follows_signal_layout_changes():
+    frame = canmatrix.Frame("frame", size=2)
+    frame.add_signal(canmatrix.Signal("sig1", start_bit=0, size=4, is_signed=False))
+    frame.add_signal(canmatrix.Signal("sig2", start_bit=8, size=8, is_signed=True))
+    assert frame.encode({"sig1": 3, "sig2": -1}) == bytearray([0x03, 0xFF])
+
+    frame.signals[0].start_bit = 4
+    frame.signals[1].size = 4
+    assert frame.encode({"sig1": 3, "sig2": -1}) == bytearray([0x30, 0x0F])
+    frame.signals[1].is_little_endian = False
+    frame.signals[1].start_bit = 12
+    assert frame.encode({"sig1": 3, "sig2": -1}) == bytearray([0x30, 0x0F])
+    frame.signals[1].start_bit = 8
+    assert frame.encode({"sig1": 3, "sig2": -1}) == bytearray([0x30, 0xF0])
+    frame.signals[1].is_float = True
+    frame.signals[1].size = 32
+    frame.size = 8
+    assert frame.encode({"sig2": 1.5})[1:5] == bytearray([0x3F, 0xC0, 0x00, 0x00])
@@ -2,6 +2,7 @@
 
 import io
 import json
+import os
 
 import pytest
 
@@ -237,3 +238,34 @@ def test_export_extended():
     canmatrix.formats.dump(matrix, out_file, "json")
 #    data = json.loads(out_file.getvalue().decode("utf-8"))
     matrix = canmatrix.formats.loads_flat(out_file.getvalue().decode("utf-8"), "json", jsonExportAll=True)
+
+
+def test_dump_fragments(default_matrix, tmpdir):
+    directory = str(tmpdir.join("fragments"))
+    written = canmatrix.formats.json.dump_fragments(default_matrix, directory, jsonExportAll=True)
+    assert sorted(written) == [
+        canmatrix.formats.json.fragment_path(directory, "test_frame"), canmatrix.formats.json.fragment_path(directory)]
+
+    matrix = canmatrix.formats.json.load_fragments(directory)
+    out_file = io.BytesIO()
+    canmatrix.formats.dump(default_matrix, out_file, "json", jsonExportAll=True)
+    expected = canmatrix.formats.loads_flat(out_file.getvalue().decode("utf-8"), "json")
+    assert matrix.fingerprint() == expected.fingerprint()
+
+    written = canmatrix.formats.json.dump_fragments(default_matrix, directory, frame_names=[], jsonExportAll=True)
+    assert written == [canmatrix.formats.json.fragment_path(directory)]
+
+
+def test_dump_fragments_escapes_file_names(tmpdir):
+    matrix = canmatrix.canmatrix.CanMatrix()
+    names = ["../outside", "a/b", "a%2Fb", "CON"]
+    for arbitration_id, name in enumerate(names, 1):
+        matrix.add_frame(canmatrix.canmatrix.Frame(name, arbitration_id=canmatrix.ArbitrationId(arbitration_id)))
+    directory = str(tmpdir.join("fragments"))
+    written = canmatrix.formats.json.dump_fragments(matrix, directory)
+    assert sorted(os.listdir(os.path.join(directory, "frames"))) == [
+        "%43ON.json", "..%2Foutside.json", "a%252Fb.json", "a%2Fb.json"]
+    assert all(os.path.dirname(path) in (directory, os.path.join(directory, "frames")) for path in written)
+    assert not tmpdir.join("outside.json").check()
+    loaded = canmatrix.formats.json.load_fragments(directory)
+    assert [frame.name for frame in loaded.frames] == names
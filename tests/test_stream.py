@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import collections
+import io
+import textwrap
+
+import pytest
+
+import canmatrix.formats
+import canmatrix.stream
+
+
+def load_dbc():
+    test_file = "tests/files/dbc/test_frame_decoding.dbc"
+    return canmatrix.formats.loadp_flat(test_file)
+
+
+PyCanMessage = collections.namedtuple("PyCanMessage", "timestamp arbitration_id is_extended_id data")
+
+mux_data = [
+    bytearray([0x38, 0x63, 0x8A, 0x7E, 0x00, 0x20, 0x00]),
+    bytearray([0x38, 0x63, 0x8A, 0x1E, 0x18, 0x20, 0x20]),
+]
+
+
+def expected_values(matrix, arbitration_id, data):
+    return {name: decoded.raw_value for name, decoded in matrix.decode(arbitration_id, data).items()}
+
+
+def test_iter_decode_matches_decode():
+    cm = load_dbc()
+    messages = [(0.1 * i, frame.arbitration_id, bytearray(range(i, i + frame.size)))
+                for i, frame in enumerate(cm.frames) if frame.name != "muxTestFrame"]
+    messages += [(1.0 + i, canmatrix.ArbitrationId(4), data) for i, data in enumerate(mux_data)]
+    decoded = list(cm.iter_decode(messages))
+    assert len(decoded) == len(messages)
+    for message, (timestamp, arbitration_id, data) in zip(decoded, messages):
+        assert message.timestamp == timestamp
+        assert message.frame is cm.frame_by_id(arbitration_id)
+        assert message.values == expected_values(cm, arbitration_id, data)
+
+
+def test_iter_decode_sources():
+    cm = load_dbc()
+    arbitration_id = canmatrix.ArbitrationId(4)
+    as_tuples = [(1.5, arbitration_id, mux_data[0]), (2.5, 4, mux_data[1])]
+    as_pycan = [PyCanMessage(1.5, 4, False, mux_data[0]), PyCanMessage(2.5, 4, False, mux_data[1])]
+    as_buffer = b"".join(canmatrix.stream.pack_record(timestamp, arbitration_id, data)
+                         for timestamp, _, data in as_tuples)
+    results = [list(cm.iter_decode(messages)) for messages in (as_tuples, as_pycan, as_buffer)]
+    assert results[0] == results[1] == results[2]
+    assert [message.values["myMuxer"] for message in results[0]] == [0, 1]
+
+
+def test_iter_decode_filters():
+    cm = load_dbc()
+    messages = [(0, canmatrix.ArbitrationId(4), mux_data[1]), (1, canmatrix.ArbitrationId(1), bytearray(8))]
+    decoded = list(cm.iter_decode(messages, frame_glob="mux*", signal_glob=["muxSig5", "myMux*"]))
+    assert len(decoded) == 1
+    assert decoded[0].values == {"myMuxer": 1, "muxSig5": -6}
+    assert decoded[0].phys_value("muxSig5") == cm.frame_by_id(canmatrix.ArbitrationId(4)).signal_by_name("muxSig5").raw2phys(-6)
+
+    decoded = list(cm.iter_decode([(0, canmatrix.ArbitrationId(4), mux_data[0])], signal_glob="muxSig5"))
+    assert decoded[0].values == {}
+
+
+def test_iter_decode_unknown_ids():
+    cm = load_dbc()
+    messages = [(0, 0x7FF, bytearray(8)), (1, 1, bytearray(8)), (2, 0x7FF, bytearray(8))]
+    assert [message.timestamp for message in cm.iter_decode(messages)] == [1]
+    decoded = list(cm.iter_decode(messages, skip_unknown=False))
+    assert [message.frame for message in decoded] == [None, cm.frame_by_id(canmatrix.ArbitrationId(1)), None]
+
+    decoder = canmatrix.stream.StreamDecoder(cm)
+    list(decoder.iter_decode(messages))
+    assert decoder.unknown_ids == {0x7FF}
+
+
+def test_iter_decode_wrong_length():
+    cm = load_dbc()
+    with pytest.raises(canmatrix.DecodingFrameLength):
+        list(cm.iter_decode([(0, 1, bytearray(9))]))
+
+
+def test_iter_decode_j1939_and_complex_multiplexed():
+    dbc = io.BytesIO(textwrap.dedent(u'''\
+    BO_ 2147483650 J1939Frame: 8 Vector__XXX
+     SG_ j1939Signal : 0|8@1+ (1,0) [0|0] "" Vector__XXX
+    BO_ 2024 OBD2: 8 Vector__XXX
+     SG_ ParameterID_Service01 m1M : 23|8@0+ (1,0) [0|0] "" Vector__XXX
+     SG_ S1_PID_0D_VehicleSpeed m13 : 31|8@0+ (1,0) [0|255] "km/h" Vector__XXX
+     SG_ S1_PID_11_ThrottlePosition m17 : 31|8@0+ (0.39216,0) [0|100] "%" Vector__XXX
+     SG_ Service M : 11|4@0+ (1,0) [0|0] "" Vector__XXX
+
+    SG_MUL_VAL_ 2024 S1_PID_0D_VehicleSpeed ParameterID_Service01 13-13;
+    SG_MUL_VAL_ 2024 S1_PID_11_ThrottlePosition ParameterID_Service01 17-17;
+    SG_MUL_VAL_ 2024 ParameterID_Service01 Service 1-1;
+    ''').encode('utf-8'))
+    cm = canmatrix.formats.load_flat(dbc, "dbc")
+    j1939_frame = cm.frame_by_name("J1939Frame")
+    j1939_frame.is_j1939 = True
+    obd2 = canmatrix.ArbitrationId(2024)
+    other_source = canmatrix.ArbitrationId(j1939_frame.arbitration_id.id | 0x12, extended=True)
+    data = bytearray([0x03, 0x41, 0x11, 0xFF, 0x00, 0x00, 0x00, 0x00])
+    messages = [(0, obd2, data), (1, j1939_frame.arbitration_id, bytearray(8)), (2, other_source, bytearray([7] * 8))]
+
+    decoded = list(cm.iter_decode(messages, skip_unknown=False))
+    assert [message.values for message in decoded] == [
+        expected_values(cm, arbitration_id, data) for _, arbitration_id, data in messages]
+    assert decoded[0].frame is None
+    assert decoded[2].frame is j1939_frame
+    assert decoded[2].values == {"j1939Signal": 7}
@@ -220,6 +220,17 @@ Title="An Example Title"
         assert matrix.value_tables == enum_dict, "Enum not parsed correctly : '{}'".format(enum_label)
 
 
+def test_multiline_enum_read_from_buffer():
+    sym = b'''\
+FormatVersion=5.0 // Do not edit this line!
+{ENUMS}
+enum Animal(0="Dog",
+1="Cat")
+'''
+    matrix = canmatrix.formats.sym.load(memoryview(sym))
+    assert matrix.value_tables == {"Animal": {0: "Dog", 1: "Cat"}}
+
+
 def test_enums_export():
     f = io.BytesIO('''\
 FormatVersion=5.0 // Do not edit this line!
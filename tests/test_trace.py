@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import io
+import textwrap
+
+import pytest
+
+import canmatrix.formats
+import canmatrix.stream
+import canmatrix.trace
+
+
+def load_dbc():
+    test_file = "tests/files/dbc/test_frame_decoding.dbc"
+    return canmatrix.formats.loadp_flat(test_file)
+
+
+extended = canmatrix.ArbitrationId.compound_extended_mask
+
+expected_records = [
+    (0.5, 4, bytearray([0x38, 0x63, 0x8A, 0x7E, 0x00, 0x20, 0x00])),
+    (1.25, 0x18FEF100 | extended, bytearray([1, 2, 3])),
+    (2.0, 1, bytearray(range(8))),
+]
+
+
+def test_read_candump():
+    lines = textwrap.dedent(u'''\
+    (0.500000) vcan0 004#38638A7E002000
+    (1.250000) vcan0 18FEF100#010203
+    (1.500000) vcan0 004#R
+    (2.000000) vcan0 001##00001020304050607
+    ''').splitlines()
+    assert list(canmatrix.trace.read_candump(lines)) == expected_records
+
+
+def test_read_asc():
+    lines = textwrap.dedent(u'''\
+    date Mon Oct 18 10:00:00 am 2026
+    base hex  timestamps absolute
+    Begin Triggerblock Mon Oct 18 10:00:00 am 2026
+       0.500000 1  4               Rx   d 7 38 63 8A 7E 00 20 00  Length = 0 BitCount = 0
+       1.250000 1  18FEF100x       Rx   d 3 01 02 03
+       1.300000 1  ErrorFrame
+       1.500000 1  4               Rx   r
+       2.000000 CANFD   1 Rx          1  FrameName  1 0 8  8 00 01 02 03 04 05 06 07  0 0 0 0 0 0 0 0
+    End TriggerBlock
+    ''').splitlines()
+    assert list(canmatrix.trace.read_asc(lines)) == expected_records
+
+
+def test_csv_roundtrip():
+    stream = io.StringIO()
+    canmatrix.trace.write_csv(stream, expected_records)
+    assert stream.getvalue().splitlines()[:2] == ["timestamp,id,extended,data", "0.5,4,0,38638a7e002000"]
+    stream.seek(0)
+    assert list(canmatrix.trace.read_csv(stream)) == expected_records
+
+
+@pytest.mark.parametrize("extension", [".log", ".asc", ".csv", ".bin"])
+def test_iter_trace_files(tmp_path, extension):
+    path = str(tmp_path / ("trace" + extension))
+    if extension == ".bin":
+        with open(path, "wb") as trace_file:
+            canmatrix.trace.write_binary(trace_file, expected_records)
+    elif extension == ".csv":
+        with io.open(path, "w", newline="") as trace_file:
+            canmatrix.trace.write_csv(trace_file, expected_records)
+    elif extension == ".log":
+        with io.open(path, "w") as trace_file:
+            trace_file.write(u"(0.5) can0 004#38638A7E002000\n(1.25) can0 18FEF100#010203\n(2.0) can0 001#0001020304050607\n")
+    else:
+        with io.open(path, "w") as trace_file:
+            trace_file.write(u"0.5 1 4 Rx d 7 38 63 8A 7E 00 20 00\n1.25 1 18FEF100x Rx d 3 01 02 03\n2.0 1 1 Rx d 8 00 01 02 03 04 05 06 07\n")
+    assert list(canmatrix.trace.iter_trace(path, chunk_size=16)) == expected_records
+
+    cm = load_dbc()
+    decoded = list(canmatrix.trace.decode_trace(cm, path))
+    assert [message.timestamp for message in decoded] == [0.5, 2.0]
+    assert decoded[0].values["myMuxer"] == 0
+
+
+def test_iter_trace_unknown_format():
+    with pytest.raises(ValueError):
+        list(canmatrix.trace.iter_trace("trace.unknown"))
+
+
+def test_iter_columns():
+    numpy = pytest.importorskip("numpy")
+    cm = load_dbc()
+    frame = cm.frame_by_id(canmatrix.ArbitrationId(1))
+    records = [(0.1 * i, 1, bytearray([i] * 8)) for i in range(5)] + [(9.0, 0x7FF, bytearray(8))]
+    chunks = list(canmatrix.trace.iter_columns(cm, records, chunk_size=4))
+    assert [list(chunk) for chunk in chunks] == [[frame.name], [frame.name]]
+    assert list(chunks[1][frame.name].timestamps) == [0.4]
+    for chunk in chunks:
+        columns = chunk[frame.name]
+        for row, timestamp in enumerate(columns.timestamps):
+            expected = frame.decode(bytearray([int(round(timestamp * 10))] * 8))
+            for name, column in columns.columns.items():
+                assert column.raw_value[row] == expected[name].raw_value
+
+    signal_name = frame.signals[0].name
+    chunk = next(canmatrix.trace.iter_columns(cm, records, signal_glob=signal_name))
+    assert list(chunk[frame.name].columns) == [signal_name]
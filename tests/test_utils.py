@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import io
+
 import pytest
 
 import canmatrix.utils
@@ -40,3 +42,11 @@ def test_decode_number():
 )
 def test_quote_aware_comma_split_function(input_string, expected_list):
     assert canmatrix.utils.quote_aware_comma_split(input_string) == expected_list
+
+
+@pytest.mark.parametrize("buffer_type", [bytes, bytearray, memoryview])
+def test_iter_lines(buffer_type, monkeypatch):
+    monkeypatch.setattr(canmatrix.utils, "line_chunk_size", 4)  # lines across chunk borders
+    data = b"BO_ 1 Frame: 8 Vector__XXX\n\n SG_ Signal\r\nlast"
+    assert list(canmatrix.utils.iter_lines(buffer_type(data))) == io.BytesIO(data).readlines()
+    assert list(canmatrix.utils.iter_lines(buffer_type(b""))) == []